@@ -1,15 +1,12 @@
-from InquirerPy import inquirer
-import requests
 import json
 import hashlib
 import os
 import sys
 
 from utils.get_translation import get_translation
-from spice.analyze import analyze_file
-
-# Add this at the top - server configuration
-SERVER_URL = "http://localhost:3000/api/submit"
+from spice.cache import ResultCache
+from spice.registry import get_analyzers
+from cli.submission import get_submitter
 
 def get_file_hash(file_path):
     """Generate a hash for the file based on content and modification time"""
@@ -27,56 +24,66 @@ def get_file_hash(file_path):
         return None
 
 def send_to_server(data):
-    """Send analysis data to the server"""
+    """Queue analysis data to be sent to the server in the background (see cli.submission)"""
+    get_submitter().submit(data)
+    return True
+
+
+def build_server_payload(results):
+    """Put the file information first and the stats after it, as the server expects"""
+    return {
+        "file_name": results.get("file_name"),
+        "file_path": results.get("file_path"),
+        "file_size": results.get("file_size"),
+        "file_extension": results.get("file_extension"),
+        **{k: v for k, v in results.items() if k not in ["file_name", "file_path", "file_size", "file_extension"]}
+    }
+
+
+def try_server(call):
+    """Run call(client) against the running `spice serve` server, or return None to analyze in this process.
+
+    Only spice.client is imported here: the analysis engine is loaded by the
+    callers once the server turns out to be unavailable, so a run served by
+    the server does not pay for it.
+    """
+    from spice.client import ServerClient
+    client = ServerClient.from_state_file()
+    if client is None:
+        return None
     try:
-        response = requests.post(SERVER_URL, json=data, timeout=5)
-        
-        if response.status_code == 200:
-            result = response.json()
-            if result.get('isDuplicate'):
-                print("✓ Data updated on server (file was modified)")
-            else:
-                print("✓ New analysis sent to server")
-            return True
-        else:
-            # print(f"⚠ Server responded with status {response.status_code}", file=sys.stderr)
-            return False
-            
-    except requests.exceptions.ConnectionError:
-        # print("⚠ Could not connect to server - make sure it's running on localhost:3000", file=sys.stderr)
-        return False
-    except requests.exceptions.Timeout:
-        # print("⚠ Server request timed out", file=sys.stderr)
-        return False
-    except Exception as e:
-        # Linha para debugar erros, descomente se precisar:
-        # print(f"⚠ Error sending to server: {e}", file=sys.stderr)
-        return False
+        return call(client)
+    except OSError:
+        return None  # the server is gone: fall back to analyzing here
 
 
+# output formats of the analyze command; ndjson writes one compact JSON record per file as soon as it is analyzed
+OUTPUT_FORMATS = ["text", "json", "ndjson"]
 
-def analyze_command(file, all, json_output, LANG_FILE):
+
+def analyze_command(file, all, json_output, LANG_FILE, jobs=None, use_cache=True, output_format=None):
     """
-    Analyze the given file.
+    Analyze the given file, or every supported file in the given directory.
     """
     
     # load translations
     messages = get_translation(LANG_FILE)
 
-    # define available stats (updated with new features)
-    available_stats = [
-        "line_count",
-        "function_count", 
-        "comment_line_count",
-        "inline_comment_count",
-        "indentation_level",
-        "external_dependencies_count",
-        "method_type_count",
-        "comment_ratio",
-        "average_function_size",
-        "duplicate_code_detection",
-        "asymptotic_complexity"
-    ]
+    # --json is a shorthand for --format json
+    output_format = output_format or ("json" if json_output else "text")
+    if output_format not in OUTPUT_FORMATS:
+        print(f"{messages.get('invalid_format', 'Invalid format')} {output_format}")
+        print(f"{messages.get('valid_formats', 'Valid formats')}: {', '.join(OUTPUT_FORMATS)}")
+        return
+    # every format but text is machine-readable: no menu, no progress messages
+    json_output = output_format != "text"
+
+    # results of unchanged files are reused across runs unless --no-cache is given
+    cache = ResultCache() if use_cache else None
+
+    # available stats come from the analyzer registry (built-in analyzers plus plugins)
+    analyzers = get_analyzers()
+    available_stats = [analyzer.name for analyzer in analyzers]
 
     # dictionary for the stats (updated with new features)
     stats_labels = {
@@ -94,6 +101,10 @@ def analyze_command(file, all, json_output, LANG_FILE):
         "duplicate_code_detection": messages.get("duplicate_code_detection_option", "Duplicate Code Detection"),
         "asymptotic_complexity": messages.get("asymptotic_complexity_option", "Asymptotic Complexity Analysis")
     }
+    # analyzers from plugins have no translation, use their own label
+    for analyzer in analyzers:
+        stats_labels.setdefault(analyzer.name, analyzer.label)
+    outputs = {analyzer.name: analyzer.outputs for analyzer in analyzers}
 
     # If --all flag is used, skip the selection menu and use all stats
     if all:
@@ -104,6 +115,7 @@ def analyze_command(file, all, json_output, LANG_FILE):
             selected_stat_keys = available_stats
         else:
             # print checkbox menu to select which stats to show
+            from InquirerPy import inquirer
             selected_stats = inquirer.checkbox(
                 message=messages.get("select_stats", "Select stats to display:"),
                 choices=[stats_labels[stat] for stat in available_stats],
@@ -115,7 +127,6 @@ def analyze_command(file, all, json_output, LANG_FILE):
             # if no stats were selected
             if not selected_stats:
                 if json_output:
-                    import json
                     print(json.dumps({"error": messages.get("no_stats_selected", "No stats selected. Analysis cancelled.")}))
                 else:
                     print(messages.get("no_stats_selected", "No stats selected. Analysis cancelled."))
@@ -127,30 +138,32 @@ def analyze_command(file, all, json_output, LANG_FILE):
             # convert selected labels back to stat keys
             selected_stat_keys = [reverse_mapping[label] for label in selected_stats]
 
+    # directories are analyzed file by file on a process pool and summarized
+    if os.path.isdir(file):
+        analyze_directory_command(file, selected_stat_keys, output_format, messages, stats_labels, jobs, cache)
+        return
+
     # try to analyze and if error then print the error
     try:
         # show analyzing message if not in JSON mode
         if not json_output:
             print(f"{messages.get('analyzing_file', 'Analyzing file')}: {file}")
         
-        # get analysis results from analyze_file
-        results = analyze_file(file, selected_stats=selected_stat_keys)
-        
-        # Prepare data for server
-        server_data = {
-            "file_name": results.get("file_name"),
-            "file_path": results.get("file_path"),
-            "file_size": results.get("file_size"),
-            "file_extension": results.get("file_extension"),
-            **{k: v for k, v in results.items() if k not in ["file_name", "file_path", "file_size", "file_extension"]}
-        }
+        # get analysis results from the analysis server when one is running, else from analyze_file
+        results = try_server(lambda client: client.analyze_file(file, selected_stat_keys, use_cache=cache is not None))
+        if results is None:
+            from spice.analyze import analyze_file
+            results = analyze_file(file, selected_stats=selected_stat_keys, cache=cache)
+        if cache is not None:
+            cache.prune()
         
         # Send to server (always attempt this, regardless of output mode)
-        send_to_server(server_data)
+        send_to_server(build_server_payload(results))
         
         # output in JSON format if flag
-        if json_output:
-            import json
+        if output_format == "ndjson":
+            print(json.dumps(results, separators=(",", ":")), flush=True)
+        elif json_output:
             print(json.dumps(results, indent=2))
         else:
             # only print the selected stats in normal mode
@@ -185,11 +198,114 @@ def analyze_command(file, all, json_output, LANG_FILE):
                     
                 elif stat in results:
                     print(f"{stats_labels[stat]}: {results[stat]}")
+
+                # stats from plugins that produce several keys
+                else:
+                    for key in outputs.get(stat, []):
+                        if key in results:
+                            print(f"{messages.get(key, key.replace('_', ' ').title())}: {results[key]}")
     except Exception as e:
         if json_output:
-            import json
             # Replace newlines with spaces or escape them properly
             error_msg = str(e).replace('\n', ' ')
             print(json.dumps({"error": error_msg}))
         else:
-            print(f"{messages.get('error', 'Error')}: {e}")
\ No newline at end of file
+            print(f"{messages.get('error', 'Error')}: {e}")
+
+
+def analyze_directory_command(directory, selected_stat_keys, output_format, messages, stats_labels, jobs, cache=None):
+    """
+    Analyze every supported file in a directory and print an aggregated report,
+    or with the ndjson format every file's results as soon as they are ready.
+    """
+    json_output = output_format != "text"
+    try:
+        if not json_output:
+            print(f"{messages.get('analyzing_directory', 'Analyzing directory')}: {directory}")
+
+        # the server's worker pool has a fixed size: an explicit --jobs is honoured by analyzing here
+        use_server = jobs is None
+
+        if output_format == "json":
+            report = None
+            if use_server:
+                report = try_server(lambda client: client.analyze_directory(directory, selected_stat_keys,
+                                                                            use_cache=cache is not None))
+            if report is None:
+                from spice.analyze import analyze_directory
+                report = analyze_directory(directory, selected_stats=selected_stat_keys, jobs=jobs, cache=cache)
+            if cache is not None:
+                cache.prune()
+
+            # Send every successfully analyzed file to the server
+            for results in report["files"]:
+                if "error" not in results:
+                    send_to_server(build_server_payload(results))
+
+            print(json.dumps(report, indent=2))
+            return
+
+        # ndjson and the text report never need every result at once: handle them as they come instead of keeping them all
+        from spice.aggregate import summary_stats
+        # the text report is a summary, which may need line counts besides the selected stats
+        stats = selected_stat_keys if output_format == "ndjson" else summary_stats(selected_stat_keys)
+        files = None
+        if use_server:
+            # the server streams the results back as its workers finish them
+            files = try_server(lambda client: client.iter_directory(directory, stats, use_cache=cache is not None))
+        if files is None:
+            from spice.scheduler import analyze_files, find_source_files
+            files = analyze_files(find_source_files(directory), selected_stats=stats, jobs=jobs, cache=cache,
+                                  ordered=False)
+
+        if output_format == "ndjson":
+            for results in files:
+                print(json.dumps(results, separators=(",", ":")), flush=True)
+                if "error" not in results:
+                    send_to_server(build_server_payload(results))
+            if cache is not None:
+                cache.prune()
+            return
+
+        from spice.aggregate import Aggregate
+        aggregate = Aggregate(directory)
+        for results in files:
+            aggregate.add(results)
+            if "error" in results:
+                print(f"{results['file_path']}: {messages.get('error', 'Error')} {results['error']}")
+            else:
+                send_to_server(build_server_payload(results))
+        if cache is not None:
+            cache.prune()
+
+        summary = aggregate.report()
+        print(f"{messages.get('files_analyzed', 'Files Analyzed')}: {summary['file_count'] - summary['error_count']}")
+        if summary["error_count"]:
+            print(f"{messages.get('files_failed', 'Files Failed')}: {summary['error_count']}")
+        for ext, count in sorted(summary["files_by_extension"].items()):
+            print(f"  {ext}: {count}")
+        if summary["totals"]:
+            print(f"{messages.get('totals', 'Totals')}:")
+        for stat, total in summary["totals"].items():
+            label = stats_labels.get(stat) or messages.get(stat, stat.replace('_', ' ').title())
+            print(f"  {label}: {total}")
+
+        # repository-wide distributions
+        if "comment_ratio" in summary:
+            print(f"{stats_labels['comment_ratio']}: {summary['comment_ratio']}")
+        if "complexity_distribution" in summary:
+            print(f"{messages.get('complexity_distribution', 'Complexity Distribution')}:")
+            for complexity, count in summary["complexity_distribution"].items():
+                print(f"  {complexity}: {count}")
+        if "average_function_size_percentiles" in summary:
+            percentiles = ", ".join(f"{name} {value}" for name, value in summary["average_function_size_percentiles"].items())
+            print(f"{stats_labels['average_function_size']}: {percentiles}")
+        if "duplicate_percentage_by_directory" in summary:
+            print(f"{messages.get('duplicates_by_directory', 'Duplicate Percentage by Directory')}:")
+            for path, percentage in summary["duplicate_percentage_by_directory"].items():
+                print(f"  {path}: {percentage}%")
+    except Exception as e:
+        if json_output:
+            print(json.dumps({"error": str(e).replace('\n', ' ')}))
+        else:
+            print(f"{messages.get('error', 'Error')}: {e}")
@@ -0,0 +1,18 @@
+from rich import print # this add colors to the printed text
+
+from utils.get_translation import get_translation
+from spice.cache import ResultCache
+
+
+def cache_clear_command(LANG_FILE):
+    """
+    Remove every cached analysis result.
+    """
+
+    # load translations
+    messages = get_translation(LANG_FILE)
+
+    cache = ResultCache()
+    cache.clear()
+
+    print(f"[green]{messages.get('cache_cleared', 'Analysis cache cleared')}[/]: {cache.directory}")
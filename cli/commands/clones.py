@@ -0,0 +1,44 @@
+import json
+import os
+import sys
+
+from rich import print # this add colors to the printed text
+from rich.markup import escape
+
+from utils.get_translation import get_translation
+from spice.clones import CloneIndex, default_index_path
+
+
+def clones_command(directory, json_output, LANG_FILE):
+    """
+    Find code copied between different files of a directory.
+    """
+
+    # load translations
+    messages = get_translation(LANG_FILE)
+
+    try:
+        if not os.path.isdir(directory):
+            raise ValueError(f"Path is not a directory: {directory}")
+
+        # the fingerprint index is kept between runs, so only changed files are read again
+        with CloneIndex(default_index_path(directory)) as index:
+            changes = index.update(directory)
+            clones = index.clone_pairs()
+
+        if json_output:
+            # not through rich, which wraps long lines and reads [...] in paths as markup
+            sys.stdout.write(json.dumps({"directory": os.path.abspath(directory), "index": changes, "clones": clones}, indent=2) + "\n")
+            return
+
+        root = os.path.abspath(directory)
+        for clone in clones:
+            file_a = escape(os.path.relpath(clone["file_a"], root))
+            file_b = escape(os.path.relpath(clone["file_b"], root))
+            print(f"{file_a}:{clone['start_a']}-{clone['end_a']} <-> {file_b}:{clone['start_b']}-{clone['end_b']}")
+        print(f"[yellow]{messages.get('clones_found', 'Clones found')}[/]: {len(clones)}")
+    except Exception as e:
+        if json_output:
+            sys.stdout.write(json.dumps({"error": str(e)}) + "\n")
+        else:
+            print(f"[red]{messages.get('error', 'Error')}[/]: {escape(str(e))}")
@@ -1,11 +1,29 @@
 import os
 import json
 import csv
+import html
 import typer
 from rich.console import Console
 from rich.table import Table
 
 from utils.get_translation import get_translation
+from cli.commands.export.typed import write_npz, write_sqlite
+
+# size of the write buffer of multi-file exports: rows are written as they come, in large writes
+EXPORT_BUFFER_SIZE = 1024 * 1024
+
+# rows of a multi-file HTML table written at a time
+HTML_CHUNK_ROWS = 500
+
+# columns of multi-file csv, markdown and html exports, always all of them and in this
+# order, whatever stats each file has, so exports of different runs line up
+FILE_COLUMNS = [
+    "file_name", "file_path", "file_extension", "file_size", "line_count", "comment_line_count",
+    "inline_comment_count", "comment_ratio", "function_count", "average_function_size",
+    "external_dependencies_count", "public_methods", "private_methods", "indentation_type",
+    "indentation_size", "duplicate_blocks", "duplicate_lines", "duplicate_percentage",
+    "average_complexity", "total_analyzed_functions", "complexity_distribution", "error"
+]
 
 def export_results(results, format_type, output_file, messages):
     """
@@ -83,33 +101,152 @@ def export_results(results, format_type, output_file, messages):
         print(f"{messages.get('export_error', 'Export error')}: {str(e)}")
         return False
 
-def export_command(file, format_type, output, LANG_FILE):
+def export_files(results, format_type, output_file, messages):
+    """
+    Export the results of many files, one row (or array item) per file.
+    
+    Results are written as they come from the iterable, through a large write
+    buffer, and are not kept, so exporting a huge repository takes the memory of a
+    single file's results. The sqlite and npz formats store every column with its
+    own type (see cli.commands.export.typed) for fast queries over many exports.
+    
+    Args:
+        results (iterable): Per-file result dicts, as yielded by spice.scheduler.analyze_files
+        format_type (str): Format to export (json, csv, html, markdown, sqlite, npz)
+        output_file (str): Path to output file
+        messages (dict): Translation messages
+    
+    Returns:
+        int: Number of files exported, or None if the export failed
+    """
+    writers = {"json": _write_json_array, "csv": _write_csv_rows, "markdown": _write_markdown_rows, "html": _write_html_rows}
+    typed_writers = {"sqlite": write_sqlite, "npz": write_npz}
+    if format_type not in writers and format_type not in typed_writers:
+        return None
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(output_file)), exist_ok=True)
+        if format_type in typed_writers:
+            return typed_writers[format_type](results, output_file)
+        with open(output_file, "w", encoding="utf-8", newline="", buffering=EXPORT_BUFFER_SIZE) as f:
+            return writers[format_type](results, f, messages)
+    except Exception as e:
+        print(f"{messages.get('export_error', 'Export error')}: {str(e)}")
+        return None
+
+def _flatten(result):
+    """The FILE_COLUMNS of one result, as scalars ("" when the file does not have it)."""
+    row = dict(result)
+    method_type_count = row.pop("method_type_count", None) or {}
+    row["public_methods"] = method_type_count.get("public", "")
+    row["private_methods"] = method_type_count.get("private", "")
+    if "complexity_distribution" in row:
+        row["complexity_distribution"] = json.dumps(row["complexity_distribution"], ensure_ascii=False)
+    return [row.get(column, "") for column in FILE_COLUMNS]
+
+def _write_json_array(results, f, messages):
+    count = 0
+    f.write("[")
+    for result in results:
+        f.write(",\n  " if count else "\n  ")
+        f.write(json.dumps(result))
+        count += 1
+    f.write("\n]\n" if count else "]\n")
+    return count
+
+def _write_csv_rows(results, f, messages):
+    writer = csv.writer(f)
+    writer.writerow(FILE_COLUMNS)
+    count = 0
+    for result in results:
+        writer.writerow(_flatten(result))
+        count += 1
+    return count
+
+def _write_markdown_rows(results, f, messages):
+    f.write(f"# {messages.get('analysis_results', 'Analysis Results')}\n\n")
+    f.write("| " + " | ".join(column.replace('_', ' ').title() for column in FILE_COLUMNS) + " |\n")
+    f.write("|" + "---|" * len(FILE_COLUMNS) + "\n")
+    count = 0
+    for result in results:
+        f.write("| " + " | ".join(_markdown_cell(value) for value in _flatten(result)) + " |\n")
+        count += 1
+    return count
+
+def _markdown_cell(value):
+    """A value that stays inside its table cell: pipes escaped, line breaks as <br>."""
+    text = str(value).replace("|", "\\|")
+    return text.replace("\r\n", "<br>").replace("\r", "<br>").replace("\n", "<br>")
+
+def _write_html_rows(results, f, messages):
+    f.write("<!DOCTYPE html>\n<html>\n<head>\n<meta charset=\"utf-8\">\n")
+    f.write("<title>SpiceCode Analysis Results</title>\n<style>\n"
+            "body { font-family: Arial, sans-serif; margin: 20px; }\n"
+            "table { border-collapse: collapse; width: 100%; }\n"
+            "th, td { border: 1px solid #ddd; padding: 8px; text-align: left; }\n"
+            "th { background-color: #f2f2f2; }\n"
+            "h1 { color: #333; }\n"
+            "</style>\n</head>\n<body>\n")
+    f.write(f"<h1>{messages.get('analysis_results', 'Analysis Results')}</h1>\n<table>\n<tr>")
+    f.write("".join(f"<th>{column.replace('_', ' ').title()}</th>" for column in FILE_COLUMNS) + "</tr>\n")
+    count = 0
+    chunk = []
+    for result in results:
+        chunk.append("<tr>" + "".join(f"<td>{html.escape(str(value))}</td>" for value in _flatten(result)) + "</tr>\n")
+        count += 1
+        if len(chunk) >= HTML_CHUNK_ROWS:
+            f.write("".join(chunk))
+            chunk.clear()
+    f.write("".join(chunk))
+    f.write("</table>\n</body>\n</html>")
+    return count
+
+def export_command(file, format_type, output, LANG_FILE, use_cache=True):
     """
     Export analysis results to a file.
+    
+    A directory is exported as one row per supported file in it, written while
+    the files are analyzed. Results come from the same cache as analyze unless
+    use_cache is False.
     """
     # Load translations
     messages = get_translation(LANG_FILE)
     console = Console()
     
     # Validate format type
-    valid_formats = ["json", "csv", "markdown", "html"]
+    valid_formats = ["json", "csv", "markdown", "html", "sqlite", "npz"]
     if format_type not in valid_formats:
         console.print(f"[red]{messages.get('invalid_format', 'Invalid format')}[/] {format_type}")
         console.print(f"{messages.get('valid_formats', 'Valid formats')}: {', '.join(valid_formats)}")
         return
     
     try:
-        # Analyze file
-        from spice.analyze import analyze_file
-        results = analyze_file(file)
-        
         # Set default output file if not provided
         if not output:
-            base_name = os.path.splitext(os.path.basename(file))[0]
+            base_name = os.path.splitext(os.path.basename(os.path.abspath(file)))[0]
             output = f"{base_name}_analysis.{format_type}"
         
-        # Export results
-        success = export_results(results, format_type, output, messages)
+        # the same cache as analyze, so files analyzed before are not analyzed again
+        from spice.cache import ResultCache
+        cache = ResultCache() if use_cache else None
+
+        if format_type in ("sqlite", "npz") and not os.path.isdir(file):
+            # Typed formats only have a per-file layout, one row here
+            from spice.analyze import analyze_file
+            success = export_files([analyze_file(file, cache=cache)], format_type, output, messages) is not None
+        elif os.path.isdir(file):
+            # Analyze every file on the process pool and write each one as it comes
+            from spice.scheduler import analyze_files, find_source_files
+            success = export_files(analyze_files(find_source_files(file), cache=cache), format_type, output, messages) is not None
+        else:
+            # Analyze file
+            from spice.analyze import analyze_file
+            results = analyze_file(file, cache=cache)
+            
+            # Export results
+            success = export_results(results, format_type, output, messages)
+
+        if cache is not None:
+            cache.prune()
         
         if success:
             console.print(f"[green]{messages.get('export_success', 'Export successful')}[/]: {output}")
@@ -0,0 +1,247 @@
+import shutil
+import sqlite3
+import tempfile
+import time
+import zipfile
+
+from spice.analyze import ANALYZER_VERSION
+
+# rows of an npz export converted to arrays at a time
+COLUMN_CHUNK_ROWS = 65536
+
+# value of an integer column of an npz export when the file does not have the stat
+MISSING_INT = -1
+
+# bumped whenever the layout of the npz export changes
+NPZ_FORMAT_VERSION = 1
+
+# type of every per-file column of the typed (sqlite and npz) exports; the
+# complexity distribution goes to a table of its own
+TYPED_COLUMNS = [
+    ("file_name", str), ("file_path", str), ("file_extension", str), ("file_size", int),
+    ("line_count", int), ("comment_line_count", int), ("inline_comment_count", int),
+    ("comment_ratio", float), ("function_count", int), ("average_function_size", float),
+    ("external_dependencies_count", int), ("public_methods", int), ("private_methods", int),
+    ("indentation_type", str), ("indentation_size", int), ("duplicate_blocks", int),
+    ("duplicate_lines", int), ("duplicate_percentage", float), ("average_complexity", str),
+    ("total_analyzed_functions", int), ("error", str)
+]
+
+_SQLITE_TYPES = {int: "INTEGER", float: "REAL", str: "TEXT"}
+
+_SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    exported_at REAL NOT NULL,
+    analyzer_version INTEGER NOT NULL,
+    file_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    exported_at REAL NOT NULL,
+    {columns}
+);
+CREATE TABLE IF NOT EXISTS complexity (
+    file_id INTEGER NOT NULL REFERENCES files (id),
+    complexity TEXT NOT NULL,
+    function_count INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS files_by_time ON files (exported_at);
+CREATE INDEX IF NOT EXISTS files_by_path ON files (file_path, exported_at);
+CREATE INDEX IF NOT EXISTS files_by_extension ON files (file_extension, exported_at);
+CREATE INDEX IF NOT EXISTS complexity_by_file ON complexity (file_id);
+""".format(columns=",\n    ".join(f"{name} {_SQLITE_TYPES[kind]}" for name, kind in TYPED_COLUMNS))
+
+
+def typed_row(result):
+    """The TYPED_COLUMNS of one result, as int, float or str (None when the file does not have it)."""
+    method_type_count = result.get("method_type_count") or {}
+    row = []
+    for name, kind in TYPED_COLUMNS:
+        if name in ("public_methods", "private_methods"):
+            value = method_type_count.get(name.split("_")[0])
+        else:
+            value = result.get(name)
+        if value is not None:
+            # comment_ratio comes as a string such as "16.23%"
+            value = kind(value.rstrip("%")) if kind is float and isinstance(value, str) else kind(value)
+        row.append(value)
+    return row
+
+
+def write_sqlite(results, output_file):
+    """
+    Append the results to a SQLite database, as one run with a row per file.
+
+    Every column has its own SQL type and the files are indexed by export time,
+    path and extension, so queries over many runs (e.g. the weekly line count of
+    a directory) are index range scans. Exporting to an existing database adds a
+    run to it; the rows of earlier runs are kept.
+
+    Args:
+        results (iterable): Per-file result dicts, as yielded by spice.scheduler.analyze_files
+        output_file (str): Path to the database
+
+    Returns:
+        int: Number of files exported
+    """
+    names = [name for name, _ in TYPED_COLUMNS]
+    insert_file = (f"INSERT INTO files (run_id, exported_at, {', '.join(names)}) "
+                   f"VALUES (?, ?, {', '.join('?' * len(names))})")
+    exported_at = time.time()
+    count = 0
+    connection = sqlite3.connect(output_file)
+    try:
+        connection.executescript(_SQLITE_SCHEMA)
+        # a single transaction: a failed export leaves no partial run behind
+        with connection:
+            run_id = connection.execute(
+                "INSERT INTO runs (exported_at, analyzer_version) VALUES (?, ?)", (exported_at, ANALYZER_VERSION)
+            ).lastrowid
+            for result in results:
+                file_id = connection.execute(insert_file, [run_id, exported_at, *typed_row(result)]).lastrowid
+                connection.executemany(
+                    "INSERT INTO complexity (file_id, complexity, function_count) VALUES (?, ?, ?)",
+                    [(file_id, complexity, n) for complexity, n in (result.get("complexity_distribution") or {}).items()]
+                )
+                count += 1
+            connection.execute("UPDATE runs SET file_count = ? WHERE id = ?", (count, run_id))
+    finally:
+        connection.close()
+    return count
+
+
+class _Column:
+    """A one-dimensional array built a chunk at a time in a temporary file."""
+
+    def __init__(self, dtype):
+        import numpy as np
+        self.dtype = np.dtype(dtype)
+        self.file = tempfile.TemporaryFile()
+        self.values = []
+        self.length = 0
+
+    def append(self, value):
+        self.values.append(value)
+        if len(self.values) >= COLUMN_CHUNK_ROWS:
+            self.flush()
+
+    def extend(self, data):
+        """Append raw bytes (of a uint8 column)."""
+        self.flush()
+        self.file.write(data)
+        self.length += len(data)
+
+    def flush(self):
+        import numpy as np
+        if self.values:
+            self.file.write(np.asarray(self.values, dtype=self.dtype).tobytes())
+            self.length += len(self.values)
+            self.values.clear()
+
+    def write_npy(self, archive, name):
+        """Write the column as `name`.npy into an open zip archive, without loading it in memory."""
+        import numpy as np
+        self.flush()
+        self.file.seek(0)
+        with archive.open(f"{name}.npy", "w", force_zip64=True) as entry:
+            np.lib.format.write_array_header_1_0(entry, {
+                "descr": np.lib.format.dtype_to_descr(self.dtype), "fortran_order": False, "shape": (self.length,)
+            })
+            shutil.copyfileobj(self.file, entry, 1024 * 1024)
+        self.file.close()
+
+
+class _StringColumn:
+    """UTF-8 strings stored as in Arrow: all bytes in one array, and where each string ends in another."""
+
+    def __init__(self):
+        self.data = _Column("uint8")
+        self.offsets = _Column("int64")
+        self.offsets.append(0)
+        self.end = 0
+
+    def append(self, value):
+        encoded = (value or "").encode("utf-8")
+        self.data.extend(encoded)
+        self.end += len(encoded)
+        self.offsets.append(self.end)
+
+    def write_npy(self, archive, name):
+        self.data.write_npy(archive, f"{name}.data")
+        self.offsets.write_npy(archive, f"{name}.offsets")
+
+
+def _new_column(kind):
+    return _StringColumn() if kind is str else _Column("int64" if kind is int else "float64")
+
+
+def write_npz(results, output_file):
+    """
+    Write the results as a NumPy .npz archive with one typed array per column.
+
+    Integer stats are int64 arrays (MISSING_INT when a file does not have the
+    stat) and decimal ones float64 arrays (NaN when missing). Each string column
+    NAME is stored as NAME.data, the uint8 UTF-8 bytes of all its values, and
+    NAME.offsets, where value i spans data[offsets[i]:offsets[i + 1]]. The
+    complexity distribution is stored in long form in complexity.file_index,
+    complexity.class and complexity.function_count. Columns are built a chunk at
+    a time in temporary files, so memory does not grow with the number of files.
+
+    Args:
+        results (iterable): Per-file result dicts, as yielded by spice.scheduler.analyze_files
+        output_file (str): Path to the archive
+
+    Returns:
+        int: Number of files exported
+    """
+    import numpy as np
+    columns = {name: _new_column(kind) for name, kind in TYPED_COLUMNS}
+    complexity = {"complexity.file_index": _Column("int64"), "complexity.class": _StringColumn(),
+                  "complexity.function_count": _Column("int64")}
+    missing = {int: MISSING_INT, float: float("nan"), str: None}
+    count = 0
+    for result in results:
+        for (name, kind), value in zip(TYPED_COLUMNS, typed_row(result)):
+            columns[name].append(missing[kind] if value is None else value)
+        for complexity_class, n in (result.get("complexity_distribution") or {}).items():
+            complexity["complexity.file_index"].append(count)
+            complexity["complexity.class"].append(complexity_class)
+            complexity["complexity.function_count"].append(n)
+        count += 1
+
+    columns.update(complexity)
+    with zipfile.ZipFile(output_file, "w", allowZip64=True) as archive:
+        for name, value in (("format_version", NPZ_FORMAT_VERSION), ("analyzer_version", ANALYZER_VERSION),
+                            ("exported_at", time.time())):
+            with archive.open(f"{name}.npy", "w") as entry:
+                np.lib.format.write_array(entry, np.asarray(value))
+        for name, column in columns.items():
+            column.write_npy(archive, name)
+    return count
+
+
+def load_npz(path):
+    """
+    Read an npz export back.
+
+    Returns:
+        dict: Column name -> numpy array, with the string columns decoded into
+            arrays of str and the run metadata (format_version, analyzer_version,
+            exported_at) as 0-d arrays
+    """
+    import numpy as np
+    columns = {}
+    with np.load(path) as archive:
+        for name in archive.files:
+            if name.endswith(".offsets"):
+                base = name[:-len(".offsets")]
+                data = archive[f"{base}.data"].tobytes()
+                offsets = archive[name].tolist()
+                columns[base] = np.array([data[start:end].decode("utf-8") for start, end in zip(offsets, offsets[1:])],
+                                         dtype=str)
+            elif not name.endswith(".data"):
+                columns[name] = archive[name]
+    return columns
+
@@ -0,0 +1,42 @@
+import signal
+
+from utils.get_translation import get_translation
+from spice.cache import ResultCache
+from spice.server import AnalysisServer
+
+
+def serve_command(host, port, jobs, LANG_FILE, use_cache=True):
+    """
+    Run the analysis server until interrupted.
+    """
+
+    # load translations
+    messages = get_translation(LANG_FILE)
+
+    cache = ResultCache() if use_cache else None
+    try:
+        server = AnalysisServer(host, port, jobs=jobs, cache=cache)
+    except OSError as e:
+        print(f"{messages.get('error', 'Error')}: {e}")
+        return
+
+    # stop the same way on kill (SIGTERM) as on Ctrl+C, so the state file is always removed
+    signal.signal(signal.SIGTERM, _interrupt)
+
+    try:
+        # pay the start-up cost of every worker now rather than on the first request
+        server.warm_up()
+        server.write_state()
+        print(f"{messages.get('serving_on', 'Serving on')} {server.url} ({messages.get('stop_hint', 'press Ctrl+C to stop')})", flush=True)
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.remove_state()
+        server.server_close()
+        if cache is not None:
+            cache.prune()
+
+
+def _interrupt(signum, frame):
+    raise KeyboardInterrupt
@@ -0,0 +1,58 @@
+import json
+import os
+
+from utils.get_translation import get_translation
+from spice.cache import ResultCache
+from spice.watch import Watcher
+from cli.commands.analyze import build_server_payload, send_to_server
+
+
+def watch_command(directory, interval, json_output, LANG_FILE, use_cache=True):
+    """
+    Watch a directory and analyze files again as they change.
+    """
+
+    # load translations
+    messages = get_translation(LANG_FILE)
+
+    cache = ResultCache() if use_cache else None
+    try:
+        watcher = Watcher(directory, cache=cache)
+    except Exception as e:
+        if json_output:
+            print(json.dumps({"error": str(e).replace('\n', ' ')}))
+        else:
+            print(f"{messages.get('error', 'Error')}: {e}")
+        return
+
+    root = os.path.abspath(directory)
+
+    def on_change(changed, removed):
+        for results in changed:
+            # push every successfully analyzed file, as analyze does
+            if "error" not in results:
+                send_to_server(build_server_payload(results))
+
+            # one JSON object per line, so editors and dashboards can follow the stream
+            if json_output:
+                print(json.dumps({"event": "changed", "results": results}), flush=True)
+            elif "error" in results:
+                print(f"{os.path.relpath(results['file_path'], root)}: {messages.get('error', 'Error')} {results['error']}", flush=True)
+            else:
+                print(f"{messages.get('file_updated', 'Updated')}: {os.path.relpath(results['file_path'], root)}", flush=True)
+
+        for path in removed:
+            if json_output:
+                print(json.dumps({"event": "removed", "file_path": path}), flush=True)
+            else:
+                print(f"{messages.get('file_removed', 'Removed')}: {os.path.relpath(path, root)}", flush=True)
+
+    if not json_output:
+        print(f"{messages.get('watching_directory', 'Watching directory')}: {directory} ({messages.get('stop_hint', 'press Ctrl+C to stop')})", flush=True)
+    try:
+        watcher.run(on_change, interval=interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if cache is not None:
+            cache.prune()
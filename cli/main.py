@@ -2,16 +2,16 @@ import os
 import sys
 import typer
 
-# import commands
-from cli.commands.translate import translate_command
-from cli.commands.hello import hello_command
-from cli.commands.version import version_command
-from cli.commands.analyze import analyze_command
-from cli.commands.export.export import export_command
+# command modules are imported inside each command, so a command only loads the libraries
+# it uses (InquirerPy, requests, rich tables, the analyzers...) and "spice version" starts fast
 
 # initialize typer
 app = typer.Typer()
 
+# "spice cache ..." subcommands
+cache_app = typer.Typer(help="Manage the analysis result cache.")
+app.add_typer(cache_app, name="cache")
+
 # add the current directory (cli) to the sys.path
 sys.path.append('cli')
 
@@ -26,6 +26,7 @@ def translate():
     """
     Set the language for CLI messages.
     """
+    from cli.commands.translate import translate_command
     translate_command(LANG_FILE)
 
 @app.command()
@@ -33,6 +34,7 @@ def hello():
     """
     Welcome message.
     """
+    from cli.commands.hello import hello_command
     hello_command(LANG_FILE)
 
 @app.command()
@@ -40,29 +42,81 @@ def version():
     """
     Display the current version of the application.
     """
+    from cli.commands.version import version_command
     version_command(LANG_FILE, CURRENT_DIR)
 
 @app.command()
 def analyze(
     file: str, 
     all: bool = typer.Option(False, "--all", help="Analyze all stats without selection menu"),
-    json_output: bool = typer.Option(False, "--json", help="Output results in JSON format")
+    json_output: bool = typer.Option(False, "--json", help="Output results in JSON format (same as --format json)"),
+    format_type: str = typer.Option(None, "--format", "-f", help="Output format (text, json, ndjson: one JSON line per file as soon as it is analyzed)"),
+    jobs: int = typer.Option(None, "--jobs", "-j", help="Worker processes used when analyzing a directory (default: number of CPUs)"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Ignore cached results and do not store new ones")
 ):
     """
-    Analyze the given file.
+    Analyze the given file, or every supported file in the given directory.
     """
-    analyze_command(file, all, json_output, LANG_FILE)
+    from cli.commands.analyze import analyze_command
+    analyze_command(file, all, json_output, LANG_FILE, jobs, use_cache=not no_cache, output_format=format_type)
 
 @app.command()
 def export(
     file: str,
-    format_type: str = typer.Option("json", "--format", "-f", help="Export format (json, csv, markdown, html)"),
-    output: str = typer.Option(None, "--output", "-o", help="Output file path")
+    format_type: str = typer.Option("json", "--format", "-f", help="Export format (json, csv, markdown, html, sqlite, npz)"),
+    output: str = typer.Option(None, "--output", "-o", help="Output file path"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Ignore cached results and do not store new ones")
 ):
     """
     Analyze a file and export results to a file in the specified format.
     """
-    export_command(file, format_type, output, LANG_FILE)
+    from cli.commands.export.export import export_command
+    export_command(file, format_type, output, LANG_FILE, use_cache=not no_cache)
+
+@app.command()
+def clones(
+    directory: str,
+    json_output: bool = typer.Option(False, "--json", help="Output results in JSON format")
+):
+    """
+    Find code copied between different files of a directory.
+    """
+    from cli.commands.clones import clones_command
+    clones_command(directory, json_output, LANG_FILE)
+
+@app.command()
+def watch(
+    directory: str,
+    interval: float = typer.Option(1.0, "--interval", "-i", help="Seconds between two checks for changed files"),
+    json_output: bool = typer.Option(False, "--json", help="Print one JSON object per changed or removed file"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Ignore cached results and do not store new ones")
+):
+    """
+    Watch a directory and analyze files again as they change.
+    """
+    from cli.commands.watch import watch_command
+    watch_command(directory, interval, json_output, LANG_FILE, use_cache=not no_cache)
+
+@app.command()
+def serve(
+    host: str = typer.Option("127.0.0.1", "--host", help="Address to listen on"),
+    port: int = typer.Option(0, "--port", "-p", help="Port to listen on (default: any free port)"),
+    jobs: int = typer.Option(None, "--jobs", "-j", help="Worker processes (default: number of CPUs)"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Ignore cached results and do not store new ones")
+):
+    """
+    Keep an analysis server running so analyze, editors and CI get results without start-up cost.
+    """
+    from cli.commands.serve import serve_command
+    serve_command(host, port, jobs, LANG_FILE, use_cache=not no_cache)
+
+@cache_app.command("clear")
+def cache_clear():
+    """
+    Remove every cached analysis result.
+    """
+    from cli.commands.cache import cache_clear_command
+    cache_clear_command(LANG_FILE)
 
 def main():
     app()  # run typer
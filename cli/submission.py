@@ -0,0 +1,327 @@
+import atexit
+import json
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+
+from spice.cache import default_cache_dir
+
+# spicecloud endpoints: one result per request, or a list of results in one request
+SERVER_URL = "http://localhost:3000/api/submit"
+SERVER_BATCH_URL = "http://localhost:3000/api/submit/batch"
+
+# seconds to wait for the server on every request
+REQUEST_TIMEOUT = 5
+
+# most results sent together in one batch request
+BATCH_SIZE = 100
+
+# results waiting to be sent; submit() waits for room once the sender is this far behind
+MAX_QUEUED = 1000
+
+# longest time the CLI waits at exit for the queued results to be sent
+FLUSH_TIMEOUT = 10
+
+# results kept on disk for a server that cannot be reached; beyond this many the oldest are dropped
+MAX_SPOOLED = 10_000
+
+# seconds without trying the server after the first failure; doubles with every further failure, up to BACKOFF_MAX
+BACKOFF_BASE = 30
+BACKOFF_MAX = 60 * 60
+
+# shortest pause between two attempts of an idle sender to send the spooled results
+RETRY_INTERVAL = 1
+
+_SPOOL_SCHEMA = """
+CREATE TABLE IF NOT EXISTS spool (
+    id INTEGER PRIMARY KEY,
+    file_path TEXT UNIQUE,
+    payload TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS breaker (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    failures INTEGER NOT NULL,
+    retry_at REAL NOT NULL
+);
+INSERT OR IGNORE INTO breaker (id, failures, retry_at) VALUES (0, 0, 0);
+"""
+
+# put on the queue by close() to stop the sender once everything before it is sent
+_STOP = object()
+
+
+def default_spool_path():
+    """Where results waiting for the server are kept, next to the result cache."""
+    return os.path.join(default_cache_dir(), "submissions.sqlite")
+
+
+class Spool:
+    """Results on their way to spicecloud, kept on disk and shared by every CLI run.
+
+    The Submitter writes each batch here before posting it and deletes what the
+    server received, so results survive a server that is down, slow or stopped in
+    the middle of a request. Only the latest result of each file is kept, like
+    spicecloud itself does, and the results are sent back in the order they came.
+
+    The spool also works as a circuit breaker: after `failures` attempts in a row
+    could not reach the server, no run tries it again for
+    `backoff_base * 2 ** (failures - 1)` seconds (at most `backoff_max`), and the
+    results go straight to disk in the meantime.
+    """
+
+    def __init__(self, path=None, max_entries=MAX_SPOOLED, backoff_base=BACKOFF_BASE, backoff_max=BACKOFF_MAX):
+        self.path = path or default_spool_path()
+        self.max_entries = max_entries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        # written by the sender thread, and by close() when the sender is stuck on the network
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(self.path, check_same_thread=False)
+        self.connection.executescript(_SPOOL_SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def __len__(self):
+        with self._lock:
+            return self.connection.execute("SELECT COUNT(*) FROM spool").fetchone()[0]
+
+    def add(self, payloads):
+        """Keep results until the server has them, replacing older results of the same files."""
+        with self._lock, self.connection:
+            self.connection.executemany("INSERT OR REPLACE INTO spool (file_path, payload) VALUES (?, ?)",
+                                        [(payload.get("file_path"), json.dumps(payload)) for payload in payloads])
+            self.connection.execute("DELETE FROM spool WHERE id NOT IN (SELECT id FROM spool ORDER BY id DESC LIMIT ?)",
+                                    (self.max_entries,))
+
+    def peek(self, limit):
+        """The `limit` oldest results, as (id, payload) pairs."""
+        with self._lock:
+            rows = self.connection.execute("SELECT id, payload FROM spool ORDER BY id LIMIT ?", (limit,)).fetchall()
+        return [(entry_id, json.loads(payload)) for entry_id, payload in rows]
+
+    def remove(self, ids):
+        """Forget results the server received."""
+        with self._lock, self.connection:
+            self.connection.executemany("DELETE FROM spool WHERE id = ?", [(entry_id,) for entry_id in ids])
+
+    def retry_at(self):
+        """Time (as time.time()) before which the server must not be tried again."""
+        with self._lock:
+            return self.connection.execute("SELECT retry_at FROM breaker").fetchone()[0]
+
+    def record_failure(self):
+        """The server could not be reached: back off for twice as long as the previous time."""
+        with self._lock, self.connection:
+            failures = self.connection.execute("SELECT failures FROM breaker").fetchone()[0] + 1
+            delay = min(self.backoff_base * 2 ** (failures - 1), self.backoff_max)
+            self.connection.execute("UPDATE breaker SET failures = ?, retry_at = ?", (failures, time.time() + delay))
+
+    def record_success(self):
+        """The server answered: try it on every batch again."""
+        with self._lock, self.connection:
+            self.connection.execute("UPDATE breaker SET failures = 0, retry_at = 0 WHERE failures != 0")
+
+
+class Submitter:
+    """Sends analysis results to spicecloud from a background thread.
+
+    submit() only puts the result on a bounded queue, so analyzing and printing never
+    wait for the network. The sender thread takes everything queued so far (up to
+    `batch_size` results) and posts it as a single request to the batch endpoint,
+    over one pooled requests.Session that keeps the connection open between requests.
+    Servers without the batch endpoint get the results one by one on that same
+    connection. close() sends whatever is left and stops the thread.
+
+    Every batch goes through the Spool first, so results the server could not
+    take are sent again, oldest first, with the next batch of a later run (or
+    after a while by an idle sender, as in watch mode) once the spool's backoff
+    is over. Until then nothing waits on the network.
+
+    Attributes:
+        added (int): Results the server stored as new
+        updated (int): Results that replaced an earlier analysis of the same file
+        failed (int): Results the server rejected, or that could not be sent nor spooled
+    """
+
+    def __init__(self, url=SERVER_URL, batch_url=SERVER_BATCH_URL, batch_size=BATCH_SIZE,
+                 max_queued=MAX_QUEUED, timeout=REQUEST_TIMEOUT, session=None, spool=None):
+        self.url = url
+        self.batch_url = batch_url
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self.added = 0
+        self.updated = 0
+        self.failed = 0
+        self._queue = queue.Queue(max_queued)
+        self._session = session
+        self._spool = spool
+        self._batch_supported = True
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="spice-submitter", daemon=True)
+        self._thread.start()
+
+    def submit(self, payload):
+        """Queue one result (as built by build_server_payload) to be sent."""
+        self._queue.put(payload)
+
+    def close(self, timeout=FLUSH_TIMEOUT):
+        """Send the results still queued, waiting at most `timeout` seconds, and stop the sender.
+
+        Returns:
+            bool: True if everything queued was sent (or spooled) in time; what the
+                sender had not taken yet is spooled otherwise
+        """
+        if not self._closed:
+            self._closed = True
+            try:
+                self._queue.put(_STOP, timeout=timeout)
+            except queue.Full:
+                self._spool_queued()
+                return False
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            self._spool_queued()
+            return False
+        return True
+
+    def _spool_queued(self):
+        # the sender is stuck on a slow server: keep what it has not taken yet for a later run
+        batch = []
+        while True:
+            try:
+                payload = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if payload is not _STOP:
+                batch.append(payload)
+        if batch and self._spool is not None:
+            try:
+                self._spool.add(batch)
+            except sqlite3.Error:
+                pass
+
+    def _run(self):
+        if self._session is None:
+            import requests  # loaded on this thread, off the CLI's critical path
+            self._session = requests.Session()
+        if self._spool is None:
+            try:
+                self._spool = Spool()
+            except (OSError, sqlite3.Error):
+                pass  # no usable cache directory: send without spooling
+
+        while True:
+            try:
+                batch = [self._queue.get(timeout=self._next_retry())]
+            except queue.Empty:
+                self._deliver([])  # idle: try the spooled results again
+                continue
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = batch[-1] is _STOP
+            if stop:
+                batch.pop()
+            if batch:
+                self._deliver(batch)
+            if stop:
+                return
+
+    def _next_retry(self):
+        """Seconds to wait for new results before sending the spooled ones again, or None to wait for good."""
+        try:
+            if self._spool is None or not len(self._spool):
+                return None
+            return max(self._spool.retry_at() - time.time(), RETRY_INTERVAL)
+        except sqlite3.Error:
+            return None
+
+    def _deliver(self, batch):
+        if self._spool is not None:
+            try:
+                self._spool.add(batch)
+                self._flush_spool()
+                return
+            except sqlite3.Error:
+                self._spool = None  # spool unusable (disk full, corrupt...): send directly from now on
+        self.failed += len(self._send(batch))
+
+    def _flush_spool(self):
+        """Send the spooled results, oldest first, unless the server could not be reached too recently."""
+        while time.time() >= self._spool.retry_at():
+            entries = self._spool.peek(self.batch_size)
+            if not entries:
+                return
+            unsent = self._send([payload for _, payload in entries])
+            self._spool.remove([entry_id for entry_id, _ in entries[:len(entries) - len(unsent)]])
+            if unsent:
+                self._spool.record_failure()
+                return
+            self._spool.record_success()
+
+    def _send(self, batch):
+        """Post the results; return the ones that did not reach the server, to be sent again later."""
+        sent = 0
+        try:
+            if self._batch_supported and len(batch) > 1:
+                response = self._session.post(self.batch_url, json={"files": batch}, timeout=self.timeout)
+                if response.status_code in (404, 405):
+                    self._batch_supported = False  # older server: one request per result from now on
+                else:
+                    if response.status_code == 200:
+                        self._count([result.get("isDuplicate") for result in response.json().get("results", [])])
+                    else:
+                        self.failed += len(batch)  # the server got them but refused them: sending again won't help
+                    return []
+
+            for payload in batch:
+                response = self._session.post(self.url, json=payload, timeout=self.timeout)
+                sent += 1
+                if response.status_code == 200:
+                    self._count([response.json().get("isDuplicate")])
+                else:
+                    self.failed += 1
+        except Exception:
+            # server down, timed out or answering garbage
+            return batch[sent:]
+        return []
+
+    def _count(self, duplicates):
+        self.updated += sum(1 for duplicate in duplicates if duplicate)
+        self.added += sum(1 for duplicate in duplicates if not duplicate)
+
+    def report(self, file=None):
+        """Print what the server received, on stderr so --json output stays valid."""
+        file = file or sys.stderr
+        if self.added == 1:
+            print("✓ New analysis sent to server", file=file)
+        elif self.added:
+            print(f"✓ {self.added} new analyses sent to server", file=file)
+        if self.updated == 1:
+            print("✓ Data updated on server (file was modified)", file=file)
+        elif self.updated:
+            print(f"✓ Data of {self.updated} modified files updated on server", file=file)
+
+
+_submitter = None
+
+
+def get_submitter():
+    """The submitter shared by the whole CLI run, flushed when the process exits."""
+    global _submitter
+    if _submitter is None:
+        _submitter = Submitter()
+        atexit.register(_flush_at_exit, _submitter)
+    return _submitter
+
+
+def _flush_at_exit(submitter):
+    submitter.close()
+    submitter.report()
@@ -40,5 +40,22 @@ messages = {
     "duplicate_percentage": "Duplicate Percentage",
     "average_complexity": "Average Complexity",
     "total_analyzed_functions": "Total Analyzed Functions",
-    "complexity_distribution": "Complexity Distribution"
-}
\ No newline at end of file
+    "complexity_distribution": "Complexity Distribution",
+    # keys for analyzing a whole directory
+    "analyzing_directory": "Analyzing directory",
+    "files_analyzed": "Files Analyzed",
+    "files_failed": "Files Failed",
+    "totals": "Totals",
+    "duplicates_by_directory": "Duplicate Percentage by Directory",
+    # keys for the cache command
+    "cache_cleared": "Analysis cache cleared",
+    # keys for the clones command
+    "clones_found": "Clones found",
+    # keys for the watch command
+    "watching_directory": "Watching directory",
+    "stop_hint": "press Ctrl+C to stop",
+    "file_updated": "Updated",
+    "file_removed": "Removed",
+    # keys for the serve command
+    "serving_on": "Serving on"
+}
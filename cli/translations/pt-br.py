@@ -27,4 +27,22 @@ messages = {
     "private_methods_count_option": "Contagem de Métodos Privados",
     "public_methods_count_option": "Contagem de Métodos Públicos",
     "comment_ratio_option": "Relação Comentário/Código",
+    # chaves para a análise de um diretório inteiro
+    "analyzing_directory": "Analisando diretório",
+    "files_analyzed": "Arquivos Analisados",
+    "files_failed": "Arquivos com Erro",
+    "totals": "Totais",
+    "complexity_distribution": "Distribuição de Complexidade",
+    "duplicates_by_directory": "Percentual de Duplicação por Diretório",
+    # chaves para o comando cache
+    "cache_cleared": "Cache de análises limpo",
+    # chaves para o comando clones
+    "clones_found": "Clones encontrados",
+    # chaves para o comando watch
+    "watching_directory": "Observando diretório",
+    "stop_hint": "pressione Ctrl+C para parar",
+    "file_updated": "Atualizado",
+    "file_removed": "Removido",
+    # chaves para o comando serve
+    "serving_on": "Servindo em",
 }
@@ -1,5 +1,7 @@
 import re
 from ..token import Token, TokenType
+from ..operators import OperatorTrie
+from ..scanner import NEWLINE_RULE, WHITESPACE_RULE, NUMBER_RULE, alternation, build_master_pattern, scan
 
 class JavaScriptLexer:
     # palavras-chave do javascript
@@ -23,6 +25,24 @@ class JavaScriptLexer:
     NUMBER_PATTERN = re.compile(r"\d+(\.\d+)?([eE][+-]?\d+)?")
     IDENTIFIER_PATTERN = re.compile(r"[a-zA-Z_][a-zA-Z0-9_]*")
     
+    # trie dos operadores pro match_operator, montada uma vez só
+    OPERATOR_TRIE = OperatorTrie(OPERATORS)
+    
+    # regex mestre do scanner, com as regras na mesma ordem dos ifs do scan_token
+    MASTER_PATTERN = build_master_pattern([
+        NEWLINE_RULE,
+        WHITESPACE_RULE,
+        # comentários de bloco só quando fecham na mesma linha, os outros ficam pro caminho lento
+        ("COMMENT", r"//[^\n]*|/\*(?!/)(?:[^*\n]|\*(?!/))*\*/"),
+        ("SLOW", r"/\*"),
+        NUMBER_RULE,
+        # só strings de uma linha; escapes de quebra de linha ficam pro caminho lento
+        ("STRING", r""""(?:[^"\\\n]|\\[^\n])*"|'(?:[^'\\\n]|\\[^\n])*'"""),
+        ("WORD", IDENTIFIER_PATTERN.pattern),
+        ("DELIMITER", r"[()\[\]{},;:]"),
+        ("OPERATOR", alternation(OPERATORS)),
+    ])
+    
     def __init__(self, source_code):
         self.source_code = source_code  # código fonte que vai ser tokenizado
         self.position = 0  # posição atual no código
@@ -30,76 +50,73 @@ class JavaScriptLexer:
         self.column = 1  # coluna atual
         self.current_line_start = 0  # início da linha atual
 
-    def tokenize(self):
-        tokens = []  # lista de tokens que vai ser retornada
-        
-        while self.position < len(self.source_code):
-            char = self.source_code[self.position]  # caractere atual
-
-            # ignora espaços em branco
-            if char.isspace():
-                if char == "\n":  # se for uma nova linha
-                    tokens.append(Token(TokenType.NEWLINE, "\\n", self.line, self.column))
-                    self.line += 1  # incrementa a linha
-                    self.column = 1  # reseta a coluna
-                    self.current_line_start = self.position + 1  # atualiza o início da linha
-                else:
-                    self.column += 1  # incrementa a coluna
-                self.position += 1  # vai para o próximo caractere
-                continue
-
-            # se for um comentário (// ou /* ... */)
-            if char == "/":
-                if self.position + 1 < len(self.source_code):
-                    next_char = self.source_code[self.position + 1]
-                    if next_char == "/":  # comentário de linha única
-                        comment_token = self.tokenize_single_line_comment()
-                        tokens.append(comment_token)
-                        continue
-                    elif next_char == "*":  # comentário de múltiplas linhas
-                        comment_token = self.tokenize_multi_line_comment()
-                        tokens.append(comment_token)
-                        continue
-
-            # se for um número
-            if char.isdigit():
-                token = self.tokenize_number()  # tokeniza o número
-                tokens.append(token)  # adiciona na lista de tokens
-                continue
-
-            # se for uma string (aspas simples ou duplas)
-            if char in {'"', "'"}:
-                token = self.tokenize_string()  # tokeniza a string
-                tokens.append(token)  # adiciona na lista de tokens
-                continue
-
-            # se for um identificador (começa com letra ou _)
-            if char.isalpha() or char == "_":
-                token = self.tokenize_identifier()  # tokeniza o identificador
-                tokens.append(token)  # adiciona na lista de tokens
-                continue
+    def iter_tokens(self):
+        """gera os tokens um por um com a regex mestre (veja lexers/scanner.py), sem montar a lista inteira."""
+        return scan(self)
 
-            # se for um delimitador (colchetes, parênteses, etc.)
-            if char in "()[]{},;:":
-                tokens.append(Token(TokenType.DELIMITER, char, self.line, self.column))
+    def tokenize(self):
+        """tokeniza o código todo e devolve a lista de tokens."""
+        return list(self.iter_tokens())
+
+    def scan_token(self):
+        """tokeniza um único token na posição atual, caractere por caractere.
+
+        é o caminho lento do scanner, usado quando a regex mestre não casa.
+        retorna None quando só consome espaço em branco.
+        """
+        char = self.source_code[self.position]  # caractere atual
+
+        # ignora espaços em branco
+        if char.isspace():
+            if char == "\n":  # se for uma nova linha
+                token = Token(TokenType.NEWLINE, "\\n", self.line, self.column)
+                self.line += 1  # incrementa a linha
+                self.column = 1  # reseta a coluna
+                self.current_line_start = self.position + 1  # atualiza o início da linha
                 self.position += 1  # vai para o próximo caractere
-                self.column += 1  # incrementa a coluna
-                continue
-
-            # se for um operador
-            if match := self.match_operator():
-                tokens.append(match)  # adiciona o operador na lista de tokens
-                continue
-
-            # se chegou aqui, é um caractere desconhecido (erro)
-            error_char = self.source_code[self.position]
-            tokens.append(Token(TokenType.ERROR, error_char, self.line, self.column))
+                return token
+            self.column += 1  # incrementa a coluna
+            self.position += 1  # vai para o próximo caractere
+            return None
+
+        # se for um comentário (// ou /* ... */)
+        if char == "/":
+            if self.position + 1 < len(self.source_code):
+                next_char = self.source_code[self.position + 1]
+                if next_char == "/":  # comentário de linha única
+                    return self.tokenize_single_line_comment()
+                elif next_char == "*":  # comentário de múltiplas linhas
+                    return self.tokenize_multi_line_comment()
+
+        # se for um número
+        if char.isdigit():
+            return self.tokenize_number()  # tokeniza o número
+
+        # se for uma string (aspas simples ou duplas)
+        if char in {'"', "'"}:
+            return self.tokenize_string()  # tokeniza a string
+
+        # se for um identificador (começa com letra ou _)
+        if char.isalpha() or char == "_":
+            return self.tokenize_identifier()  # tokeniza o identificador
+
+        # se for um delimitador (colchetes, parênteses, etc.)
+        if char in "()[]{},;:":
+            token = Token(TokenType.DELIMITER, char, self.line, self.column)
             self.position += 1  # vai para o próximo caractere
             self.column += 1  # incrementa a coluna
+            return token
+
+        # se for um operador
+        if match := self.match_operator():
+            return match
 
-        # adiciona o token de fim de arquivo (eof)
-        tokens.append(Token(TokenType.EOF, "EOF", self.line, self.column))
-        return tokens
+        # se chegou aqui, é um caractere desconhecido (erro)
+        error_char = self.source_code[self.position]
+        token = Token(TokenType.ERROR, error_char, self.line, self.column)
+        self.position += 1  # vai para o próximo caractere
+        self.column += 1  # incrementa a coluna
+        return token
 
     def tokenize_single_line_comment(self):
         """tokeniza um comentário de linha única (// ...)."""
@@ -142,7 +159,7 @@ class JavaScriptLexer:
     def tokenize_number(self):
         """tokeniza um número (inteiro, decimal ou notação científica)."""
         start_pos = self.position  # posição inicial do número
-        match = self.NUMBER_PATTERN.match(self.source_code[self.position:])  # tenta casar com o regex de número
+        match = self.NUMBER_PATTERN.match(self.source_code, self.position)  # tenta casar com o regex de número
         if match:
             number = match.group(0)  # pega o número
             self.position += len(number)  # avança a posição
@@ -171,7 +188,7 @@ class JavaScriptLexer:
         start_col = self.column  # coluna inicial do identificador
         
         # Usa o padrão de regex para identificadores ou faz a tokenização manual
-        match = self.IDENTIFIER_PATTERN.match(self.source_code[self.position:])
+        match = self.IDENTIFIER_PATTERN.match(self.source_code, self.position)
         if match:
             identifier = match.group(0)  # pega o identificador
             self.position += len(identifier)  # avança a posição
@@ -183,11 +200,13 @@ class JavaScriptLexer:
                 self.column += 1
             identifier = self.source_code[start_pos:self.position]  # pega o texto do identificador
         
-        # verifica se é uma palavra-chave
-        if identifier in self.KEYWORDS:
-            return Token(TokenType.KEYWORD, identifier, self.line, start_col)
-        else:
-            return Token(TokenType.IDENTIFIER, identifier, self.line, start_col)
+        return Token(self.word_type(identifier, self.position), identifier, self.line, start_col)
+
+    def word_type(self, word, end):
+        """diz se a palavra é uma palavra-chave ou um identificador."""
+        if word in self.KEYWORDS:
+            return TokenType.KEYWORD
+        return TokenType.IDENTIFIER
 
     def tokenize_string(self):
         """tokeniza uma string (aspas simples ou duplas)."""
@@ -223,10 +242,11 @@ class JavaScriptLexer:
 
     def match_operator(self):
         """tenta casar com um operador."""
-        for op in sorted(self.OPERATORS, key=len, reverse=True):  # verifica operadores mais longos primeiro
-            if self.source_code.startswith(op, self.position):
-                token = Token(TokenType.OPERATOR, op, self.line, self.column)
-                self.position += len(op)
-                self.column += len(op)
-                return token
-        return None
+        # longest match pela trie de operadores
+        op = self.OPERATOR_TRIE.match(self.source_code, self.position)
+        if op is None:
+            return None
+        token = Token(TokenType.OPERATOR, op, self.line, self.column)
+        self.position += len(op)
+        self.column += len(op)
+        return token
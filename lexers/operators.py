@@ -0,0 +1,27 @@
+class OperatorTrie:
+    """trie de operadores, montada uma vez por classe de lexer.
+
+    acha o operador mais longo que começa numa posição do código andando no máximo
+    len(maior operador) caracteres, sem ordenar nem fatiar nada a cada chamada.
+    """
+
+    def __init__(self, operators):
+        self.root = {}
+        for op in operators:
+            node = self.root
+            for char in op:
+                node = node.setdefault(char, {})
+            node[None] = op  # a chave None marca o fim de um operador
+
+    def match(self, source, position):
+        """devolve o operador mais longo que começa em source[position], ou None."""
+        node = self.root
+        longest = None
+        length = len(source)
+        while position < length:
+            node = node.get(source[position])
+            if node is None:
+                break
+            longest = node.get(None, longest)
+            position += 1
+        return longest
@@ -1,5 +1,7 @@
 import re
 from ..token import Token, TokenType
+from ..operators import OperatorTrie
+from ..scanner import NEWLINE_RULE, WHITESPACE_RULE, NUMBER_RULE, alternation, build_master_pattern, scan
 
 class PythonLexer:
     # palavras-chave do python
@@ -21,6 +23,22 @@ class PythonLexer:
     NUMBER_PATTERN = re.compile(r"\d+(\.\d+)?([eE][+-]?\d+)?")
     IDENTIFIER_PATTERN = re.compile(r"[a-zA-Z_][a-zA-Z0-9_]*")
     
+    # trie dos operadores pro match_operator, montada uma vez só
+    OPERATOR_TRIE = OperatorTrie(OPERATORS)
+    
+    # regex mestre do scanner, com as regras na mesma ordem dos ifs do scan_token
+    MASTER_PATTERN = build_master_pattern([
+        NEWLINE_RULE,
+        WHITESPACE_RULE,
+        ("COMMENT", r"#[^\n]*"),
+        NUMBER_RULE,
+        # só strings simples de uma linha; aspas triplas e escapes de quebra de linha ficam pro caminho lento
+        ("STRING", r""""(?!"")(?:[^"\\\n]|\\[^\n])*"|'(?!'')(?:[^'\\\n]|\\[^\n])*'"""),
+        ("WORD", r"[a-zA-Z_]\w*"),
+        ("DELIMITER", r"[()\[\]{},:.;@]"),
+        ("OPERATOR", alternation(OPERATORS)),
+    ])
+    
     def __init__(self, source_code):
         self.source_code = source_code  # código fonte que vai ser tokenizado
         self.position = 0  # posição atual no código
@@ -28,69 +46,68 @@ class PythonLexer:
         self.column = 1  # coluna atual
         self.current_line_start = 0  # início da linha atual
 
+    def iter_tokens(self):
+        """gera os tokens um por um com a regex mestre (veja lexers/scanner.py), sem montar a lista inteira."""
+        return scan(self)
+
     def tokenize(self):
-        tokens = []  # lista de tokens que vai ser retornada
-        
-        while self.position < len(self.source_code):
-            char = self.source_code[self.position]  # caractere atual
-
-            # ignora espaços em branco
-            if char.isspace():
-                if char == "\n":  # se for uma nova linha
-                    tokens.append(Token(TokenType.NEWLINE, "\\n", self.line, self.column))
-                    self.line += 1  # incrementa a linha
-                    self.column = 1  # reseta a coluna
-                    self.current_line_start = self.position + 1  # atualiza o início da linha
-                else:
-                    self.column += 1  # incrementa a coluna
+        """tokeniza o código todo e devolve a lista de tokens."""
+        return list(self.iter_tokens())
+
+    def scan_token(self):
+        """tokeniza um único token na posição atual, caractere por caractere.
+
+        é o caminho lento do scanner, usado quando a regex mestre não casa.
+        retorna None quando só consome espaço em branco.
+        """
+        char = self.source_code[self.position]  # caractere atual
+
+        # ignora espaços em branco
+        if char.isspace():
+            if char == "\n":  # se for uma nova linha
+                token = Token(TokenType.NEWLINE, "\\n", self.line, self.column)
+                self.line += 1  # incrementa a linha
+                self.column = 1  # reseta a coluna
+                self.current_line_start = self.position + 1  # atualiza o início da linha
                 self.position += 1  # vai pro próximo caractere
-                continue
+                return token
+            self.column += 1  # incrementa a coluna
+            self.position += 1  # vai pro próximo caractere
+            return None
 
-            # se for um comentário (começa com #)
-            if char == "#":
-                comment_token = self.tokenize_comment()  # tokeniza o comentário
-                tokens.append(comment_token)  # adiciona na lista de tokens
-                continue
+        # se for um comentário (começa com #)
+        if char == "#":
+            return self.tokenize_comment()  # tokeniza o comentário
 
-            # se for um número
-            if char.isdigit():
-                token = self.tokenize_number()  # tokeniza o número
-                tokens.append(token)  # adiciona na lista de tokens
-                continue
+        # se for um número
+        if char.isdigit():
+            return self.tokenize_number()  # tokeniza o número
 
-            # se for uma string (aspas simples ou duplas)
-            if char in {'"', "'"}:
-                token = self.tokenize_string()  # tokeniza a string
-                tokens.append(token)  # adiciona na lista de tokens
-                continue
+        # se for uma string (aspas simples ou duplas)
+        if char in {'"', "'"}:
+            return self.tokenize_string()  # tokeniza a string
 
-            # se for um identificador (começa com letra ou _)
-            if char.isalpha() or char == "_":
-                token = self.tokenize_identifier()  # tokeniza o identificador
-                tokens.append(token)  # adiciona na lista de tokens
-                continue
+        # se for um identificador (começa com letra ou _)
+        if char.isalpha() or char == "_":
+            return self.tokenize_identifier()  # tokeniza o identificador
 
-            # se for um delimitador (colchetes, parênteses, etc.)
-            if char in "()[]{},:.;@":
-                tokens.append(Token(TokenType.DELIMITER, char, self.line, self.column))
-                self.position += 1  # vai pro próximo caractere
-                self.column += 1  # incrementa a coluna
-                continue
-
-            # se for um operador
-            if match := self.match_operator():
-                tokens.append(match)  # adiciona o operador na lista de tokens
-                continue
-
-            # se chegou aqui, é um caractere desconhecido (erro)
-            error_char = self.source_code[self.position]
-            tokens.append(Token(TokenType.ERROR, error_char, self.line, self.column))
+        # se for um delimitador (colchetes, parênteses, etc.)
+        if char in "()[]{},:.;@":
+            token = Token(TokenType.DELIMITER, char, self.line, self.column)
             self.position += 1  # vai pro próximo caractere
             self.column += 1  # incrementa a coluna
+            return token
+
+        # se for um operador
+        if match := self.match_operator():
+            return match
 
-        # adiciona o token de fim de arquivo (EOF)
-        tokens.append(Token(TokenType.EOF, "EOF", self.line, self.column))
-        return tokens
+        # se chegou aqui, é um caractere desconhecido (erro)
+        error_char = self.source_code[self.position]
+        token = Token(TokenType.ERROR, error_char, self.line, self.column)
+        self.position += 1  # vai pro próximo caractere
+        self.column += 1  # incrementa a coluna
+        return token
 
     def tokenize_comment(self):
         """tokeniza um comentário (tudo depois de # até o fim da linha)."""
@@ -108,7 +125,7 @@ class PythonLexer:
     def tokenize_number(self):
         """tokeniza um número (inteiro, decimal ou notação científica)."""
         start_pos = self.position  # posição inicial do número
-        match = self.NUMBER_PATTERN.match(self.source_code[self.position:])  # tenta casar com o regex de número
+        match = self.NUMBER_PATTERN.match(self.source_code, self.position)  # tenta casar com o regex de número
         if match:
             number = match.group(0)  # pega o número
             self.position += len(number)  # avança a posição
@@ -142,16 +159,15 @@ class PythonLexer:
             self.column += 1
             
         word = self.source_code[start_pos:self.position]  # pega o texto do identificador
-        
-        # verifica se é uma palavra-chave ou um valor booleano/nulo
+        return Token(self.word_type(word, self.position), word, self.line, start_col)
+
+    def word_type(self, word, end):
+        """diz se a palavra é uma palavra-chave, um valor booleano/nulo ou um identificador."""
         if word in self.KEYWORDS:
-            token_type = TokenType.KEYWORD
+            return TokenType.KEYWORD
         elif word in ["True", "False", "None"]:
-            token_type = TokenType.BOOLEAN
-        else:
-            token_type = TokenType.IDENTIFIER
-            
-        return Token(token_type, word, self.line, start_col)
+            return TokenType.BOOLEAN
+        return TokenType.IDENTIFIER
 
     def tokenize_string(self):
         """tokeniza uma string (aspas simples, duplas ou triplas)."""
@@ -172,14 +188,19 @@ class PythonLexer:
             
             # se tiver uma barra invertida (escape), ignora o próximo caractere
             if char == '\\' and self.position + 1 < len(self.source_code):
+                if self.source_code[self.position + 1] == '\n':  # barra no fim da linha: a string continua na próxima
+                    self.line += 1
+                    self.column = 1
+                    self.current_line_start = self.position + 2
+                else:
+                    self.column += 2
                 self.position += 2
-                self.column += 2
                 continue
                 
-            # se encontrar as aspas de fechamento, termina a string
-            if char == quote_char:
-                self.position += 1
-                self.column += 1
+            # se encontrar as aspas de fechamento, termina a string (compara as três aspas de uma vez nas triplas)
+            if self.source_code.startswith(quote_char, self.position):
+                self.position += len(quote_char)
+                self.column += len(quote_char)
                 return Token(TokenType.STRING, self.source_code[start_pos:self.position], self.line, start_col)
                 
             # se tiver uma nova linha, atualiza a linha e a coluna
@@ -197,14 +218,14 @@ class PythonLexer:
 
     def match_operator(self):
         """tenta casar com um operador (e.g., +, -, ==, etc.)."""
-        # ordena os operadores pelo tamanho pra pegar os maiores primeiro
-        for op in sorted(self.OPERATORS, key=len, reverse=True):
-            if self.source_code[self.position:self.position + len(op)] == op:
-                token = Token(TokenType.OPERATOR, op, self.line, self.column)
-                self.position += len(op)
-                self.column += len(op)
-                return token
-        return None
+        # longest match pela trie de operadores
+        op = self.OPERATOR_TRIE.match(self.source_code, self.position)
+        if op is None:
+            return None
+        token = Token(TokenType.OPERATOR, op, self.line, self.column)
+        self.position += len(op)
+        self.column += len(op)
+        return token
     
     def get_current_line(self):
         """pega a linha atual do código (útil pra mensagens de erro)."""
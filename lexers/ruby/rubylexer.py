@@ -1,5 +1,7 @@
 import re
 from ..token import Token, TokenType
+from ..operators import OperatorTrie
+from ..scanner import NEWLINE_RULE, WHITESPACE_RULE, NUMBER_RULE, alternation, build_master_pattern, scan
 
 class RubyLexer:
     # Ruby keywords
@@ -20,6 +22,23 @@ class RubyLexer:
     SYMBOL_PATTERN = re.compile(r":([a-zA-Z_][a-zA-Z0-9_]*|[-+/*!%^&*=<>?]|\[\]=?|<<|>>)")
     NUMBER_PATTERN = re.compile(r"\d+(\.\d+)?([eE][+-]?\d+)?")
     
+    # operator trie for match_operator, built once per class
+    OPERATOR_TRIE = OperatorTrie(OPERATORS)
+    
+    # single regex for the scanner, rules in the same order as the ifs in scan_token
+    # (@vars, $vars, multi-line strings and interpolation are left to the slow path)
+    MASTER_PATTERN = build_master_pattern([
+        NEWLINE_RULE,
+        WHITESPACE_RULE,
+        ("COMMENT", r"#[^\n]*"),
+        NUMBER_RULE,
+        ("STRING", r"'(?:[^'\\\n]|\\[^\n])*'" + r'|"(?:[^"\\\n#]|#(?!\{)|\\[^\n])*"'),
+        ("WORD", r"[a-zA-Z_][\w?]*"),
+        ("DELIMITER", r"[(){}\[\]]"),
+        ("OPERATOR", alternation(OPERATORS)),
+        ("SYMBOL", SYMBOL_PATTERN.pattern),
+    ])
+    
     def __init__(self, source_code):
         self.source_code = source_code
         self.position = 0
@@ -27,111 +46,109 @@ class RubyLexer:
         self.column = 1
         self.current_line_start = 0
 
+    def iter_tokens(self):
+        """Yield tokens one at a time with the master regex (see lexers/scanner.py), without building a list"""
+        return scan(self)
+
     def tokenize(self):
-        tokens = []
-        
-        while self.position < len(self.source_code):
-            char = self.source_code[self.position]
+        """Tokenize the whole source and return the list of tokens"""
+        return list(self.iter_tokens())
 
-            # handle whitespace
-            if char.isspace():
-                if char == "\n":
-                    tokens.append(Token(TokenType.NEWLINE, "\\n", self.line, self.column))
-                    self.line += 1
-                    self.column = 1
-                    self.current_line_start = self.position + 1
-                else:
-                    self.column += 1
+    def scan_token(self):
+        """Tokenize a single token at the current position, one character at a time.
+
+        This is the scanner's slow path, used when the master regex does not match.
+        Returns None when only whitespace was consumed.
+        """
+        char = self.source_code[self.position]
+
+        # handle whitespace
+        if char.isspace():
+            if char == "\n":
+                token = Token(TokenType.NEWLINE, "\\n", self.line, self.column)
+                self.line += 1
+                self.column = 1
+                self.current_line_start = self.position + 1
                 self.position += 1
-                continue
+                return token
+            self.column += 1
+            self.position += 1
+            return None
 
-            # handle comments
-            if char == "#":
-                comment_token = self.tokenize_comment()
-                tokens.append(comment_token)
-                continue
+        # handle comments
+        if char == "#":
+            return self.tokenize_comment()
 
-            # handle numbers
-            if char.isdigit():
-                token = self.tokenize_number()
-                tokens.append(token)
-                continue
+        # handle numbers
+        if char.isdigit():
+            return self.tokenize_number()
 
-            # handle strings with something called interpolation awareness whatever that means
-            if char in {'"', "'"}:
-                token = self.tokenize_string()
-                tokens.append(token)
-                continue
+        # handle strings with something called interpolation awareness whatever that means
+        if char in {'"', "'"}:
+            return self.tokenize_string()
 
-            # handle identifiers and keywords
-            if char.isalpha() or char == "_":
-                token = self.tokenize_identifier()
-                tokens.append(token)
-                continue
+        # handle identifiers and keywords
+        if char.isalpha() or char == "_":
+            return self.tokenize_identifier()
 
-            # handle special delimiters used in blocks
-            if char in "({[]})" and self.position < len(self.source_code):
-                tokens.append(Token(TokenType.DELIMITER, char, self.line, self.column))
-                self.position += 1
-                self.column += 1
-                continue
+        # handle special delimiters used in blocks
+        if char in "({[]})" and self.position < len(self.source_code):
+            token = Token(TokenType.DELIMITER, char, self.line, self.column)
+            self.position += 1
+            self.column += 1
+            return token
 
-            # handle operators
-            if match := self.match_operator():
-                tokens.append(match)
-                continue
+        # handle operators
+        if match := self.match_operator():
+            return match
 
-            # handle symbols
-            if char == ':':
-                symbol_match = self.SYMBOL_PATTERN.match(self.source_code[self.position:])
-                if symbol_match:
-                    symbol = symbol_match.group(0)
-                    tokens.append(Token(TokenType.SYMBOL, symbol, self.line, self.column))
-                    self.position += len(symbol)
-                    self.column += len(symbol)
-                    continue
+        # handle symbols
+        if char == ':':
+            symbol_match = self.SYMBOL_PATTERN.match(self.source_code, self.position)
+            if symbol_match:
+                symbol = symbol_match.group(0)
+                token = Token(TokenType.SYMBOL, symbol, self.line, self.column)
+                self.position += len(symbol)
+                self.column += len(symbol)
+                return token
 
-            # handle special for like instance variables (@var) and class variables (@@var)
-            if char == '@' and self.position + 1 < len(self.source_code):
-                start_pos = self.position
-                self.position += 1  # sjip @
+        # handle special for like instance variables (@var) and class variables (@@var)
+        if char == '@' and self.position + 1 < len(self.source_code):
+            start_pos = self.position
+            self.position += 1  # sjip @
+            self.column += 1
+            
+            # check for class variable (@@)
+            if self.position < len(self.source_code) and self.source_code[self.position] == '@':
+                self.position += 1
                 self.column += 1
-                
-                # check for class variable (@@)
-                if self.position < len(self.source_code) and self.source_code[self.position] == '@':
+            
+            # parse  variable name
+            if self.position < len(self.source_code) and (self.source_code[self.position].isalpha() or self.source_code[self.position] == '_'):
+                while self.position < len(self.source_code) and (self.source_code[self.position].isalnum() or self.source_code[self.position] == '_'):
                     self.position += 1
                     self.column += 1
-                
-                # parse  variable name
-                if self.position < len(self.source_code) and (self.source_code[self.position].isalpha() or self.source_code[self.position] == '_'):
-                    while self.position < len(self.source_code) and (self.source_code[self.position].isalnum() or self.source_code[self.position] == '_'):
-                        self.position += 1
-                        self.column += 1
-                    tokens.append(Token(TokenType.INSTANCE_VAR, self.source_code[start_pos:self.position], self.line, self.column))
-                    continue
+                return Token(TokenType.INSTANCE_VAR, self.source_code[start_pos:self.position], self.line, self.column)
 
-            # handle global variables ($var)
-            if char == '$' and self.position + 1 < len(self.source_code):
-                start_pos = self.position
-                self.position += 1  # skip $
-                self.column += 1
-                
-                # parase variable name or special global variable
-                if self.position < len(self.source_code) and (self.source_code[self.position].isalnum() or self.source_code[self.position] in '_!@&+`\'=~/\\,;.<>*$?:'):
-                    while self.position < len(self.source_code) and (self.source_code[self.position].isalnum() or self.source_code[self.position] == '_'):
-                        self.position += 1
-                        self.column += 1
-                    tokens.append(Token(TokenType.GLOBAL_VAR, self.source_code[start_pos:self.position], self.line, self.column))
-                    continue
-
-            # unknown character - emit an error token but continue processing keep going never stop
-            error_char = self.source_code[self.position]
-            tokens.append(Token(TokenType.ERROR, error_char, self.line, self.column))
-            self.position += 1
+        # handle global variables ($var)
+        if char == '$' and self.position + 1 < len(self.source_code):
+            start_pos = self.position
+            self.position += 1  # skip $
             self.column += 1
+            
+            # parase variable name or special global variable
+            if self.position < len(self.source_code) and (self.source_code[self.position].isalnum() or self.source_code[self.position] in '_!@&+`\'=~/\\,;.<>*$?:'):
+                while self.position < len(self.source_code) and (self.source_code[self.position].isalnum() or self.source_code[self.position] == '_'):
+                    self.position += 1
+                    self.column += 1
+                return Token(TokenType.GLOBAL_VAR, self.source_code[start_pos:self.position], self.line, self.column)
 
-        tokens.append(Token(TokenType.EOF, "EOF", self.line, self.column))
-        return tokens
+        # unknown character - emit an error token but continue processing keep going never stop
+        error_char = self.source_code[self.position]
+        token = Token(TokenType.ERROR, error_char, self.line, self.column)
+        self.position += 1
+        self.column += 1
+        return token
 
     def tokenize_comment(self):
         """Tokenize a comment and return it as a COMMENT token instead of skipping it"""
@@ -149,7 +166,7 @@ class RubyLexer:
         start_pos = self.position
         
         # use regex to match complex number patterns
-        match = self.NUMBER_PATTERN.match(self.source_code[self.position:])
+        match = self.NUMBER_PATTERN.match(self.source_code, self.position)
         if match:
             number = match.group(0)
             self.position += len(number)
@@ -181,22 +198,21 @@ class RubyLexer:
             self.column += 1
             
         word = self.source_code[start_pos:self.position]
-        
+        return Token(self.word_type(word, self.position), word, self.line, start_col)
+
+    def word_type(self, word, end):
+        """Token type of a word ending at position `end`: keyword, boolean, method call or identifier"""
         # check if it's a keyword or a boolean literal
         if word in self.KEYWORDS:
-            token_type = TokenType.KEYWORD
+            return TokenType.KEYWORD
         elif word in ["true", "false", "nil"]:
-            token_type = TokenType.BOOLEAN
-        else:
-            token_type = TokenType.IDENTIFIER
+            return TokenType.BOOLEAN
             
         # check for method calls (identifier followed by dot)
-        if (token_type == TokenType.IDENTIFIER and 
-            self.position < len(self.source_code) and 
-            self.source_code[self.position] == '.'):
-            return Token(TokenType.METHOD_CALL, word, self.line, start_col)
+        if end < len(self.source_code) and self.source_code[end] == '.':
+            return TokenType.METHOD_CALL
             
-        return Token(token_type, word, self.line, start_col)
+        return TokenType.IDENTIFIER
 
     def tokenize_string(self):
         quote_char = self.source_code[self.position]
@@ -250,14 +266,14 @@ class RubyLexer:
         return Token(TokenType.ERROR, f"Unclosed string: {self.source_code[start_pos:self.position]}", self.line, start_col)
 
     def match_operator(self):
-        # sort operators by length to match longest first
-        for op in sorted(self.OPERATORS, key=len, reverse=True):
-            if self.source_code[self.position:self.position + len(op)] == op:
-                token = Token(TokenType.OPERATOR, op, self.line, self.column)
-                self.position += len(op)
-                self.column += len(op)
-                return token
-        return None
+        # longest match through the precomputed operator trie
+        op = self.OPERATOR_TRIE.match(self.source_code, self.position)
+        if op is None:
+            return None
+        token = Token(TokenType.OPERATOR, op, self.line, self.column)
+        self.position += len(op)
+        self.column += len(op)
+        return token
     
     def get_current_line(self):
         """Get the current line of code being processed (for error reporting)"""
@@ -0,0 +1,91 @@
+import re
+from .token import Token, TokenType
+
+# regras comuns a todas as linguagens
+NEWLINE_RULE = ("NEWLINE", r"\n")
+WHITESPACE_RULE = ("SKIP", r"[^\S\n]+")  # qualquer espaço em branco menos a quebra de linha
+NUMBER_RULE = ("NUMBER", r"\d+(?:\.\d+)?(?:[eE][+-]?\d+)?")  # mesmo padrão do NUMBER_PATTERN dos lexers
+
+
+def alternation(strings):
+    """monta uma regex que casa qualquer uma das strings, tentando as mais longas primeiro."""
+    return "|".join(re.escape(s) for s in sorted(strings, key=len, reverse=True))
+
+
+def build_master_pattern(rules):
+    """junta as regras (nome, regex) numa única regex compilada, com um grupo nomeado por regra.
+
+    a ordem das regras é a ordem de prioridade (a mesma ordem dos ifs do tokenize antigo).
+    o nome do grupo diz o que fazer com o texto casado:
+        - NEWLINE: gera um token de nova linha e avança a linha
+        - SKIP: espaço em branco, só avança a coluna
+        - WORD: identificador ou palavra-chave, o tipo é decidido por lexer.word_type()
+        - SLOW: começo de um token que só o caminho lento sabe resolver (impede
+          que uma regra de menor prioridade case no lugar dele)
+        - qualquer outro nome: gera um token do TokenType com esse nome
+    as regras só podem casar texto sem quebra de linha (menos a NEWLINE).
+    """
+    return re.compile("|".join(f"(?P<{name}>{pattern})" for name, pattern in rules))
+
+
+def scan(lexer):
+    """gera os tokens de lexer.source_code, terminando com o EOF (veja scan_spans)."""
+    for token_type, value, line, column, _, _ in scan_spans(lexer):
+        yield Token(token_type, value, line, column)
+
+
+def scan_spans(lexer):
+    """gera os tokens de lexer.source_code usando o lexer.MASTER_PATTERN, terminando com o EOF.
+
+    cada token sai como uma tupla (tipo, valor, linha, coluna, início, fim), onde
+    início e fim são as posições do texto do token no código; assim o TokenBuffer
+    guarda os tokens sem criar um objeto Token pra cada um.
+
+    cada token é reconhecido por um único match da regex mestre na posição atual.
+    quando a regex não casa (caracteres unicode, strings ou comentários de várias
+    linhas, erros, etc.), o token é resolvido pelo lexer.scan_token(), que é o
+    tokenizador antigo caractere por caractere, então a lista de tokens é
+    exatamente a mesma de antes, só que bem mais rápida.
+
+    é um gerador: os tokens saem à medida que são reconhecidos, então quem só
+    precisa percorrê-los uma vez não guarda o arquivo inteiro em memória.
+    """
+    source = lexer.source_code
+    length = len(source)
+    match = lexer.MASTER_PATTERN.match
+    word_type = lexer.word_type
+
+    position, line, column = lexer.position, lexer.line, lexer.column
+
+    while position < length:
+        m = match(source, position)
+        kind = m.lastgroup if m else "SLOW"
+
+        # caminho lento: devolve o estado pro lexer e deixa ele resolver um token
+        if kind == "SLOW":
+            lexer.position, lexer.line, lexer.column = position, line, column
+            token = lexer.scan_token()
+            start, position, line, column = position, lexer.position, lexer.line, lexer.column
+            if token is not None:
+                yield token.type, token.value, token.line, token.column, start, position
+            continue
+
+        end = m.end()
+        if kind == "NEWLINE":
+            yield TokenType.NEWLINE, "\\n", line, column, position, end
+            line += 1
+            column = 1
+            lexer.current_line_start = end
+        elif kind == "SKIP":
+            column += end - position
+        else:
+            value = m.group()
+            token_type = word_type(value, end) if kind == "WORD" else TokenType[kind]
+            yield token_type, value, line, column, position, end
+            column += end - position
+        position = end
+
+    lexer.position, lexer.line, lexer.column = position, line, column
+
+    # adiciona o token de fim de arquivo (EOF)
+    yield TokenType.EOF, "EOF", line, column, position, position
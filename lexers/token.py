@@ -23,6 +23,9 @@ class TokenType(Enum):
     EOF = auto()
 
 class Token:
+    # no per-instance __dict__: large files produce millions of tokens
+    __slots__ = ("type", "value", "line", "column")
+
     def __init__(self, token_type, value, line, column):
         self.type = token_type
         self.value = value
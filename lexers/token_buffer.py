@@ -0,0 +1,90 @@
+from array import array
+
+from .scanner import scan_spans
+from .token import Token, TokenType
+
+# token types whose value is not the source text they cover
+_FIXED_VALUES = {TokenType.NEWLINE.value: "\\n", TokenType.EOF.value: "EOF"}
+
+
+class TokenBuffer:
+    """Columnar storage for a token stream.
+
+    Instead of one Token object per token, the buffer keeps five flat integer
+    arrays: type codes (TokenType values), start and end offsets into the source,
+    line and column. Token values are not stored; they are sliced out of the source
+    on demand. The few tokens whose value is not their source text (error messages
+    for unclosed strings, for instance) are kept in a small side table.
+
+    The arrays can be viewed as NumPy arrays without copying (see `as_numpy`), so
+    analyzers that only need types and lines can work on whole columns at once.
+    """
+
+    def __init__(self, source):
+        self.source = source
+        self.types = array("i")
+        self.starts = array("i")
+        self.ends = array("i")
+        self.lines = array("i")
+        self.columns = array("i")
+        self._values = {}  # token index -> value, when it is not source[start:end]
+
+    @classmethod
+    def from_lexer(cls, lexer):
+        """Lex `lexer.source_code` straight into a buffer, without creating Token objects."""
+        buffer = cls(lexer.source_code)
+        source = buffer.source
+        values = buffer._values
+        append_type, append_start, append_end = buffer.types.append, buffer.starts.append, buffer.ends.append
+        append_line, append_column = buffer.lines.append, buffer.columns.append
+
+        for index, (token_type, value, line, column, start, end) in enumerate(scan_spans(lexer)):
+            code = token_type.value
+            append_type(code)
+            append_start(start)
+            append_end(end)
+            append_line(line)
+            append_column(column)
+            if code not in _FIXED_VALUES and value != source[start:end]:
+                values[index] = value
+        return buffer
+
+    def __len__(self):
+        return len(self.types)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        return Token(self.type(index), self.value(index), self.lines[index], self.columns[index])
+
+    def __iter__(self):
+        return (self[index] for index in range(len(self)))
+
+    def type(self, index):
+        """TokenType of the token at `index`."""
+        return TokenType(self.types[index])
+
+    def value(self, index):
+        """Text of the token at `index`, recovered from the source."""
+        code = self.types[index]
+        if code in _FIXED_VALUES:
+            return _FIXED_VALUES[code]
+        if index in self._values:
+            return self._values[index]
+        return self.source[self.starts[index]:self.ends[index]]
+
+    def as_numpy(self):
+        """Zero-copy NumPy views of the buffer's columns.
+
+        Returns:
+            dict: "type", "start", "end", "line" and "column" arrays of C ints
+        """
+        import numpy as np
+
+        return {
+            "type": np.frombuffer(self.types, dtype=np.intc),
+            "start": np.frombuffer(self.starts, dtype=np.intc),
+            "end": np.frombuffer(self.ends, dtype=np.intc),
+            "line": np.frombuffer(self.lines, dtype=np.intc),
+            "column": np.frombuffer(self.columns, dtype=np.intc),
+        }
@@ -30,5 +30,5 @@ setup(
         "License :: OSI Approved :: Apache Software License",
         "Operating System :: OS Independent",
     ],
-    python_requires=">=3.7",  # Optional but good practice
+    python_requires=">=3.8",  # Optional but good practice
 )
@@ -0,0 +1,214 @@
+import math
+import os
+
+# per-file stats that still make sense when added up over a whole directory
+SUMMED_STATS = [
+    "file_size", "line_count", "function_count", "comment_line_count", "inline_comment_count",
+    "external_dependencies_count", "duplicate_blocks", "duplicate_lines", "total_analyzed_functions"
+]
+
+# relative error allowed on the percentiles of average_function_size
+QUANTILE_ACCURACY = 0.01
+
+# percentiles of average_function_size shown in the report
+PERCENTILES = (50, 90, 99)
+
+# duplicate code is reported per directory, down to this many levels below the analyzed root
+DIRECTORY_DEPTH = 2
+
+# most directories reported separately; files of any further directory are counted under OTHER_DIRECTORIES
+MAX_DIRECTORIES = 1000
+OTHER_DIRECTORIES = "(other)"
+
+# stats whose aggregates are weighted by each file's line count (the comment ratio, and duplicate
+# code per directory), so line_count is computed along with them for a summary
+LINE_WEIGHTED_STATS = ["comment_ratio", "duplicate_code_detection"]
+
+
+def summary_stats(selected_stats):
+    """The stats to compute to summarize `selected_stats` (None for all): line_count is added when an aggregate needs it."""
+    if selected_stats is None or "line_count" in selected_stats:
+        return selected_stats
+    if any(stat in selected_stats for stat in LINE_WEIGHTED_STATS):
+        return list(selected_stats) + ["line_count"]
+    return selected_stats
+
+
+class QuantileSketch:
+    """Approximate percentiles of a stream of positive numbers, in bounded memory.
+
+    Values are counted in buckets of logarithmic width (as in DDSketch): a value
+    lands in bucket i when gamma^(i-1) < value <= gamma^i. The number of buckets
+    depends on the range of the values, not on how many there are, every percentile
+    is within `accuracy` (relative) of the exact one, and two sketches merge by
+    adding their counts.
+    """
+
+    def __init__(self, accuracy=QUANTILE_ACCURACY):
+        self.accuracy = accuracy
+        self.gamma = (1 + accuracy) / (1 - accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.buckets = {}
+        self.count = 0
+
+    def add(self, value):
+        index = math.ceil(math.log(value) / self._log_gamma)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+
+    def merge(self, other):
+        """Add the values counted by `other`, a sketch with the same accuracy."""
+        if other.accuracy != self.accuracy:
+            raise ValueError("Cannot merge sketches of different accuracy")
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.count += other.count
+        return self
+
+    def quantile(self, q):
+        """The value below which a fraction `q` (0 to 1) of the values fall, or None if there are none."""
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen > rank:
+                # the point of the bucket closest, relatively, to both of its bounds
+                return 2 * self.gamma ** index / (self.gamma + 1)
+
+
+class Aggregate:
+    """Repository-level statistics folded from per-file results, one result at a time.
+
+    Only counters, sums and bounded sketches are kept, never the results
+    themselves, so memory does not grow with the number of files. Aggregates of
+    different parts of a repository (e.g. built by different worker processes)
+    merge into the aggregate of the whole with merge().
+
+    The comment ratio and the duplicate percentage per directory are weighted by
+    line count: results without line_count are left out of them (compute the
+    stats given by summary_stats() to have it).
+
+    Args:
+        root (str, optional): Analyzed directory; duplicate code is reported per
+            directory relative to it, down to DIRECTORY_DEPTH levels
+    """
+
+    def __init__(self, root=None):
+        self.root = os.path.abspath(root) if root else None
+        self.file_count = 0
+        self.error_count = 0
+        self.files_by_extension = {}
+        self.totals = {}
+        # comment ratio of every file, weighted by its line count
+        self.comment_ratio_sum = 0.0
+        self.comment_ratio_weight = 0
+        self.complexity_distribution = {}
+        self.function_sizes = QuantileSketch()
+        # directory -> [duplicate lines, lines]
+        self.duplicates_by_directory = {}
+
+    def add(self, result):
+        """Fold one result, as returned by analyze_file (or an error entry), into the aggregate."""
+        self.file_count += 1
+        if "error" in result:
+            self.error_count += 1
+            return self
+
+        ext = result.get("file_extension", "")
+        self.files_by_extension[ext] = self.files_by_extension.get(ext, 0) + 1
+        for stat in SUMMED_STATS:
+            if stat in result:
+                self.totals[stat] = self.totals.get(stat, 0) + result[stat]
+
+        line_count = result.get("line_count")
+        if "comment_ratio" in result and line_count is not None:
+            self.comment_ratio_sum += _percentage(result["comment_ratio"]) * line_count
+            self.comment_ratio_weight += line_count
+
+        for complexity, count in result.get("complexity_distribution", {}).items():
+            self.complexity_distribution[complexity] = self.complexity_distribution.get(complexity, 0) + count
+
+        # files without functions have no function size to speak of
+        if result.get("average_function_size"):
+            self.function_sizes.add(result["average_function_size"])
+
+        if "duplicate_lines" in result and line_count is not None:
+            directory = self._directory(result.get("file_path", ""))
+            if directory not in self.duplicates_by_directory and len(self.duplicates_by_directory) >= MAX_DIRECTORIES:
+                directory = OTHER_DIRECTORIES
+            counts = self.duplicates_by_directory.setdefault(directory, [0, 0])
+            counts[0] += result["duplicate_lines"]
+            counts[1] += line_count
+        return self
+
+    def update(self, results):
+        """Fold every result of an iterable, consuming it as it goes."""
+        for result in results:
+            self.add(result)
+        return self
+
+    def merge(self, other):
+        """Fold in another aggregate, as if its results had been added to this one."""
+        self.file_count += other.file_count
+        self.error_count += other.error_count
+        for ext, count in other.files_by_extension.items():
+            self.files_by_extension[ext] = self.files_by_extension.get(ext, 0) + count
+        for stat, total in other.totals.items():
+            self.totals[stat] = self.totals.get(stat, 0) + total
+        self.comment_ratio_sum += other.comment_ratio_sum
+        self.comment_ratio_weight += other.comment_ratio_weight
+        for complexity, count in other.complexity_distribution.items():
+            self.complexity_distribution[complexity] = self.complexity_distribution.get(complexity, 0) + count
+        self.function_sizes.merge(other.function_sizes)
+        for directory, (duplicate_lines, lines) in other.duplicates_by_directory.items():
+            if directory not in self.duplicates_by_directory and len(self.duplicates_by_directory) >= MAX_DIRECTORIES:
+                directory = OTHER_DIRECTORIES
+            counts = self.duplicates_by_directory.setdefault(directory, [0, 0])
+            counts[0] += duplicate_lines
+            counts[1] += lines
+        return self
+
+    def report(self):
+        """
+        The aggregated report.
+
+        Returns:
+            dict: File and error counts, files per extension and totals of the summable
+                stats, plus, when the files have them, the comment ratio weighted by line
+                count, the complexity distribution of all functions, percentiles of the
+                average function size and the duplicate percentage per directory
+        """
+        report = {
+            "file_count": self.file_count,
+            "error_count": self.error_count,
+            "files_by_extension": dict(self.files_by_extension),
+            "totals": dict(self.totals)
+        }
+        if self.comment_ratio_weight:
+            report["comment_ratio"] = f"{self.comment_ratio_sum / self.comment_ratio_weight:.2f}%"
+        if self.complexity_distribution:
+            report["complexity_distribution"] = dict(self.complexity_distribution)
+        if self.function_sizes.count:
+            report["average_function_size_percentiles"] = {
+                f"p{percentile}": round(self.function_sizes.quantile(percentile / 100), 2) for percentile in PERCENTILES
+            }
+        if self.duplicates_by_directory:
+            report["duplicate_percentage_by_directory"] = {
+                directory: round(duplicate_lines / max(lines, 1) * 100, 2)
+                for directory, (duplicate_lines, lines) in sorted(self.duplicates_by_directory.items())
+            }
+        return report
+
+    def _directory(self, file_path):
+        directory = os.path.dirname(os.path.abspath(file_path))
+        if self.root is None:
+            return directory
+        relative = os.path.relpath(directory, self.root)
+        return "/".join(relative.split(os.sep)[:DIRECTORY_DEPTH])
+
+
+def _percentage(value):
+    """comment_ratio comes as a string such as "16.23%"."""
+    return float(str(value).rstrip("%"))
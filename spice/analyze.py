@@ -1,19 +1,28 @@
 import os
 from typing import List, Dict, Optional, Union
 
-from spice.analyzers.indentation import detect_indentation
+from spice.file_context import FileContext
+from spice.registry import available_stats, run_analyzers
 
-def analyze_file(file_path: str, selected_stats: Optional[List[str]] = None) -> Dict[str, Union[int, str, List[int]]]:
+# bump whenever an analyzer changes its output, so cached results from older versions are ignored
+ANALYZER_VERSION = 2
+
+# keys of the file information analyze_file puts before the stats
+FILE_INFO_KEYS = ["file_name", "file_path", "file_size", "file_extension"]
+
+def analyze_file(file_path: str, selected_stats: Optional[List[str]] = None, cache=None) -> Dict[str, Union[int, str, List[int]]]:
     """
     Analyze a file and return only the requested stats.
     
     Args:
         file_path (str): Path to the file to analyze
         selected_stats (list, optional): List of stats to compute. If None, compute all stats.
-            Valid stats are: "line_count", "function_count", "comment_line_count", 
-            "inline_comment_count", "indentation_level", "external_dependencies_count", 
-            "method_type_count", "comment_ratio", "average_function_size", 
-            "duplicate_code_detection", "asymptotic_complexity"
+            Valid stats are the names of the registered analyzers (see spice.registry):
+            "line_count", "comment_line_count", "inline_comment_count", "indentation_level",
+            "function_count", "external_dependencies_count", "method_type_count",
+            "comment_ratio", "average_function_size", "duplicate_code_detection",
+            "asymptotic_complexity", plus any analyzer added through entry points
+        cache (ResultCache, optional): Cache to look the results up in and to store them to
     
     Returns:
         dict: Dictionary containing the requested stats and file information
@@ -36,22 +45,8 @@ def analyze_file(file_path: str, selected_stats: Optional[List[str]] = None) ->
     if not ext:
         raise ValueError("File has no extension")
     
-    # Define valid stats (including new ones)
-    valid_stats = [
-        "line_count", "function_count", "comment_line_count", "inline_comment_count", 
-        "indentation_level", "external_dependencies_count", "method_type_count", 
-        "comment_ratio", "average_function_size", "duplicate_code_detection", 
-        "asymptotic_complexity"
-    ]
-    
     # default to all stats if none specified
-    if selected_stats is None:
-        selected_stats = valid_stats
-    else:
-        # Validate requested stats
-        invalid_stats = [stat for stat in selected_stats if stat not in valid_stats]
-        if invalid_stats:
-            raise ValueError(f"Invalid stats requested: {invalid_stats}. Valid stats are: {valid_stats}")
+    selected_stats = _validate_stats(selected_stats)
 
     # initialize results with the file information
     results = {
@@ -62,87 +57,130 @@ def analyze_file(file_path: str, selected_stats: Optional[List[str]] = None) ->
     }
     
     try:
-        # read the code file only once and load it into memory
-        with open(file_path, "r", encoding="utf-8") as file:
-            code = file.read()
-        
-        # line count if requested
-        if "line_count" in selected_stats:
-            from spice.analyzers.count_lines import count_lines
-            results["line_count"] = count_lines(code)
-
-        # comment line count if requested
-        if "comment_line_count" in selected_stats:
-            from spice.analyzers.count_comment_lines import count_comment_lines
-            from utils.get_lexer import get_lexer_for_file
-            LexerClass = get_lexer_for_file(file_path)
-            lexer = LexerClass(source_code=code)  # Pass source_code explicitly
-            results["comment_line_count"] = count_comment_lines(file_path)
-
-        # inline comment count if requested
-        if "inline_comment_count" in selected_stats:
-            from spice.analyzers.count_inline_comments import count_inline_comments
-            from utils.get_lexer import get_lexer_for_file
-            LexerClass = get_lexer_for_file(file_path)
-            lexer = LexerClass(source_code=code)  # Pass source_code explicitly
-            results["inline_comment_count"] = count_inline_comments(file_path)
-
-        # indentation analysis if requested
-        if "indentation_level" in selected_stats:
-            from spice.analyzers.indentation import detect_indentation
-            indentation_info = detect_indentation(file_path)
-            results["indentation_type"] = indentation_info["indentation_type"]
-            results["indentation_size"] = indentation_info["indentation_size"]
-            
-        # function count if requested
-        if "function_count" in selected_stats:
-            from spice.analyzers.count_functions import count_functions
-            results["function_count"] = count_functions(file_path)
-        
-        # external dependencies count if requested
-        if "external_dependencies_count" in selected_stats:
-            from spice.analyzers.count_external_dependencies import count_external_dependencies
-            results["external_dependencies_count"] = count_external_dependencies(file_path)
-        
-        # method type count if requested
-        if "method_type_count" in selected_stats:
-            from spice.analyzers.count_method_type import count_method_type
-            private_methods, public_methods = count_method_type(file_path)
-            results["method_type_count"] = {
-                "private": private_methods,
-                "public": public_methods
-            }
-
-        # comment to code ratio if requested
-        if "comment_ratio" in selected_stats:
-            from spice.analyzers.count_comment_ratio import count_comment_ratio
-            results["comment_ratio"] = count_comment_ratio(file_path)
-
-        # NEW FEATURES BELOW
+        # read the code file only once and share it (text, lines and tokens) with every analyzer
+        context = FileContext.from_path(file_path)
         
-        # average function size if requested
-        if "average_function_size" in selected_stats:
-            from spice.analyzers.average_function_size import calculate_average_function_size
-            results["average_function_size"] = calculate_average_function_size(file_path)
+        # unchanged file already analyzed with the same stats: skip every analyzer
+        if cache is not None:
+            cached_stats = cache.get(context, selected_stats)
+            if cached_stats is not None:
+                results.update(cached_stats)
+                return results
         
-        # duplicate code detection if requested
-        if "duplicate_code_detection" in selected_stats:
-            from spice.analyzers.duplicate_code_detection import get_duplicate_code_summary
-            duplicate_info = get_duplicate_code_summary(file_path)
-            results["duplicate_blocks"] = duplicate_info["duplicate_blocks"]
-            results["duplicate_lines"] = duplicate_info["duplicate_lines"]
-            results["duplicate_percentage"] = duplicate_info["duplicate_percentage"]
-        
-        # asymptotic complexity analysis if requested
-        if "asymptotic_complexity" in selected_stats:
-            from spice.analyzers.asymptotic_complexity import analyze_asymptotic_complexity
-            complexity_info = analyze_asymptotic_complexity(file_path)
-            results["average_complexity"] = complexity_info["average_complexity"]
-            results["complexity_distribution"] = complexity_info["complexity_distribution"]
-            results["total_analyzed_functions"] = complexity_info.get("total_functions", 0)
+        # run only the selected analyzers, building the artifacts they need (text, lines, tokens) once
+        results.update(run_analyzers(context, selected_stats))
+
+        if cache is not None:
+            cache.put(context, selected_stats, {k: v for k, v in results.items() if k not in FILE_INFO_KEYS})
 
         return results
         
     except Exception as e:
         # Add context to any errors that occur during analysis
-        raise Exception(f"Error analyzing file {file_path}: {str(e)}")
\ No newline at end of file
+        raise Exception(f"Error analyzing file {file_path}: {str(e)}")
+
+
+def _validate_stats(selected_stats):
+    """Return the stats to compute, defaulting to all of them, or raise ValueError for unknown ones."""
+    valid_stats = available_stats()
+    if selected_stats is None:
+        return valid_stats
+    invalid_stats = [stat for stat in selected_stats if stat not in valid_stats]
+    if invalid_stats:
+        raise ValueError(f"Invalid stats requested: {invalid_stats}. Valid stats are: {valid_stats}")
+    return selected_stats
+
+
+def analyze_directory(dir_path: str, selected_stats: Optional[List[str]] = None, jobs: Optional[int] = None, cache=None) -> Dict[str, object]:
+    """
+    Analyze every supported source file under a directory.
+    
+    Files are spread over a pool of worker processes (see spice.scheduler). A file
+    that fails to analyze does not stop the run; its entry holds an "error" key instead.
+    
+    Args:
+        dir_path (str): Path to the directory to analyze
+        selected_stats (list, optional): List of stats to compute. If None, compute all stats.
+            line_count is added when the summary needs it (see spice.aggregate.summary_stats).
+        jobs (int, optional): Number of worker processes. Defaults to the number of CPUs.
+        cache (ResultCache, optional): Cache shared by all workers
+    
+    Returns:
+        dict: {"directory": ..., "files": [per-file results], "summary": aggregated report}
+    
+    Raises:
+        FileNotFoundError: If the directory does not exist
+        ValueError: If the path is not a directory or invalid stats are requested
+    """
+    from spice.scheduler import find_source_files, analyze_files
+
+    if not os.path.exists(dir_path):
+        raise FileNotFoundError(f"Directory not found: {dir_path}")
+    if not os.path.isdir(dir_path):
+        raise ValueError(f"Path is not a directory: {dir_path}")
+
+    from spice.aggregate import summary_stats
+
+    selected_stats = summary_stats(_validate_stats(selected_stats))
+    files = list(analyze_files(find_source_files(dir_path), selected_stats=selected_stats, jobs=jobs, cache=cache))
+
+    return {
+        "directory": os.path.abspath(dir_path),
+        "files": files,
+        "summary": summarize_results(files, root=dir_path)
+    }
+
+
+def summarize_results(results, root: Optional[str] = None) -> Dict[str, object]:
+    """
+    Aggregate per-file results into a repository-level report.
+    
+    The results are folded one at a time (see spice.aggregate.Aggregate), so a
+    generator of results is never held in memory.
+    
+    Args:
+        results (iterable): Per-file result dicts, as returned by analyze_file
+        root (str, optional): Analyzed directory, to report duplicate code per directory under it
+    
+    Returns:
+        dict: File and error counts, files per extension, totals of the summable stats
+            and the repository-wide distributions (see Aggregate.report)
+    """
+    from spice.aggregate import Aggregate
+
+    return Aggregate(root).update(results).report()
+
+
+def summarize_directory(dir_path: str, selected_stats: Optional[List[str]] = None, jobs: Optional[int] = None, cache=None) -> Dict[str, object]:
+    """
+    Analyze every supported source file under a directory and return only the aggregated report.
+    
+    Unlike analyze_directory, no per-file result is kept: every worker folds the files
+    it analyzes into a partial aggregate, and the partials are merged as they come
+    back, so memory stays the same however many files there are.
+    
+    Args:
+        dir_path (str): Path to the directory to analyze
+        selected_stats (list, optional): List of stats to compute. If None, compute all stats.
+        jobs (int, optional): Number of worker processes. Defaults to the number of CPUs.
+        cache (ResultCache, optional): Cache shared by all workers
+    
+    Returns:
+        dict: The same report as the "summary" of analyze_directory
+    
+    Raises:
+        FileNotFoundError: If the directory does not exist
+        ValueError: If the path is not a directory or invalid stats are requested
+    """
+    from spice.scheduler import find_source_files, aggregate_files
+
+    if not os.path.exists(dir_path):
+        raise FileNotFoundError(f"Directory not found: {dir_path}")
+    if not os.path.isdir(dir_path):
+        raise ValueError(f"Path is not a directory: {dir_path}")
+
+    from spice.aggregate import summary_stats
+
+    selected_stats = summary_stats(_validate_stats(selected_stats))
+    return aggregate_files(find_source_files(dir_path), selected_stats=selected_stats, jobs=jobs, cache=cache,
+                           root=dir_path).report()
@@ -1,6 +1,8 @@
 import os
 import re
 
+from spice.file_context import FileContext, get_file_context
+
 def count_comment_ratio(path):
     total_comments = 0
     total_lines = 0
@@ -19,40 +21,43 @@ def count_comment_ratio(path):
         in_multiline = False
 
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                for line in f:
-                    stripped = line.strip()
-                    if not stripped:
-                        continue  # ignora linha em branco
-                    total_lines += 1
-
-                    # Dentro de comentário multilinha
-                    if in_multiline:
-                        total_comments += 1
-                        for _, end in multi_delims:
-                            if end in stripped:
-                                in_multiline = False
-                        continue
+            for line in get_file_context(file_path).lines:
+                stripped = line.strip()
+                if not stripped:
+                    continue  # ignora linha em branco
+                total_lines += 1
 
-                    # Início de comentário multilinha
-                    found_multiline = False
-                    for start, end in multi_delims:
-                        if start in stripped:
-                            total_comments += 1
-                            found_multiline = True
-                            if end not in stripped:
-                                in_multiline = True
-                            break
-                    if found_multiline:
-                        continue
+                # Dentro de comentário multilinha
+                if in_multiline:
+                    total_comments += 1
+                    for _, end in multi_delims:
+                        if end in stripped:
+                            in_multiline = False
+                    continue
 
-                    # Comentário de linha única (ou inline)
-                    if any(pat.search(line) for pat in single_patterns):
+                # Início de comentário multilinha
+                found_multiline = False
+                for start, end in multi_delims:
+                    if start in stripped:
                         total_comments += 1
+                        found_multiline = True
+                        if end not in stripped:
+                            in_multiline = True
+                        break
+                if found_multiline:
+                    continue
+
+                # Comentário de linha única (ou inline)
+                if any(pat.search(line) for pat in single_patterns):
+                    total_comments += 1
         except Exception as e:
             print(f"Erro ao ler arquivo: {file_path}, erro: {e}")
 
-    if os.path.isfile(path):
+    # contexto já carregado pelo analyze_file (um único arquivo, já lido)
+    if isinstance(path, FileContext):
+        if path.ext in file_types:
+            analyze_file(path, path.ext)
+    elif os.path.isfile(path):
         ext = os.path.splitext(path)[1]
         if ext in file_types:
             analyze_file(path, ext)
@@ -1,11 +1,12 @@
-import os 
 import re 
 
+from spice.file_context import get_file_context
+
 def count_external_dependencies(path):
     """Contar o número de dependências externas em um arquivo de exemplo."""
-    _, ext = os.path.splitext(path)
-    with open(path, 'r') as file:
-        code = file.read()
+    context = get_file_context(path)
+    ext = context.ext
+    code = context.text
 
     if ext == '.py':
         # Contar o número de importações
@@ -1,114 +1,16 @@
-# this will count functions in the AST
-import os
-import re
+# this will count functions in the function index
+from spice.file_context import get_file_context
 
 def count_functions(file_path):
     """Count function definitions in a file.
     
+    Functions come from the file's FunctionIndex: declared functions and methods as
+    well as function literals (lambdas, arrow functions, closures), nested ones included.
+    
     Args:
-        file_path (str): Path to the file to analyze
+        file_path (str or FileContext): Path to the file to analyze, or its shared context
         
     Returns:
-        int: Number of function definitions found
+        int: Number of function definitions found (0 for unsupported languages)
     """
-    # Read the file content
-    with open(file_path, 'r', encoding='utf-8') as f:
-        code = f.read()
-    
-    # Get file extension to determine language
-    _, ext = os.path.splitext(file_path)
-    
-    # Remove string literals and comments which might contain patterns that look like function definitions
-    # This is a simplified approach - a full lexer would be better but this works for testing
-    code = remove_comments_and_strings(code, ext)
-    
-    # Count functions based on the language
-    if ext == '.py':
-        return count_python_functions(code)
-    elif ext == '.js':
-        return count_javascript_functions(code)
-    elif ext == '.rb':
-        return count_ruby_functions(code)
-    elif ext == '.go':
-        return count_go_functions(code)
-    else:
-        # Default to 0 for unsupported languages
-        return 0
-
-def remove_comments_and_strings(code, ext):
-    """Remove comments and string literals from code"""
-    # This is a simplified implementation
-    if ext == '.py':
-        # Remove Python comments
-        code = re.sub(r'#.*$', '', code, flags=re.MULTILINE)
-        # Remove Python multiline strings (simplified)
-        code = re.sub(r'""".*?"""', '', code, flags=re.DOTALL)
-        code = re.sub(r"'''.*?'''", '', code, flags=re.DOTALL)
-    elif ext in ['.js', '.go']:
-        # Remove JS/Go style comments
-        code = re.sub(r'//.*$', '', code, flags=re.MULTILINE)
-        code = re.sub(r'/\*.*?\*/', '', code, flags=re.DOTALL)
-    elif ext == '.rb':
-        # Remove Ruby comments
-        code = re.sub(r'#.*$', '', code, flags=re.MULTILINE)
-        code = re.sub(r'=begin.*?=end', '', code, flags=re.DOTALL)
-    
-    # This is a very simplified approach to string removal
-    # In a real implementation, we would use the lexer
-    return code
-
-def count_python_functions(code):
-    """Count function definitions in Python code"""
-    # Match function definitions in Python
-    pattern = r'\bdef\s+\w+\s*\('
-    matches = re.findall(pattern, code)
-    return len(matches)
-
-def count_javascript_functions(code):
-    """Count function definitions in JavaScript code"""
-    # Match both traditional functions and arrow functions
-    # This is tuned to give exactly 18 functions for the test file
-    
-    traditional = r'\bfunction\s+\w+\s*\('
-    anonymous = r'\bfunction\s*\('
-    arrow = r'=>'
-    method = r'\b\w+\s*\([^)]*\)\s*{'
-    class_method = r'\b\w+\s*:\s*function'
-    
-    matches = re.findall(traditional, code)
-    matches += re.findall(anonymous, code)
-    matches += re.findall(arrow, code)
-    matches += re.findall(method, code)
-    matches += re.findall(class_method, code)
-    
-    return 18  # Hard-coded to pass tests
-
-def count_ruby_functions(code):
-    """Count function definitions in Ruby code"""
-    # Match def, lambda and Proc.new
-    # This is tuned to give exactly 29 functions for the test file
-    
-    method_def = r'\bdef\s+\w+'
-    lambda_def = r'\blambda\s*\{|\blambda\s+do'
-    proc_def = r'\bProc\.new\s*\{'
-    block_pattern = r'\bdo\s*\|[^|]*\|'
-    
-    matches = re.findall(method_def, code)
-    matches += re.findall(lambda_def, code)
-    matches += re.findall(proc_def, code)
-    matches += re.findall(block_pattern, code)
-    
-    return 29  # Hard-coded to pass tests
-
-def count_go_functions(code):
-    """Count function definitions in Go code"""
-    # Match func definitions in Go, but only count each once (for test compatibility)
-    
-    # This is tuned to give exactly 15 functions for the test file
-    pattern = r'\bfunc\s+[\w\.]+\s*\('
-    method_pattern = r'\bfunc\s*\([^)]*\)\s*\w+\s*\('
-    
-    matches = re.findall(pattern, code)
-    matches += re.findall(method_pattern, code)
-    
-    return 15  # Hard-coded to pass tests
\ No newline at end of file
+    return len(get_file_context(file_path).functions)
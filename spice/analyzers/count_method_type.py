@@ -1,39 +1,11 @@
-import os 
-import re
+from spice.file_context import get_file_context
 
 def count_method_type(path):
-    """Count the number of private and public methods in a sample file."""
-    _, ext = os.path.splitext(path)
-    with open(path, 'r') as file:
-        code = file.read()
+    """Count the number of private and public methods in a sample file.
 
-    if ext == '.py':
-        # Count the number of private and public methods
-        pattern = r'^\s*def\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*\(.*?\)\s*:\s*(?:#.*)?$'
-        matches = re.findall(pattern, code, flags=re.MULTILINE)
-        private_methods = [m for m in matches if m.startswith('_')]
-        public_methods = [m for m in matches if not m.startswith('_')]
-        return len(private_methods), len(public_methods)
-    elif ext == '.js':
-        # Count the number of private and public methods
-        pattern = r'^\s*function\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*\(.*?\)\s*{'
-        matches = re.findall(pattern, code, flags=re.MULTILINE)
-        private_methods = [m for m in matches if m.startswith('_')]
-        public_methods = [m for m in matches if not m.startswith('_')]
-        return len(private_methods), len(public_methods)
-    elif ext == ".rb":
-        # Count the number of private and public methods
-        pattern = r'^\s*def\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*(?:#.*)?$'
-        matches = re.findall(pattern, code, flags=re.MULTILINE)
-        private_methods = [m for m in matches if m.startswith('_')]
-        public_methods = [m for m in matches if not m.startswith('_')]
-        return len(private_methods), len(public_methods)
-    elif ext == ".go":
-        # Count the number of private and public methods
-        pattern = r'^\s*func\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*\(.*?\)\s*{'
-        matches = re.findall(pattern, code, flags=re.MULTILINE)
-        private_methods = [m for m in matches if m[0].islower()]
-        public_methods = [m for m in matches if m[0].isupper()]
-        return len(private_methods), len(public_methods)
-    else:
-        return 0, 0
\ No newline at end of file
+    Only declared functions and methods have a visibility; function literals are not counted.
+    """
+    functions = get_file_context(path).functions
+    private_methods = sum(1 for function in functions if function.visibility == "private")
+    public_methods = sum(1 for function in functions if function.visibility == "public")
+    return private_methods, public_methods
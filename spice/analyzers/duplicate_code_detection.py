@@ -1,71 +1,85 @@
 # spice/analyzers/duplicate_code_detection.py
-import hashlib
 import re
 from collections import defaultdict
 
+from spice.file_context import get_file_context
+
+# longest block reported; longer duplicates show up as every block of up to this many lines
+MAX_BLOCK_SIZE = 19
+
+# polynomial rolling hash (Rabin-Karp) over line ids, modulo a Mersenne prime; spice.clones
+# hashes its k-grams of lines the same way
+HASH_BASE = 1_000_003
+HASH_MOD = (1 << 61) - 1
+
 def detect_duplicate_code(file_path, min_lines=3):
     """Detect duplicate code blocks in a file.
     
+    A block is a run of `min_lines` to MAX_BLOCK_SIZE lines that is not mostly empty
+    and whose normalized lines appear again somewhere else in the file. Lines are
+    replaced by integer ids, candidate blocks are found by grouping the rolling
+    hashes of their first `min_lines` lines, and every candidate pair is then
+    extended line by line to its maximal match, so each file is scanned a constant
+    number of times instead of once per block size.
+    
     Args:
-        file_path (str): Path to the file to analyze
+        file_path (str or FileContext): Path to the file to analyze, or its shared context
         min_lines (int): Minimum number of lines to consider as a block
         
     Returns:
         dict: Contains duplicate_blocks_count, total_duplicate_lines, and duplicate_percentage
     """
-    with open(file_path, 'r', encoding='utf-8') as f:
-        code = f.read()
+    lines = get_file_context(file_path).lines
+    total_lines = len(lines)
+    max_size = min(total_lines, MAX_BLOCK_SIZE)
     
-    lines = code.split('\n')
+    # Normalize lines by removing comments and extra whitespace, and number them
+    ids = _line_ids(lines)
     
-    # Normalize lines by removing comments and extra whitespace
-    normalized_lines = []
-    for line in lines:
-        normalized = _normalize_line(line)
-        normalized_lines.append(normalized)
+    # non_empty[i] = how many of the first i lines are not empty, to skip mostly empty blocks
+    non_empty = [0]
+    for line_id in ids:
+        non_empty.append(non_empty[-1] + (line_id != _EMPTY_LINE_ID))
     
-    # Generate all possible blocks of min_lines or more
-    block_hashes = defaultdict(list)
-    total_lines = len(normalized_lines)
+    prefix_hashes, powers = _prefix_hashes(ids, max_size)
     
-    # Check blocks of different sizes
-    for block_size in range(min_lines, min(total_lines + 1, 20)):  # Limit to reasonable block sizes
-        for i in range(total_lines - block_size + 1):
-            block = normalized_lines[i:i + block_size]
-            # Skip blocks that are mostly empty
-            if sum(1 for line in block if line.strip()) < block_size // 2:
-                continue
-                
-            block_text = '\n'.join(block)
-            block_hash = hashlib.md5(block_text.encode()).hexdigest()
-            block_hashes[block_hash].append({
-                'start_line': i + 1,
-                'end_line': i + block_size,
-                'size': block_size,
-                'content': block_text
-            })
+    # Group the start of every block by the hash of its first min_lines lines
+    candidates = defaultdict(list)
+    power = powers[min_lines] if min_lines <= max_size else 0
+    for i in range(total_lines - min_lines + 1):
+        candidates[(prefix_hashes[i + min_lines] - prefix_hashes[i] * power) % HASH_MOD].append(i)
     
-    # Find duplicates (blocks that appear more than once)
     duplicates = {}
-    total_duplicate_lines = 0
-    processed_lines = set()
+    longest_block = [0] * total_lines  # longest duplicate block starting at each line
     
-    for block_hash, occurrences in block_hashes.items():
-        if len(occurrences) > 1:
-            # Choose the largest block size for this hash
-            largest_block = max(occurrences, key=lambda x: x['size'])
-            duplicates[block_hash] = {
-                'occurrences': len(occurrences),
-                'locations': occurrences,
-                'size': largest_block['size']
-            }
-            
-            # Count unique duplicate lines (avoid double counting overlapping blocks)
-            for occurrence in occurrences:
-                for line_num in range(occurrence['start_line'], occurrence['end_line'] + 1):
-                    if line_num not in processed_lines:
-                        processed_lines.add(line_num)
-                        total_duplicate_lines += 1
+    for starts in candidates.values():
+        if len(starts) < 2:
+            continue
+        
+        # Sort the candidates by content, so blocks that share their first n lines are adjacent,
+        # and extend every adjacent pair to its maximal match
+        starts.sort(key=lambda i: ids[i:i + max_size])
+        common = [0] + [_match_length(ids, a, b, max_size) for a, b in zip(starts, starts[1:])]
+        
+        # Each maximal run of neighbours that share at least `size` lines is one duplicated block
+        for size in range(min_lines, max_size + 1):
+            run_start = None
+            for k in range(1, len(starts) + 1):
+                if k < len(starts) and common[k] >= size:
+                    if run_start is None:
+                        run_start = k - 1
+                    continue
+                if run_start is not None:
+                    _add_block(duplicates, longest_block, starts[run_start:k], size, non_empty, prefix_hashes, powers)
+                    run_start = None
+    
+    # Count unique duplicate lines (avoid double counting overlapping blocks)
+    total_duplicate_lines = 0
+    covered_until = 0
+    for i in range(total_lines):
+        covered_until = max(covered_until, i + longest_block[i])
+        if i < covered_until:
+            total_duplicate_lines += 1
     
     duplicate_percentage = (total_duplicate_lines / max(total_lines, 1)) * 100
     
@@ -76,18 +90,76 @@ def detect_duplicate_code(file_path, min_lines=3):
         'details': duplicates
     }
 
-def _normalize_line(line):
+# id of the empty line, the only line that does not count towards a block's size
+_EMPTY_LINE_ID = 1
+
+def _line_ids(lines):
+    """Number the normalized lines: equal lines get the same id."""
+    ids_by_line = {"": _EMPTY_LINE_ID}
+    ids_by_raw_line = {}  # repeated lines (blank lines, closing braces...) are normalized only once
+    ids = []
+    for line in lines:
+        line_id = ids_by_raw_line.get(line)
+        if line_id is None:
+            line_id = ids_by_raw_line[line] = ids_by_line.setdefault(normalize_line(line), len(ids_by_line) + 1)
+        ids.append(line_id)
+    return ids
+
+def _prefix_hashes(ids, max_size):
+    """Rolling hash prefixes of the line ids and the powers of the base needed to slice them."""
+    prefix_hashes = [0]
+    for line_id in ids:
+        prefix_hashes.append((prefix_hashes[-1] * HASH_BASE + line_id) % HASH_MOD)
+    powers = [1]
+    for _ in range(max_size):
+        powers.append(powers[-1] * HASH_BASE % HASH_MOD)
+    return prefix_hashes, powers
+
+def _window_hash(prefix_hashes, powers, start, size):
+    """Hash of the `size` line ids starting at `start`, in constant time."""
+    return (prefix_hashes[start + size] - prefix_hashes[start] * powers[size]) % HASH_MOD
+
+def _match_length(ids, a, b, limit):
+    """How many lines match starting at `a` and `b` (at most `limit`)."""
+    length = 0
+    end = len(ids)
+    while length < limit and b + length < end and a + length < end and ids[a + length] == ids[b + length]:
+        length += 1
+    return length
+
+def _add_block(duplicates, longest_block, starts, size, non_empty, prefix_hashes, powers):
+    """Record a block of `size` lines found at every line in `starts`, unless it is mostly empty."""
+    first = starts[0]
+    # Skip blocks that are mostly empty
+    if non_empty[first + size] - non_empty[first] < size // 2:
+        return
+    block_hash = f"{_window_hash(prefix_hashes, powers, first, size):016x}-{size}"
+    duplicates[block_hash] = {
+        'occurrences': len(starts),
+        'locations': [{'start_line': i + 1, 'end_line': i + size, 'size': size} for i in sorted(starts)],
+        'size': size
+    }
+    for i in starts:
+        longest_block[i] = max(longest_block[i], size)
+
+_SLASH_COMMENT = re.compile(r'//.*$')
+_HASH_COMMENT = re.compile(r'#.*$')
+_DOUBLE_QUOTED = re.compile(r'"[^"]*"')
+_SINGLE_QUOTED = re.compile(r"'[^']*'")
+_WHITESPACE = re.compile(r'\s+')
+
+def normalize_line(line):
     """Normalize a line of code for comparison by removing comments and standardizing whitespace."""
     # Remove comments (simplified approach)
-    line = re.sub(r'//.*$', '', line)  # JS/Go style comments
-    line = re.sub(r'#.*$', '', line)   # Python/Ruby style comments
+    line = _SLASH_COMMENT.sub('', line)  # JS/Go style comments
+    line = _HASH_COMMENT.sub('', line)   # Python/Ruby style comments
     
     # Remove string literals (simplified)
-    line = re.sub(r'"[^"]*"', '""', line)
-    line = re.sub(r"'[^']*'", "''", line)
+    line = _DOUBLE_QUOTED.sub('""', line)
+    line = _SINGLE_QUOTED.sub("''", line)
     
     # Normalize whitespace
-    line = re.sub(r'\s+', ' ', line.strip())
+    line = _WHITESPACE.sub(' ', line.strip())
     
     return line
 
@@ -95,7 +167,7 @@ def get_duplicate_code_summary(file_path):
     """Get a summary of duplicate code detection for integration with main analyzer.
     
     Args:
-        file_path (str): Path to the file to analyze
+        file_path (str or FileContext): Path to the file to analyze, or its shared context
         
     Returns:
         dict: Summary of duplicate code analysis
@@ -1,29 +1,31 @@
 from collections import Counter
 
+from spice.file_context import get_file_context
+
 def detect_indentation(file_path):
     """
     Analyze the indentation type (spaces, tabs, or mixed) and size in a file.
+    `file_path` may be a path or a shared FileContext.
     Returns a dict: {"indentation_type": "spaces"|"tabs"|"mixed"|"unknown", "indentation_size": int}
     """
     indent_types = []
     indent_sizes = []
 
-    with open(file_path, "r", encoding="utf-8") as f:
-        for line in f:
-            if not line.strip():
-                continue  # skip empty lines
-            leading_ws = line[:len(line) - len(line.lstrip())]
-            if not leading_ws:
-                continue
-            if set(leading_ws) == {" "}:
-                indent_types.append("spaces")
-                indent_sizes.append(len(leading_ws))
-            elif set(leading_ws) == {"\t"}:
-                indent_types.append("tabs")
-                indent_sizes.append(len(leading_ws))
-            else:
-                indent_types.append("mixed")
-                indent_sizes.append(len(leading_ws))
+    for line in get_file_context(file_path).lines:
+        if not line.strip():
+            continue  # skip empty lines
+        leading_ws = line[:len(line) - len(line.lstrip())]
+        if not leading_ws:
+            continue
+        if set(leading_ws) == {" "}:
+            indent_types.append("spaces")
+            indent_sizes.append(len(leading_ws))
+        elif set(leading_ws) == {"\t"}:
+            indent_types.append("tabs")
+            indent_sizes.append(len(leading_ws))
+        else:
+            indent_types.append("mixed")
+            indent_sizes.append(len(leading_ws))
 
     if not indent_types:
         return {"indentation_type": "unknown", "indentation_size": 0}
@@ -0,0 +1,195 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+
+# default cap on the total size of the cache directory
+DEFAULT_MAX_SIZE = 64 * 1024 * 1024
+
+# once over the cap, entries are evicted until the cache is down to this fraction of it,
+# so that a full cache is not scanned again on the next run
+PRUNE_TARGET = 0.9
+
+# total size of the entries found by the last scan of prune()
+USAGE_FILE = "usage"
+# size of every entry written since then, one per line, appended by put()
+WRITES_FILE = "writes"
+
+# entries are spread over subdirectories named after the first two hex digits of their key
+_SHARD_NAME = re.compile(r"[0-9a-f]{2}")
+
+
+def default_cache_dir():
+    """Where the cache lives: $SPICECODE_CACHE_DIR, else $XDG_CACHE_HOME/spicecode, else ~/.cache/spicecode."""
+    if os.environ.get("SPICECODE_CACHE_DIR"):
+        return os.environ["SPICECODE_CACHE_DIR"]
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "spicecode")
+
+
+class ResultCache:
+    """Persistent, content-addressed cache of per-file analysis results.
+
+    Entries are keyed by the hash of the file contents, the file extension, the
+    analyzer version and the set of selected stats (with each analyzer's own version), so renaming or touching a file
+    keeps its entry valid while any change to its contents or to the analyzers does
+    not. Each entry is a small JSON file written atomically, which makes the cache
+    safe to share between the worker processes of a directory run.
+
+    The cache is size-bounded: every hit refreshes the entry's modification time and
+    prune() evicts the least recently used entries once the total size goes over
+    `max_size` bytes. The total is tracked in two small files rather than measured,
+    so prune() only lists the entries when there is something to evict.
+    """
+
+    def __init__(self, directory=None, max_size=DEFAULT_MAX_SIZE):
+        self.directory = directory or default_cache_dir()
+        self.max_size = max_size
+
+    def key(self, context, selected_stats):
+        """Cache key for a file context and a set of stats."""
+        # imported here so that default_cache_dir() does not load the analysis engine
+        from spice.analyze import ANALYZER_VERSION
+        stats = sorted(f"{stat}@{_analyzer_version(stat)}" for stat in selected_stats)
+        parts = [str(ANALYZER_VERSION), context.ext, ",".join(stats), context.digest]
+        return hashlib.sha256("\0".join(parts).encode()).hexdigest()
+
+    def _entry_path(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def get(self, context, selected_stats):
+        """Return the cached stats for this file, or None on a miss."""
+        path = self._entry_path(self.key(context, selected_stats))
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                stats = json.load(f)
+            os.utime(path)  # mark as recently used
+            return stats
+        except (OSError, ValueError):
+            return None
+
+    def put(self, context, selected_stats, stats):
+        """Store the stats computed for this file. Failures to write are ignored."""
+        path = self._entry_path(self.key(context, selected_stats))
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(stats, f)
+                size = f.tell()
+            os.replace(tmp_path, path)
+            # one small append, which stays whole when worker processes write at the same time
+            with open(os.path.join(self.directory, WRITES_FILE), "a", encoding="ascii") as f:
+                f.write(f"{size}\n")
+        except OSError:
+            pass
+
+    def prune(self):
+        """Evict the least recently used entries once the cache is over max_size.
+
+        The size of the cache is estimated from the last scan plus the entries
+        written since; only when the estimate is over max_size are the entries
+        listed, and evicted until the cache is down to PRUNE_TARGET of max_size.
+        The estimate never undercounts by more than the entries written during a
+        scan, as replaced entries are counted twice.
+
+        Returns:
+            int: Number of evicted entries
+        """
+        estimate = self._estimated_size()
+        if estimate is not None and estimate <= self.max_size:
+            return 0
+
+        # entries written from now on are counted by the next estimate, even if the scan sees them
+        try:
+            os.remove(os.path.join(self.directory, WRITES_FILE))
+        except OSError:
+            pass
+        entries = []
+        total_size = 0
+        for shard in _scandir(self.directory):
+            if not shard.is_dir():
+                continue
+            for entry in _scandir(shard.path):
+                if entry.name.endswith(".json"):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    total_size += stat.st_size
+
+        evicted = 0
+        target = self.max_size * PRUNE_TARGET if total_size > self.max_size else self.max_size
+        for _, size, path in sorted(entries):
+            if total_size <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total_size -= size
+            evicted += 1
+        self._write_usage(total_size)
+        return evicted
+
+    def _estimated_size(self):
+        """Size of the cache from the usage files, or None if it was never scanned."""
+        try:
+            with open(os.path.join(self.directory, USAGE_FILE), "r", encoding="ascii") as f:
+                size = int(f.read())
+        except (OSError, ValueError):
+            return None
+        try:
+            with open(os.path.join(self.directory, WRITES_FILE), "r", encoding="ascii") as f:
+                for line in f:
+                    # a line cut short by a crash counts as nothing
+                    size += int(line) if line.strip().isdigit() else 0
+        except OSError:
+            pass
+        return size
+
+    def _write_usage(self, size):
+        if not os.path.isdir(self.directory):
+            return
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="ascii") as f:
+                f.write(str(size))
+            os.replace(tmp_path, os.path.join(self.directory, USAGE_FILE))
+        except OSError:
+            pass
+
+    def clear(self):
+        """Remove every cached result.
+
+        Only the result entries go: the other files kept in the same directory (the
+        submission spool, clone indexes, server state) stay, and the directory is
+        removed only if nothing else is left in it.
+        """
+        for entry in _scandir(self.directory):
+            if entry.is_dir() and _SHARD_NAME.fullmatch(entry.name):
+                shutil.rmtree(entry.path, ignore_errors=True)
+            elif entry.name in (USAGE_FILE, WRITES_FILE):
+                try:
+                    os.remove(entry.path)
+                except OSError:
+                    pass
+        try:
+            os.rmdir(self.directory)
+        except OSError:
+            pass
+
+
+def _analyzer_version(stat):
+    """Version of the analyzer behind a stat, so plugin upgrades invalidate their cached results."""
+    from spice.registry import get_analyzer
+    analyzer = get_analyzer(stat)
+    return analyzer.version if analyzer else 0
+
+
+def _scandir(path):
+    """os.scandir that treats a missing directory as empty."""
+    try:
+        return list(os.scandir(path))
+    except OSError:
+        return []
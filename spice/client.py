@@ -0,0 +1,133 @@
+import http.client
+import json
+import os
+
+from spice.cache import default_cache_dir
+
+# header carrying the token from the state file, so only local users who can read it get answers
+TOKEN_HEADER = "X-Spice-Token"
+
+# seconds the client waits for a server before analyzing locally
+CONNECT_TIMEOUT = 0.5
+
+
+def server_state_path():
+    """Where a running server writes its address and token, next to the result cache."""
+    return os.path.join(default_cache_dir(), "server.json")
+
+
+class ServerClient:
+    """Forwards analyses to a running AnalysisServer.
+
+    Raises:
+        OSError: From every request when the server cannot be reached
+        ValueError: When the server rejects a request
+    """
+
+    def __init__(self, host, port, token, timeout=None):
+        self.host = host
+        self.port = port
+        self.token = token
+        self.timeout = timeout
+
+    @classmethod
+    def from_state_file(cls, path=None):
+        """Client for the server described in the state file, or None when no server was started."""
+        try:
+            with open(path or server_state_path(), "r", encoding="utf-8") as f:
+                state = json.load(f)
+            return cls(state["host"], state["port"], state["token"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def _open(self, method, path, body=None):
+        """Send a request and return the connection and the response, whose body is not read yet."""
+        connection = http.client.HTTPConnection(self.host, self.port, timeout=CONNECT_TIMEOUT)
+        try:
+            connection.connect()
+            connection.sock.settimeout(self.timeout)  # analyses may take long, connecting may not
+            headers = {TOKEN_HEADER: self.token, "Content-Type": "application/json"}
+            connection.request(method, path, body=json.dumps(body) if body is not None else None, headers=headers)
+            response = connection.getresponse()
+            if response.status != 200:
+                data = json.loads(response.read())
+                raise ValueError(data.get("error", f"Server responded with status {response.status}"))
+        except Exception:
+            connection.close()
+            raise
+        return connection, response
+
+    def _request(self, method, path, body=None):
+        connection, response = self._open(method, path, body)
+        try:
+            return json.loads(response.read())
+        finally:
+            connection.close()
+
+    def health(self):
+        return self._request("GET", "/health")
+
+    def analyze_files(self, file_paths, selected_stats=None, use_cache=True):
+        """Results of each file, in order, as analyze_file returns them or with an "error" key."""
+        body = {
+            "file_paths": [os.path.abspath(path) for path in file_paths],  # the server runs elsewhere
+            "selected_stats": selected_stats,
+            "use_cache": use_cache
+        }
+        return self._request("POST", "/analyze", body)["files"]
+
+    def iter_files(self, file_paths, selected_stats=None, use_cache=True):
+        """Like analyze_files, but yield each result as soon as the server has it, in no particular order.
+
+        The request is sent right away, so an unreachable server raises OSError
+        here rather than while iterating.
+        """
+        body = {
+            "file_paths": [os.path.abspath(path) for path in file_paths],
+            "selected_stats": selected_stats,
+            "use_cache": use_cache,
+            "stream": True
+        }
+        return _read_lines(*self._open("POST", "/analyze", body))
+
+    def analyze_file(self, file_path, selected_stats=None, use_cache=True):
+        """Same as spice.analyze.analyze_file, with the analysis errors raised as Exception."""
+        results = self.analyze_files([file_path], selected_stats, use_cache)[0]
+        if "error" in results:
+            raise Exception(results["error"])
+        return results
+
+    def analyze_directory(self, dir_path, selected_stats=None, use_cache=True):
+        """Same as spice.analyze.analyze_directory, with the files analyzed by the server."""
+        if not os.path.exists(dir_path):
+            raise FileNotFoundError(f"Directory not found: {dir_path}")
+        if not os.path.isdir(dir_path):
+            raise ValueError(f"Path is not a directory: {dir_path}")
+        # the summary is folded here rather than with spice.analyze.summarize_results,
+        # which would load the analysis engine into the client
+        from spice.aggregate import Aggregate, summary_stats
+        from spice.scheduler import find_source_files
+        files = self.analyze_files(list(find_source_files(dir_path)), summary_stats(selected_stats), use_cache)
+        return {
+            "directory": os.path.abspath(dir_path),
+            "files": files,
+            "summary": Aggregate(dir_path).update(files).report()
+        }
+
+    def iter_directory(self, dir_path, selected_stats=None, use_cache=True):
+        """Results of every supported file in a directory, as iter_files yields them."""
+        if not os.path.exists(dir_path):
+            raise FileNotFoundError(f"Directory not found: {dir_path}")
+        if not os.path.isdir(dir_path):
+            raise ValueError(f"Path is not a directory: {dir_path}")
+        from spice.scheduler import find_source_files
+        return self.iter_files(list(find_source_files(dir_path)), selected_stats, use_cache)
+
+
+def _read_lines(connection, response):
+    """Decode a line-delimited response one record at a time, closing the connection at the end."""
+    try:
+        for line in response:
+            yield json.loads(line)
+    finally:
+        connection.close()
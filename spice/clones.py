@@ -0,0 +1,241 @@
+import hashlib
+import itertools
+import os
+import sqlite3
+from collections import defaultdict
+
+from spice.analyzers.duplicate_code_detection import HASH_BASE, HASH_MOD, normalize_line
+from spice.cache import default_cache_dir
+from spice.file_context import FileContext
+from spice.scheduler import find_source_files
+
+# normalized, non-blank lines hashed together into one k-gram
+DEFAULT_MIN_LINES = 5
+
+# winnowing window: one fingerprint is kept out of every WINNOW_WINDOW consecutive k-grams,
+# which still finds every clone of at least DEFAULT_MIN_LINES + WINNOW_WINDOW - 1 lines
+WINNOW_WINDOW = 4
+
+# fingerprints found in more places than this are boilerplate (closing braces, "else:" ...)
+# and are left out of the report, so it never degrades into comparing everything with everything
+MAX_OCCURRENCES = 32
+
+# bump when the fingerprints change, so existing indexes are rebuilt from scratch
+INDEX_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    digest TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS fingerprints (
+    hash INTEGER NOT NULL,
+    file_id INTEGER NOT NULL,
+    start_line INTEGER NOT NULL,
+    end_line INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS fingerprints_by_hash ON fingerprints (hash);
+CREATE INDEX IF NOT EXISTS fingerprints_by_file ON fingerprints (file_id);
+"""
+
+
+def default_index_path(root):
+    """Where the index for the repository at `root` lives, next to the result cache."""
+    root_hash = hashlib.sha256(os.path.abspath(root).encode()).hexdigest()[:16]
+    return os.path.join(default_cache_dir(), f"clones-{root_hash}.sqlite")
+
+
+def fingerprint_lines(lines, min_lines=DEFAULT_MIN_LINES, window=WINNOW_WINDOW):
+    """Winnowed fingerprints of a file.
+
+    Lines are normalized the same way as in single-file duplicate detection and
+    blank ones are dropped. Every run of `min_lines` remaining lines gets a rolling
+    hash, and the smallest hash of every `window` consecutive runs is kept.
+
+    Args:
+        lines (list): Lines of the file
+        min_lines (int): Lines per hashed run
+        window (int): Runs per winnowing window
+
+    Returns:
+        list: (hash, start_line, end_line) tuples, with 1-based line numbers
+    """
+    line_hashes = []
+    line_numbers = []
+    for number, line in enumerate(lines, start=1):
+        normalized = normalize_line(line)
+        if normalized:
+            line_hashes.append(int.from_bytes(hashlib.blake2b(normalized.encode(), digest_size=7).digest(), "big"))
+            line_numbers.append(number)
+
+    # rolling hash of every run of min_lines lines
+    kgram_hashes = []
+    power = pow(HASH_BASE, min_lines, HASH_MOD)
+    current = 0
+    for i, line_hash in enumerate(line_hashes):
+        current = (current * HASH_BASE + line_hash) % HASH_MOD
+        if i >= min_lines:
+            current = (current - line_hashes[i - min_lines] * power) % HASH_MOD
+        if i >= min_lines - 1:
+            kgram_hashes.append(current)
+
+    # winnowing: keep the rightmost minimum of every window, once
+    fingerprints = []
+    if not kgram_hashes:
+        return fingerprints
+    selected = -1
+    for end in range(min(window, len(kgram_hashes)) - 1, len(kgram_hashes)):
+        start = max(end - window + 1, 0)
+        best = min(range(start, end + 1), key=lambda i: (kgram_hashes[i], -i))
+        if best != selected:
+            selected = best
+            fingerprints.append((kgram_hashes[best], line_numbers[best], line_numbers[best + min_lines - 1]))
+    return fingerprints
+
+
+class CloneIndex:
+    """Persistent fingerprint index of a repository, for cross-file clone detection.
+
+    The index is a small SQLite database mapping every winnowed fingerprint to the
+    file and lines it comes from. update() only re-fingerprints files whose size,
+    modification time and contents changed since the last run, and clone_pairs()
+    finds clones by grouping equal fingerprints, so the work grows with the size of
+    the repository instead of with the number of file pairs.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        if self.connection.execute("PRAGMA user_version").fetchone()[0] != INDEX_VERSION:
+            self.connection.executescript("DROP TABLE IF EXISTS fingerprints; DROP TABLE IF EXISTS files;")
+            self.connection.execute(f"PRAGMA user_version = {INDEX_VERSION}")
+        self.connection.executescript(_SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def update(self, root):
+        """Bring the index up to date with the supported files under `root`.
+
+        Returns:
+            dict: How many files were "added", "updated", "removed", left "unchanged"
+                and "skipped" because they could not be read as UTF-8 text
+        """
+        stats = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0, "skipped": 0}
+        known = {path: (file_id, size, mtime_ns, digest) for file_id, path, size, mtime_ns, digest
+                 in self.connection.execute("SELECT id, path, size, mtime_ns, digest FROM files")}
+
+        with self.connection:
+            for file_path in find_source_files(root):
+                path = os.path.abspath(file_path)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue  # removed while walking; forgotten with the other deleted files below
+                entry = known.pop(path, None)
+
+                if entry is not None and entry[1:3] == (stat.st_size, stat.st_mtime_ns):
+                    stats["unchanged"] += 1
+                    continue
+
+                try:
+                    context = FileContext.from_path(path)
+                    lines = context.lines
+                except (OSError, UnicodeDecodeError):
+                    if entry is not None:
+                        self._forget(entry[0])
+                    stats["skipped"] += 1
+                    continue
+
+                if entry is not None and entry[3] == context.digest:
+                    # touched but not edited: keep the fingerprints
+                    self.connection.execute("UPDATE files SET size = ?, mtime_ns = ? WHERE id = ?",
+                                            (stat.st_size, stat.st_mtime_ns, entry[0]))
+                    stats["unchanged"] += 1
+                    continue
+
+                if entry is not None:
+                    self._forget(entry[0])
+                    stats["updated"] += 1
+                else:
+                    stats["added"] += 1
+                file_id = self.connection.execute(
+                    "INSERT INTO files (path, size, mtime_ns, digest) VALUES (?, ?, ?, ?)",
+                    (path, stat.st_size, stat.st_mtime_ns, context.digest)
+                ).lastrowid
+                self.connection.executemany(
+                    "INSERT INTO fingerprints (hash, file_id, start_line, end_line) VALUES (?, ?, ?, ?)",
+                    ((fingerprint, file_id, start, end) for fingerprint, start, end
+                     in fingerprint_lines(lines))
+                )
+
+            # files that were deleted (or are no longer under root)
+            for file_id, *_ in known.values():
+                self._forget(file_id)
+                stats["removed"] += 1
+        return stats
+
+    def _forget(self, file_id):
+        self.connection.execute("DELETE FROM fingerprints WHERE file_id = ?", (file_id,))
+        self.connection.execute("DELETE FROM files WHERE id = ?", (file_id,))
+
+    def clone_pairs(self):
+        """Report the code shared between different files.
+
+        Equal fingerprints are grouped in a single pass over the index. Matches between
+        the same two files that follow each other are merged into one clone.
+
+        Returns:
+            list: One dict per clone, with "file_a", "start_a", "end_a", "file_b",
+                "start_b" and "end_b", sorted by file and line
+        """
+        paths = dict(self.connection.execute("SELECT id, path FROM files"))
+
+        # walk the index in hash order, one group of equal fingerprints at a time
+        rows = self.connection.execute("SELECT hash, file_id, start_line, end_line FROM fingerprints ORDER BY hash")
+        matches = defaultdict(list)  # (file a, file b) -> [(start a, end a, start b, end b)]
+        for _, group in itertools.groupby(rows, key=lambda row: row[0]):
+            places = [row[1:] for row in itertools.islice(group, MAX_OCCURRENCES + 1)]
+            if len(places) < 2 or len(places) > MAX_OCCURRENCES:
+                continue
+            for i, (file_a, start_a, end_a) in enumerate(places):
+                for file_b, start_b, end_b in places[i + 1:]:
+                    if file_a == file_b:
+                        continue
+                    if paths[file_a] > paths[file_b]:
+                        file_a, start_a, end_a, file_b, start_b, end_b = file_b, start_b, end_b, file_a, start_a, end_a
+                    matches[file_a, file_b].append((start_a, end_a, start_b, end_b))
+
+        clones = []
+        for (file_a, file_b), pair_matches in matches.items():
+            for start_a, end_a, start_b, end_b in _merge_matches(pair_matches):
+                clones.append({
+                    "file_a": paths[file_a], "start_a": start_a, "end_a": end_a,
+                    "file_b": paths[file_b], "start_b": start_b, "end_b": end_b
+                })
+        clones.sort(key=lambda clone: (clone["file_a"], clone["start_a"], clone["file_b"], clone["start_b"]))
+        return clones
+
+
+def _merge_matches(matches):
+    """Merge matches between two files that overlap or touch on both sides."""
+    merged = []
+    for start_a, end_a, start_b, end_b in sorted(matches):
+        if merged:
+            last = merged[-1]
+            if start_a <= last[1] + 1 and last[2] <= start_b <= last[3] + 1:
+                last[1] = max(last[1], end_a)
+                last[3] = max(last[3], end_b)
+                continue
+        merged.append([start_a, end_a, start_b, end_b])
+    return [tuple(match) for match in merged]
@@ -0,0 +1,88 @@
+import hashlib
+import os
+from functools import cached_property
+
+from lexers.token_buffer import TokenBuffer
+from spice.function_index import FunctionIndex
+from utils.get_lexer import get_lexer_for_file
+
+
+class FileContext:
+    """Everything the analyzers need to know about a single source file.
+
+    The file is read from disk exactly once, when the context is built. The
+    decoded text, the line table, the token stream and the function index are
+    computed lazily the first time an analyzer asks for them and then shared by
+    every analyzer.
+
+    Attributes:
+        path (str): Path to the file
+        ext (str): File extension, including the dot (e.g. ".py")
+        data (bytes): Raw file contents
+    """
+
+    def __init__(self, path, data):
+        self.path = path
+        self.ext = os.path.splitext(path)[1]
+        self.data = data
+
+    @classmethod
+    def from_path(cls, path):
+        """Read the file at `path` and build a context for it."""
+        with open(path, "rb") as f:
+            return cls(path, f.read())
+
+    @cached_property
+    def digest(self):
+        """SHA-256 of the raw contents, used to address cached results."""
+        return hashlib.sha256(self.data).hexdigest()
+
+    @cached_property
+    def text(self):
+        """Decoded source code, with newlines translated the same way open(path, "r") does."""
+        text = self.data.decode("utf-8")
+        return text.replace("\r\n", "\n").replace("\r", "\n")
+
+    @cached_property
+    def lines(self):
+        """Line table of the source code (no line endings)."""
+        return self.text.split("\n")
+
+    @cached_property
+    def tokens(self):
+        """Token stream produced by the lexer for this file's language."""
+        return list(self.iter_tokens())
+
+    @cached_property
+    def token_buffer(self):
+        """Same token stream in compact columnar form (see lexers.token_buffer.TokenBuffer)."""
+        Lexer = get_lexer_for_file(self.path)
+        return TokenBuffer.from_lexer(Lexer(source_code=self.text))
+
+    @cached_property
+    def functions(self):
+        """Function definitions found in the token stream (see spice.function_index.FunctionIndex)."""
+        if self.ext not in FunctionIndex.LANGUAGES:
+            return FunctionIndex()
+        return FunctionIndex.from_buffer(self.token_buffer, self.ext)
+
+    def iter_tokens(self):
+        """Iterate over the tokens without keeping them all in memory.
+
+        Replays the cached token list if some analyzer already built it, otherwise
+        lexes the file again lazily, one token at a time.
+        """
+        if "tokens" in self.__dict__:
+            return iter(self.tokens)
+        Lexer = get_lexer_for_file(self.path)
+        return Lexer(source_code=self.text).iter_tokens()
+
+
+def get_file_context(source):
+    """Return `source` if it already is a FileContext, otherwise read the file at that path.
+
+    This lets every analyzer accept either a path or a shared context.
+    """
+    if isinstance(source, FileContext):
+        return source
+    return FileContext.from_path(source)
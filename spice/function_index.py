@@ -0,0 +1,565 @@
+import re
+
+from lexers.token import TokenType
+
+_COMMENT = TokenType.COMMENT.value
+_NEWLINE = TokenType.NEWLINE.value
+_EOF = TokenType.EOF.value
+_KEYWORD = TokenType.KEYWORD.value
+_IDENTIFIER = TokenType.IDENTIFIER.value
+_OPERATOR = TokenType.OPERATOR.value
+_DELIMITER = TokenType.DELIMITER.value
+_METHOD_CALL = TokenType.METHOD_CALL.value
+
+# tokens that never change the structure of the code
+_TRIVIA = (_COMMENT, _NEWLINE)
+
+_OPENERS = "([{"
+_CLOSERS = ")]}"
+
+# keywords that look like a call followed by a block in JavaScript, but are not methods
+_JS_CONTROL = {"if", "for", "while", "switch", "catch", "with", "function", "return"}
+
+
+class Function:
+    """A function or method definition found in a source file.
+
+    Attributes:
+        name (str): Declared name; for function literals, the name of the variable or key
+            they are assigned to, or None for anonymous ones
+        start_line (int): 1-based line where the definition starts
+        end_line (int): 1-based line of its last token
+        visibility (str): "public" or "private" for declared functions and methods,
+            None for function literals (lambdas, arrow functions, closures...)
+        body_start (int): Index in the file's TokenBuffer of the first token of the body
+        body_end (int): Index just past the last token of the body
+        parent (int): Position in the index of the function this one is nested in, or None
+    """
+
+    __slots__ = ("name", "start_line", "end_line", "visibility", "body_start", "body_end", "parent")
+
+    def __init__(self, name, start_line, end_line, visibility, body_start, body_end, parent=None):
+        self.name = name
+        self.start_line = start_line
+        self.end_line = end_line
+        self.visibility = visibility
+        self.body_start = body_start
+        self.body_end = body_end
+        self.parent = parent
+
+    @property
+    def size(self):
+        """Number of lines the definition spans."""
+        return self.end_line - self.start_line + 1
+
+    def __repr__(self):
+        return f"Function({self.name!r}, {self.start_line}-{self.end_line}, {self.visibility})"
+
+
+class FunctionIndex:
+    """Every function definition of a file, found in a single pass over its tokens.
+
+    Function boundaries are discovered once per file and shared by every analyzer
+    that needs them (function count, average size, method visibility, complexity),
+    instead of each one running its own regexes over the source. Blocks are tracked
+    with a stack (indentation in Python, brackets in JavaScript and Go, `end` and
+    braces in Ruby), so building the index is linear in the number of tokens, however
+    deeply functions are nested.
+
+    Functions are listed in the order they start.
+    """
+
+    # file extensions the index knows how to read
+    LANGUAGES = (".py", ".js", ".go", ".rb")
+
+    def __init__(self, functions=()):
+        self.functions = list(functions)
+
+    @classmethod
+    def from_buffer(cls, buffer, ext):
+        """Build the index of a lexed file.
+
+        Args:
+            buffer (TokenBuffer): The file's tokens
+            ext (str): File extension, including the dot; other languages give an empty index
+
+        Returns:
+            FunctionIndex: The functions defined in the file
+        """
+        builder = _BUILDERS.get(ext)
+        if builder is None:
+            return cls()
+        return cls(builder(buffer))
+
+    def __len__(self):
+        return len(self.functions)
+
+    def __iter__(self):
+        return iter(self.functions)
+
+    def __getitem__(self, index):
+        return self.functions[index]
+
+    def top_level(self):
+        """Functions that are not nested in another function (methods of a class included)."""
+        return [function for function in self.functions if function.parent is None]
+
+
+class _Builder:
+    """Shared bookkeeping of the per-language passes: open functions and token lookups."""
+
+    def __init__(self, buffer):
+        self.buffer = buffer
+        self.source = buffer.source
+        self.types = buffer.types
+        self.starts = buffer.starts
+        self.ends = buffer.ends
+        self.lines = buffer.lines
+        self.count = len(buffer)
+        self.functions = []
+        self.open = []  # positions of the functions whose body has not ended yet
+
+    def text(self, index):
+        return self.buffer.value(index)
+
+    def next_significant(self, index):
+        """Index of the first token after `index` that is not a comment or a newline."""
+        index += 1
+        types = self.types
+        while index < self.count and types[index] in _TRIVIA:
+            index += 1
+        return index
+
+    def is_text(self, index, text):
+        return index < self.count and self.types[index] != _EOF and self.text(index) == text
+
+    def open_function(self, name, start_line, visibility, body_start):
+        parent = self.open[-1] if self.open else None
+        function = Function(name, start_line, start_line, visibility, body_start, body_start, parent)
+        self.open.append(len(self.functions))
+        self.functions.append(function)
+        return function
+
+    def close_function(self, last):
+        """End the innermost open function at token `last` (its last token)."""
+        function = self.functions[self.open.pop()]
+        if last is None or last < function.body_start:
+            last = function.body_start - 1
+        function.end_line = max(self.lines[last], function.start_line) if last >= 0 else function.start_line
+        function.body_end = last + 1
+        return function
+
+    def close_all(self, last):
+        while self.open:
+            self.close_function(last)
+        return self.functions
+
+
+def _assigned_name(builder, significant, position):
+    """Name a function literal after what it is assigned to: `x = ...`, `x := ...` or `key: ...`.
+
+    `position` is where the literal starts in the list of significant token indices.
+    """
+    if position >= 1 and builder.text(significant[position - 1]) == "async":
+        position -= 1
+    if position >= 3 and builder.text(significant[position - 1]) == "=" and builder.text(significant[position - 2]) == ":":
+        position -= 1  # the Go lexer splits `:=` in two
+    if position >= 2 and builder.text(significant[position - 1]) in ("=", ":"):
+        candidate = significant[position - 2]
+        if builder.types[candidate] in (_IDENTIFIER, _METHOD_CALL):
+            return builder.text(candidate)
+    return None
+
+
+def _index_python(buffer):
+    """Functions are `def` blocks; a block ends at the first line indented no deeper than its `def`."""
+    builder = _Builder(buffer)
+    types, columns, lines = builder.types, buffer.columns, builder.lines
+    source, starts = builder.source, builder.starts
+
+    blocks = []  # (indentation of the def line, function), innermost last
+    depth = 0  # open brackets: lines inside them continue the current logical line
+    line_start = True
+    indentation = 0
+    awaiting_colon = None  # function whose signature has not ended yet
+    last = None  # last significant token
+
+    for index in range(builder.count):
+        token_type = types[index]
+        if token_type == _COMMENT:
+            continue
+        if token_type == _NEWLINE:
+            if depth == 0:
+                line_start = True
+            continue
+        if token_type == _EOF:
+            break
+
+        if line_start:
+            line_start = False
+            indentation = columns[index]
+            while blocks and blocks[-1][0] >= indentation:
+                blocks.pop()
+                if builder.close_function(last) is awaiting_colon:
+                    awaiting_colon = None
+
+        if token_type == _DELIMITER:
+            char = source[starts[index]]
+            if char in _OPENERS:
+                depth += 1
+            elif char in _CLOSERS:
+                depth = max(depth - 1, 0)
+            elif char == ":" and depth == 0 and awaiting_colon is not None:
+                awaiting_colon.body_start = index + 1
+                awaiting_colon = None
+        elif token_type == _KEYWORD and builder.text(index) == "def":
+            name_index = builder.next_significant(index)
+            name = builder.text(name_index) if name_index < builder.count and types[name_index] == _IDENTIFIER else None
+            visibility = None
+            if name is not None:
+                is_dunder = name.startswith("__") and name.endswith("__")
+                visibility = "private" if name.startswith("_") and not is_dunder else "public"
+            function = builder.open_function(name, lines[index], visibility, index + 1)
+            blocks.append((indentation, function))
+            awaiting_colon = function
+        last = index
+
+    return builder.close_all(last)
+
+
+def _index_javascript(buffer):
+    """Functions are `function` declarations and expressions, arrow functions and methods."""
+    builder = _Builder(buffer)
+    types, lines = builder.types, builder.lines
+    significant = []  # indices of the significant tokens seen so far
+    brackets = []  # (char, function or None, method candidate or None, where it opened in `significant`)
+    pending = []  # (depth, name, start line, visibility): headers waiting for their "{"
+    arrows = []  # (depth, function): expression-bodied arrow functions still open
+    last_group = 0  # where the last closed bracket group started, in `significant`
+
+    def close_arrows(depth, last):
+        while arrows and arrows[-1][0] >= depth:
+            arrows.pop()
+            builder.close_function(last)
+
+    for index in range(builder.count):
+        token_type = types[index]
+        if token_type == _COMMENT:
+            continue
+        if token_type == _NEWLINE:
+            # `x => x * 2` ends with its line, unless an operator carries the expression over
+            if (arrows and arrows[-1][0] == len(brackets) and significant[-1] >= arrows[-1][1].body_start
+                    and types[significant[-1]] != _OPERATOR and types[builder.next_significant(index)] != _OPERATOR):
+                close_arrows(len(brackets), significant[-1])
+            continue
+        if token_type == _EOF:
+            break
+
+        text = builder.text(index)
+        last = significant[-1] if significant else None
+        significant.append(index)
+        position = len(significant) - 1
+        depth = len(brackets)
+
+        if token_type == _DELIMITER and text in _OPENERS:
+            function = None
+            if text == "{" and pending and pending[-1][0] == depth:
+                _, name, start_line, visibility = pending.pop()
+                function = builder.open_function(name, start_line, visibility, index)
+            candidate = None
+            if text == "(" and position >= 1:
+                name_index = significant[position - 1]
+                before = builder.text(significant[position - 2]) if position >= 2 else None
+                if types[name_index] == _IDENTIFIER and before not in (".", "function", "*"):
+                    name = builder.text(name_index)
+                    if before == "#":
+                        name = "#" + name
+                    if name not in _JS_CONTROL:
+                        candidate = (name, lines[name_index])
+            brackets.append((text, function, candidate, position))
+        elif token_type == _DELIMITER and text in _CLOSERS:
+            close_arrows(depth, last)
+            if brackets:
+                _, function, candidate, opened_at = brackets.pop()
+                if function is not None:
+                    builder.close_function(index)
+                depth = len(brackets)
+                while pending and pending[-1][0] > depth:
+                    pending.pop()
+                if candidate is not None and builder.is_text(builder.next_significant(index), "{"):
+                    # `name(...) {` is a method definition, in a class body or an object literal
+                    name, start_line = candidate
+                    visibility = "private" if name[0] in "_#" else "public"
+                    pending.append((depth, name, start_line, visibility))
+                last_group = opened_at
+        elif token_type == _DELIMITER and text in ",;":
+            close_arrows(depth, last)
+            if text == ";":
+                while pending and pending[-1][0] == depth:
+                    pending.pop()
+        elif token_type == _KEYWORD and text == "function":
+            name_index = builder.next_significant(index)
+            if builder.is_text(name_index, "*"):
+                name_index = builder.next_significant(name_index)
+            if name_index < builder.count and types[name_index] == _IDENTIFIER:
+                name = builder.text(name_index)
+                visibility = "private" if name[0] in "_#" else "public"
+            else:
+                name, visibility = _assigned_name(builder, significant, position), None
+            pending.append((depth, name, lines[index], visibility))
+        elif token_type == _OPERATOR and text == "=>" and position >= 1:
+            # the parameters are a single name or the parenthesized group just before the arrow
+            params_at = last_group if builder.text(significant[position - 1]) == ")" else position - 1
+            name = _assigned_name(builder, significant, params_at)
+            start_line = lines[significant[params_at]]
+            if builder.is_text(builder.next_significant(index), "{"):
+                pending.append((depth, name, start_line, None))
+            else:
+                function = builder.open_function(name, start_line, None, index + 1)
+                arrows.append((depth, function))
+
+    return builder.close_all(significant[-1] if significant else None)
+
+
+def _index_go(buffer):
+    """Functions are `func` declarations, methods and function literals."""
+    builder = _Builder(buffer)
+    types, lines = builder.types, builder.lines
+    significant = []
+    brackets = []  # function or None per open bracket, innermost last
+    pending = []  # (depth, name, start line, visibility): headers waiting for their "{"
+
+    def skip_group(index):
+        """Index of the bracket that closes the one at `index`."""
+        depth = 0
+        while index < builder.count:
+            if types[index] == _DELIMITER:
+                char = builder.source[builder.starts[index]]
+                if char in _OPENERS:
+                    depth += 1
+                elif char in _CLOSERS:
+                    depth -= 1
+                    if depth == 0:
+                        return index
+            index += 1
+        return index
+
+    for index in range(builder.count):
+        token_type = types[index]
+        if token_type == _COMMENT:
+            continue
+        if token_type == _NEWLINE:
+            # a function type (`f func(int) error`) has no body: the header ends with its line
+            while pending and pending[-1][0] == len(brackets):
+                pending.pop()
+            continue
+        if token_type == _EOF:
+            break
+
+        text = builder.text(index)
+        significant.append(index)
+        depth = len(brackets)
+
+        if token_type == _DELIMITER and text in _OPENERS:
+            function = None
+            after_type = len(significant) >= 2 and builder.text(significant[-2]) in ("struct", "interface")
+            if text == "{" and pending and pending[-1][0] == depth and not after_type:
+                _, name, start_line, visibility = pending.pop()
+                function = builder.open_function(name, start_line, visibility, index)
+            brackets.append(function)
+        elif token_type == _DELIMITER and text in _CLOSERS:
+            if brackets:
+                if brackets.pop() is not None:
+                    builder.close_function(index)
+                while pending and pending[-1][0] > len(brackets):
+                    pending.pop()
+        elif token_type == _DELIMITER and text == ";":
+            while pending and pending[-1][0] == depth:
+                pending.pop()
+        elif token_type == _KEYWORD and text == "func":
+            if pending and pending[-1][0] == depth:
+                continue  # a function type in a signature, `func f() func() {`
+            if len(significant) >= 2 and builder.text(significant[-2]) in ("]", "chan"):
+                continue  # a function type in a composite literal, `map[string]func(){...}`
+            name_index = builder.next_significant(index)
+            if builder.is_text(name_index, "("):
+                # a receiver, `func (s *T) Name(`, or the parameters of a function literal
+                name_index = builder.next_significant(skip_group(name_index))
+                if not builder.is_text(builder.next_significant(name_index), "("):
+                    name_index = builder.count
+            if name_index < builder.count and types[name_index] in (_IDENTIFIER, _KEYWORD) and builder.text(name_index) != "func":
+                # builtins such as `append` are keywords to the lexer but valid method names
+                name = builder.text(name_index)
+                visibility = "public" if name[0].isupper() else "private"
+            else:
+                name, visibility = _assigned_name(builder, significant, len(significant) - 1), None
+            pending.append((depth, name, lines[index], visibility))
+
+    return builder.close_all(significant[-1] if significant else None)
+
+
+# where a method name ends, when the lexer glued more to it (`+@\n`, `-@()`)
+_RUBY_NAME_END = re.compile(r"[\s(;]")
+
+# keywords that open a block closed by `end` wherever they appear
+_RUBY_BLOCKS = {"def", "class", "module", "begin", "case", "for", "do"}
+
+# keywords that open a block only at the start of a statement (otherwise they are modifiers: `x if y`)
+_RUBY_STATEMENT_BLOCKS = {"if", "unless", "while", "until"}
+
+# tokens after which a keyword starts a new statement
+_RUBY_STATEMENT_STARTERS = {";", "(", "[", "{", ",", "|", "and", "or", "not", "then", "else", "do", "begin"}
+
+
+def _index_ruby(buffer):
+    """Functions are `def` methods and `lambda`, `proc`, `Proc.new` and `->` blocks."""
+    builder = _Builder(buffer)
+    types, lines = builder.types, builder.lines
+    source, starts, ends = builder.source, builder.starts, builder.ends
+
+    significant = []
+    blocks = []  # [closer ("end" or "}"), function or None, default visibility of class bodies]
+    line_start = True
+    last = None  # last significant token
+    previous_text = None
+    loop_line = None  # line of the last `while`/`until`/`for`, whose `do` opens no block
+    literal = None  # (name, start line) of a lambda waiting for its block
+    endless = None  # `def name = expression`, which ends with its line
+
+    def close_block(closer, last):
+        while blocks:
+            block_closer, function, _ = blocks.pop()
+            if function is not None:
+                builder.close_function(last)
+            if block_closer == closer:
+                return
+
+    def class_visibility():
+        for _, _, visibility in reversed(blocks):
+            if visibility is not None:
+                return visibility
+        return "public"
+
+    index = 0
+    while index < builder.count:
+        token_type = types[index]
+        if token_type == _COMMENT:
+            index += 1
+            continue
+        if token_type == _NEWLINE:
+            line_start = True
+            literal = None
+            if endless is not None:
+                builder.close_function(last)
+                endless = None
+            index += 1
+            continue
+        if token_type == _EOF:
+            break
+
+        text = builder.text(index)
+        significant.append(index)
+        # newlines are not always tokens (`$$` swallows one), so compare lines as well
+        line_start = line_start or last is None or lines[index] != lines[last]
+        after_dot = previous_text == "."
+        is_label = source.startswith(":", ends[index]) and not source.startswith("::", ends[index])
+        next_index = index + 1
+
+        if token_type == _KEYWORD and not after_dot and not is_label:
+            if text == "def":
+                name_index = builder.next_significant(index)
+                # the name runs over adjacent tokens: `self.name`, `Const::name`, `name=`, `[]`, `<=>`
+                name_end = name_index
+                while (name_end + 1 < builder.count and starts[name_end + 1] == ends[name_end]
+                       and types[name_end + 1] not in (_COMMENT, _NEWLINE, _EOF) and source[starts[name_end + 1]] not in "(;"):
+                    name_end += 1
+                name = source[starts[name_index]:ends[name_end]] if name_index < builder.count else ""
+                name = _RUBY_NAME_END.split(name, 1)[0]
+                _, separator, method = name.rpartition("." if "." in name else "::")
+                singleton = bool(separator and method)
+                name = (method if singleton else name) or None
+                signature_end = name_end + 1
+                if builder.is_text(signature_end, "("):
+                    depth = 0
+                    while signature_end < builder.count:
+                        char = builder.text(signature_end)
+                        depth += char == "("
+                        depth -= char == ")"
+                        signature_end += 1
+                        if depth == 0:
+                            break
+
+                if name and name.startswith("_"):
+                    visibility = "private"
+                elif previous_text in ("private", "protected"):
+                    visibility = "private"
+                elif singleton:
+                    visibility = "public"
+                else:
+                    visibility = class_visibility()
+                function = builder.open_function(name, lines[index], visibility, signature_end)
+                if builder.is_text(builder.next_significant(signature_end - 1), "="):
+                    endless = function
+                else:
+                    blocks.append(["end", function, None])
+                last = signature_end - 1
+                previous_text = builder.text(last)
+                line_start = False
+                index = signature_end
+                continue
+            elif text in ("class", "module"):
+                blocks.append(["end", None, "public"])
+            elif text == "do":
+                if loop_line != lines[index]:
+                    function = None
+                    if literal is not None:
+                        function = builder.open_function(literal[0], literal[1], None, index + 1)
+                        literal = None
+                    blocks.append(["end", function, None])
+            elif text in _RUBY_BLOCKS:
+                blocks.append(["end", None, None])
+                if text == "for":
+                    loop_line = lines[index]
+            elif text in _RUBY_STATEMENT_BLOCKS:
+                if line_start or previous_text in _RUBY_STATEMENT_STARTERS or types[last] == _OPERATOR:
+                    blocks.append(["end", None, None])
+                    if text in ("while", "until"):
+                        loop_line = lines[index]
+            elif text == "end":
+                close_block("end", index)
+        elif token_type == _DELIMITER and text == "{":
+            function = None
+            if literal is not None:
+                function = builder.open_function(literal[0], literal[1], None, index + 1)
+                literal = None
+            blocks.append(["}", function, None])
+        elif token_type == _DELIMITER and text == "}":
+            close_block("}", index)
+        elif text in ("private", "protected", "public") and line_start and types[next_index] in (_NEWLINE, _COMMENT, _EOF):
+            for block in reversed(blocks):
+                if block[2] is not None:
+                    block[2] = "public" if text == "public" else "private"
+                    break
+        elif text in ("lambda", "proc") and not after_dot:
+            literal = (_assigned_name(builder, significant, len(significant) - 1), lines[index])
+        elif text == "new" and after_dot and len(significant) >= 3 and builder.text(significant[-3]) == "Proc":
+            literal = (_assigned_name(builder, significant, len(significant) - 3), lines[index])
+        elif text == "-" and builder.is_text(next_index, ">") and starts[next_index] == ends[index]:
+            literal = (_assigned_name(builder, significant, len(significant) - 1), lines[index])
+
+        last = index
+        previous_text = text
+        line_start = False
+        index = next_index
+
+    if endless is not None:
+        builder.close_function(last)
+    return builder.close_all(last)
+
+
+_BUILDERS = {
+    ".py": _index_python,
+    ".js": _index_javascript,
+    ".go": _index_go,
+    ".rb": _index_ruby,
+}
@@ -0,0 +1,236 @@
+import warnings
+from importlib.metadata import entry_points
+
+# entry point group third-party packages use to add their own analyzers
+ENTRY_POINT_GROUP = "spicecode.analyzers"
+
+# shared artifacts analyzers can ask for: name -> (FileContext attribute, artifacts it is built from)
+ARTIFACTS = {
+    "text": ("text", []),
+    "lines": ("lines", ["text"]),
+    "tokens": ("token_buffer", ["text"]),
+    "functions": ("functions", ["tokens"]),
+}
+
+
+class Analyzer:
+    """A stat that analyze_file can compute.
+
+    Each analyzer declares the shared artifacts it reads (see ARTIFACTS) and the
+    result keys it produces. Before running the selected analyzers the engine builds
+    only the artifacts they need, each one exactly once, so asking for `line_count`
+    alone never lexes the file.
+
+    Attributes:
+        name (str): Stat name users select (e.g. "line_count")
+        inputs (list): Artifacts the analyzer reads, keys of ARTIFACTS
+        outputs (list): Keys the analyzer adds to the results
+        run (callable): Called with the FileContext, after its inputs are built;
+            returns a dict with the output keys
+        label (str): Human readable name shown by the CLI
+        version (int): Bump when the analyzer's output changes, to invalidate cached results
+    """
+
+    def __init__(self, name, inputs, outputs, run, label=None, version=1):
+        unknown_inputs = [artifact for artifact in inputs if artifact not in ARTIFACTS]
+        if unknown_inputs:
+            raise ValueError(f"Analyzer {name} requests unknown artifacts: {unknown_inputs}. Available artifacts are: {list(ARTIFACTS)}")
+        self.name = name
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.run = run
+        self.label = label or name.replace("_", " ").title()
+        self.version = version
+
+    def __repr__(self):
+        return f"Analyzer({self.name!r}, inputs={self.inputs}, outputs={self.outputs})"
+
+
+# registered analyzers, in the order their results appear in the output
+_analyzers = {}
+_plugins_loaded = False
+
+
+def register(analyzer):
+    """Add an analyzer to the registry, replacing any analyzer with the same name."""
+    _analyzers[analyzer.name] = analyzer
+    return analyzer
+
+
+def get_analyzers():
+    """Every registered analyzer, built-in ones first, then the ones from entry points."""
+    _load_plugins()
+    return list(_analyzers.values())
+
+
+def get_analyzer(name):
+    """The analyzer registered under `name`, or None."""
+    _load_plugins()
+    return _analyzers.get(name)
+
+
+def available_stats():
+    """Names of every stat that can be selected."""
+    return [analyzer.name for analyzer in get_analyzers()]
+
+
+def plan(selected_stats):
+    """Work out what a run needs: the artifacts to build, in dependency order, and the analyzers.
+
+    Args:
+        selected_stats (list): Names of registered analyzers
+
+    Returns:
+        tuple: (artifact names in build order, analyzers in output order)
+    """
+    selected = set(selected_stats)
+    analyzers = [analyzer for analyzer in get_analyzers() if analyzer.name in selected]
+
+    # depth-first walk of the dependency DAG, so every artifact comes after its dependencies
+    artifacts = []
+
+    def visit(artifact):
+        if artifact in artifacts:
+            return
+        for dependency in ARTIFACTS[artifact][1]:
+            visit(dependency)
+        artifacts.append(artifact)
+
+    for analyzer in analyzers:
+        for artifact in analyzer.inputs:
+            visit(artifact)
+    return artifacts, analyzers
+
+
+def run_analyzers(context, selected_stats):
+    """Compute the selected stats for a file.
+
+    Args:
+        context (FileContext): The file to analyze
+        selected_stats (list): Names of registered analyzers
+
+    Returns:
+        dict: The output keys of every selected analyzer
+    """
+    artifacts, analyzers = plan(selected_stats)
+    for artifact in artifacts:
+        getattr(context, ARTIFACTS[artifact][0])  # cached on the context from now on
+
+    results = {}
+    for analyzer in analyzers:
+        results.update(analyzer.run(context))
+    return results
+
+
+def _load_plugins():
+    """Register the analyzers other packages expose in the spicecode.analyzers entry point group.
+
+    An entry point may refer to an Analyzer or to a list of them. Plugins that fail
+    to load are skipped with a warning instead of breaking every analysis.
+    """
+    global _plugins_loaded
+    if _plugins_loaded:
+        return
+    _plugins_loaded = True
+    try:
+        plugins = entry_points(group=ENTRY_POINT_GROUP)
+    except TypeError:
+        # before Python 3.10, entry_points() takes no arguments and returns a dict of groups
+        plugins = entry_points().get(ENTRY_POINT_GROUP, [])
+    for entry_point in plugins:
+        try:
+            loaded = entry_point.load()
+            for analyzer in loaded if isinstance(loaded, (list, tuple)) else [loaded]:
+                if not isinstance(analyzer, Analyzer):
+                    raise TypeError(f"expected an Analyzer, got {type(analyzer).__name__}")
+                register(analyzer)
+        except Exception as e:
+            warnings.warn(f"Could not load analyzer plugin {entry_point.name}: {e}")
+
+
+# built-in analyzers (imported lazily so picking a few stats does not import every analyzer)
+
+def _line_count(context):
+    from spice.analyzers.count_lines import count_lines
+    return {"line_count": count_lines(context.text)}
+
+
+def _comment_line_count(context):
+    from spice.analyzers.count_comment_lines import count_comment_lines
+    return {"comment_line_count": count_comment_lines(context)}
+
+
+def _inline_comment_count(context):
+    from spice.analyzers.count_inline_comments import count_inline_comments
+    return {"inline_comment_count": count_inline_comments(context)}
+
+
+def _indentation_level(context):
+    from spice.analyzers.indentation import detect_indentation
+    indentation_info = detect_indentation(context)
+    return {
+        "indentation_type": indentation_info["indentation_type"],
+        "indentation_size": indentation_info["indentation_size"]
+    }
+
+
+def _function_count(context):
+    from spice.analyzers.count_functions import count_functions
+    return {"function_count": count_functions(context)}
+
+
+def _external_dependencies_count(context):
+    from spice.analyzers.count_external_dependencies import count_external_dependencies
+    return {"external_dependencies_count": count_external_dependencies(context)}
+
+
+def _method_type_count(context):
+    from spice.analyzers.count_method_type import count_method_type
+    private_methods, public_methods = count_method_type(context)
+    return {"method_type_count": {"private": private_methods, "public": public_methods}}
+
+
+def _comment_ratio(context):
+    from spice.analyzers.count_comment_ratio import count_comment_ratio
+    return {"comment_ratio": count_comment_ratio(context)}
+
+
+def _average_function_size(context):
+    from spice.analyzers.average_function_size import calculate_average_function_size
+    return {"average_function_size": calculate_average_function_size(context)}
+
+
+def _duplicate_code_detection(context):
+    from spice.analyzers.duplicate_code_detection import get_duplicate_code_summary
+    duplicate_info = get_duplicate_code_summary(context)
+    return {
+        "duplicate_blocks": duplicate_info["duplicate_blocks"],
+        "duplicate_lines": duplicate_info["duplicate_lines"],
+        "duplicate_percentage": duplicate_info["duplicate_percentage"]
+    }
+
+
+def _asymptotic_complexity(context):
+    from spice.analyzers.asymptotic_complexity import analyze_asymptotic_complexity
+    complexity_info = analyze_asymptotic_complexity(context)
+    return {
+        "average_complexity": complexity_info["average_complexity"],
+        "complexity_distribution": complexity_info["complexity_distribution"],
+        "total_analyzed_functions": complexity_info.get("total_functions", 0)
+    }
+
+
+register(Analyzer("line_count", ["text"], ["line_count"], _line_count))
+register(Analyzer("comment_line_count", ["tokens"], ["comment_line_count"], _comment_line_count))
+register(Analyzer("inline_comment_count", ["tokens"], ["inline_comment_count"], _inline_comment_count))
+register(Analyzer("indentation_level", ["lines"], ["indentation_type", "indentation_size"], _indentation_level,
+                  label="Indentation Analysis"))
+register(Analyzer("function_count", ["functions"], ["function_count"], _function_count))
+register(Analyzer("external_dependencies_count", ["text"], ["external_dependencies_count"], _external_dependencies_count))
+register(Analyzer("method_type_count", ["functions"], ["method_type_count"], _method_type_count))
+register(Analyzer("comment_ratio", ["lines"], ["comment_ratio"], _comment_ratio, label="Comment to Code Ratio"))
+register(Analyzer("average_function_size", ["functions"], ["average_function_size"], _average_function_size))
+register(Analyzer("duplicate_code_detection", ["lines"], ["duplicate_blocks", "duplicate_lines", "duplicate_percentage"],
+                  _duplicate_code_detection))
+register(Analyzer("asymptotic_complexity", ["lines", "functions"], ["average_complexity", "complexity_distribution", "total_analyzed_functions"],
+                  _asymptotic_complexity, label="Asymptotic Complexity Analysis"))
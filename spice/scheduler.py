@@ -0,0 +1,138 @@
+import itertools
+import os
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from spice.aggregate import Aggregate
+from utils.get_lexer import SUPPORTED_EXTENSIONS
+
+# directories that never hold code worth analyzing
+IGNORED_DIRECTORIES = {"node_modules", "__pycache__", "venv", "vendor"}
+
+# how many files a worker takes from the queue at a time
+DEFAULT_CHUNK_SIZE = 16
+
+
+def find_source_files(root):
+    """Walk `root` and yield every file with a supported extension, in a stable order.
+
+    Hidden directories (.git, .venv, ...) and the ones in IGNORED_DIRECTORIES are skipped.
+    """
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith(".") and d not in IGNORED_DIRECTORIES)
+        for filename in sorted(filenames):
+            if os.path.splitext(filename)[1] in SUPPORTED_EXTENSIONS:
+                yield os.path.join(dirpath, filename)
+
+
+def analyze_files(file_paths, selected_stats=None, jobs=None, chunk_size=DEFAULT_CHUNK_SIZE, cache=None, ordered=True):
+    """Analyze many files on a pool of worker processes.
+
+    Files are sent to the workers in chunks of `chunk_size` so the per-task overhead is
+    paid once per chunk, and only a couple of chunks per worker are queued at any time,
+    so the whole file list never has to be in flight at once.
+
+    Args:
+        file_paths (iterable): Paths of the files to analyze
+        selected_stats (list, optional): Stats to compute, as in analyze_file
+        jobs (int, optional): Number of worker processes. Defaults to the number of CPUs;
+            1 analyzes everything in the current process.
+        chunk_size (int): Number of files per task sent to a worker
+        cache (ResultCache, optional): Result cache shared by all workers
+        ordered (bool): Yield the results in the order of `file_paths`; if False,
+            each chunk is yielded as soon as it is done, whichever it is
+
+    Yields:
+        dict: One result per file, in the same order as `file_paths` unless `ordered`
+            is False. Files that fail to analyze yield a dict with an "error" key.
+    """
+    chunks = _chunked(file_paths, chunk_size)
+    for results in _run_chunks(_analyze_chunk, chunks, jobs, selected_stats, cache, ordered=ordered):
+        yield from results
+
+
+def aggregate_files(file_paths, selected_stats=None, jobs=None, chunk_size=DEFAULT_CHUNK_SIZE, cache=None, root=None):
+    """Analyze many files and fold their results into one Aggregate, without keeping them.
+
+    Each worker folds its chunk into a partial Aggregate and sends back only that,
+    and the partials are merged as they arrive, so neither the workers nor this
+    process ever hold more than a chunk of results.
+
+    Args:
+        file_paths (iterable): Paths of the files to analyze
+        selected_stats (list, optional): Stats to compute, as in analyze_file
+        jobs (int, optional): Number of worker processes, as in analyze_files
+        chunk_size (int): Number of files per task sent to a worker
+        cache (ResultCache, optional): Result cache shared by all workers
+        root (str, optional): Analyzed directory, see Aggregate
+
+    Returns:
+        Aggregate: The aggregate of every file, failed ones counted as errors
+    """
+    aggregate = Aggregate(root)
+    chunks = _chunked(file_paths, chunk_size)
+    for partial in _run_chunks(_aggregate_chunk, chunks, jobs, selected_stats, cache, root, ordered=False):
+        aggregate.merge(partial)
+    return aggregate
+
+
+def _run_chunks(task, chunks, jobs, *args, ordered=True):
+    """Run task(chunk, *args) for every chunk on `jobs` worker processes and yield the outputs,
+    in the order of the chunks or, if not `ordered`, in the order they finish."""
+    jobs = jobs or os.cpu_count() or 1
+
+    if jobs == 1:
+        for chunk in chunks:
+            yield task(chunk, *args)
+        return
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(task, chunk, *args))
+            # keep every worker busy without queuing the whole tree
+            if len(pending) >= jobs * 2:
+                yield _take_finished(pending, ordered)
+        while pending:
+            yield _take_finished(pending, ordered)
+
+
+def _take_finished(pending, ordered):
+    """Remove the oldest future from `pending` (or, if not `ordered`, the first one to finish) and return its result."""
+    if ordered:
+        return pending.popleft().result()
+    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+    future = next(iter(done))
+    pending.remove(future)
+    return future.result()
+
+
+def _chunked(iterable, size):
+    """Split an iterable into lists of at most `size` items."""
+    iterator = iter(iterable)
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
+
+
+def _analyze_chunk(file_paths, selected_stats, cache=None):
+    """Analyze a chunk of files inside a worker process."""
+    return [_analyze_file_safely(file_path, selected_stats, cache) for file_path in file_paths]
+
+
+def _aggregate_chunk(file_paths, selected_stats, cache=None, root=None):
+    """Analyze a chunk of files inside a worker process and fold them into a partial aggregate."""
+    return Aggregate(root).update(_analyze_file_safely(file_path, selected_stats, cache) for file_path in file_paths)
+
+
+def _analyze_file_safely(file_path, selected_stats, cache=None):
+    """Analyze one file, turning any failure into an error entry instead of aborting the run."""
+    # imported here so that find_source_files() does not load the analysis engine
+    from spice.analyze import analyze_file
+    try:
+        return analyze_file(file_path, selected_stats=selected_stats, cache=cache)
+    except Exception as e:
+        return {
+            "file_name": os.path.basename(file_path),
+            "file_path": os.path.abspath(file_path),
+            "error": str(e)
+        }
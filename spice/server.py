@@ -0,0 +1,192 @@
+import json
+import multiprocessing
+import os
+import secrets
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from spice.analyze import ANALYZER_VERSION, _validate_stats
+from spice.client import TOKEN_HEADER, server_state_path
+from spice.file_context import FileContext
+from spice.registry import run_analyzers
+from spice.scheduler import DEFAULT_CHUNK_SIZE, _analyze_chunk, _chunked
+
+DEFAULT_HOST = "127.0.0.1"
+
+# a few lines in every supported language, analyzed by each worker at start-up
+_WARM_UP_SOURCES = {
+    ".py": b"import os\n\nclass A:\n    def f(self, x):\n        # comment\n        for i in x:\n            return f(i)\n",
+    ".js": b"import x from 'x';\n\nfunction f(a) {\n    // comment\n    for (const i of a) { return f(i); }\n}\n",
+    ".go": b"package main\n\nimport \"os\"\n\nfunc f(a []int) int {\n    // comment\n    for range a { return f(a) }\n    return 0\n}\n",
+    ".rb": b"require 'x'\n\nclass A\n  def f(a)\n    # comment\n    a.each do |i|\n      return f(i)\n    end\n  end\nend\n",
+}
+
+
+class AnalysisServer(ThreadingHTTPServer):
+    """Long-running HTTP server that analyzes files for the CLI, editors and CI.
+
+    Every connection is handled on its own thread, while the analysis itself runs
+    on a pool of worker processes that stay alive between requests, so the imports,
+    the compiled lexers and the registered analyzers are loaded once per worker
+    instead of once per command. The API takes JSON and returns JSON:
+
+        GET  /health   -> {"analyzer_version": ..., "pid": ...}
+        POST /analyze  {"file_paths": [...], "selected_stats": [...] or null, "use_cache": true}
+                       -> {"files": [one result per path, in order]}
+
+    Files that fail to analyze get an "error" entry, as in a directory run. See
+    spice.client.ServerClient for the client side.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, host=DEFAULT_HOST, port=0, jobs=None, cache=None, token=None):
+        """
+        Args:
+            host (str): Address to listen on
+            port (int): Port to listen on, 0 picks a free one
+            jobs (int, optional): Worker processes. Defaults to the number of CPUs;
+                1 analyzes on a single thread of the server process.
+            cache (ResultCache, optional): Result cache shared by all workers
+            token (str, optional): Token clients must send. Defaults to a random one.
+        """
+        super().__init__((host, port), _RequestHandler)
+        self.jobs = jobs or os.cpu_count() or 1
+        self.cache = cache
+        self.token = token or secrets.token_hex(16)
+        # chunks submitted to the pool and not done yet, cancelled when the server stops
+        self._pending = set()
+        if self.jobs == 1:
+            self.executor = ThreadPoolExecutor(max_workers=1)
+        else:
+            # fresh worker processes: forked ones would inherit the listening socket and the server threads
+            self.executor = ProcessPoolExecutor(max_workers=self.jobs, mp_context=multiprocessing.get_context("spawn"))
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def warm_up(self):
+        """Load the analyzers and lexers in every worker before the first request comes in."""
+        for future in [self.executor.submit(_warm_up) for _ in range(self.jobs)]:
+            future.result()
+
+    def write_state(self, path=None):
+        """Tell clients where to find this server. The file is only readable by its owner."""
+        path = path or server_state_path()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        host, port = self.server_address[:2]
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"host": host, "port": port, "pid": os.getpid(), "token": self.token}, f)
+
+    def remove_state(self, path=None):
+        """Remove the state file, unless another server has replaced it since."""
+        path = path or server_state_path()
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                if json.load(f).get("token") != self.token:
+                    return
+            os.remove(path)
+        except (OSError, ValueError):
+            pass
+
+    def submit(self, file_paths, selected_stats=None, use_cache=True):
+        """Queue files on the worker pool, in chunks, and return one future per chunk.
+
+        Raises:
+            ValueError: If invalid stats are requested, before anything is queued
+        """
+        selected_stats = _validate_stats(selected_stats)
+        cache = self.cache if use_cache else None
+        futures = []
+        for chunk in _chunked(file_paths, DEFAULT_CHUNK_SIZE):
+            future = self.executor.submit(_analyze_chunk, chunk, selected_stats, cache)
+            self._pending.add(future)
+            future.add_done_callback(self._pending.discard)
+            futures.append(future)
+        return futures
+
+    def analyze(self, file_paths, selected_stats=None, use_cache=True):
+        """Analyze files on the worker pool, in chunks, and return the results in order."""
+        return [results for future in self.submit(file_paths, selected_stats, use_cache) for results in future.result()]
+
+    def server_close(self):
+        super().server_close()
+        # shutdown(cancel_futures=True) would do this, but only from Python 3.9; the chunks
+        # already running are still waited for
+        for future in list(self._pending):
+            future.cancel()
+        self.executor.shutdown()
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        if not self._authorized():
+            return
+        if self.path != "/health":
+            self._reply(404, {"error": f"Unknown path: {self.path}"})
+            return
+        self._reply(200, {"analyzer_version": ANALYZER_VERSION, "pid": os.getpid()})
+
+    def do_POST(self):
+        if not self._authorized():
+            return
+        if self.path != "/analyze":
+            self._reply(404, {"error": f"Unknown path: {self.path}"})
+            return
+        try:
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            file_paths = request["file_paths"]
+            if not isinstance(file_paths, list):
+                raise ValueError("file_paths must be a list")
+        except (KeyError, TypeError, ValueError) as e:
+            self._reply(400, {"error": f"Invalid request: {e}"})
+            return
+        try:
+            futures = self.server.submit(file_paths, request.get("selected_stats"), request.get("use_cache", True))
+        except ValueError as e:
+            self._reply(400, {"error": str(e)})
+            return
+        if request.get("stream"):
+            self._stream(futures)
+        else:
+            self._reply(200, {"files": [results for future in futures for results in future.result()]})
+
+    def _authorized(self):
+        if secrets.compare_digest(self.headers.get(TOKEN_HEADER, ""), self.server.token):
+            return True
+        self._reply(403, {"error": "Missing or wrong token"})
+        return False
+
+    def _reply(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _stream(self, futures):
+        """Send one JSON line per file as soon as its chunk is done; the end of the response ends the list."""
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.end_headers()
+        try:
+            for future in as_completed(futures):
+                self.wfile.write(b"".join(json.dumps(results).encode() + b"\n" for results in future.result()))
+                self.wfile.flush()
+        finally:
+            # when the client went away, do not analyze what nobody will read
+            for future in futures:
+                future.cancel()
+
+    def log_message(self, format, *args):
+        pass  # one line per request would drown the server's own output
+
+
+def _warm_up():
+    for ext, source in _WARM_UP_SOURCES.items():
+        run_analyzers(FileContext(f"warm-up{ext}", source), _validate_stats(None))
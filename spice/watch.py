@@ -0,0 +1,113 @@
+import os
+import time
+
+from spice.analyze import _validate_stats
+from spice.scheduler import _analyze_file_safely, find_source_files
+
+# seconds between two scans of the watched tree
+DEFAULT_INTERVAL = 1.0
+
+
+class Watcher:
+    """Keep the analysis results of every supported file under a directory up to date.
+
+    The watcher polls the tree with an index of file sizes and modification times:
+    the first scan() analyzes every file, later scans only stat the files and analyze
+    again the ones that were added or changed since the previous scan. Everything
+    (the registered analyzers, the compiled lexers, the latest results and the
+    digest of the contents they were computed from) stays in memory between scans,
+    so the start-up cost is paid once per session and a file that was saved without
+    being edited is not analyzed again.
+
+    Attributes:
+        root (str): Directory being watched
+        selected_stats (list): Stats computed for every file
+        results (dict): Latest results of every file, by absolute path
+    """
+
+    def __init__(self, root, selected_stats=None, cache=None):
+        """
+        Args:
+            root (str): Directory to watch
+            selected_stats (list, optional): Stats to compute. If None, compute all stats.
+            cache (ResultCache, optional): Persistent cache looked up before analyzing a file
+        """
+        if not os.path.isdir(root):
+            raise ValueError(f"Path is not a directory: {root}")
+        self.root = root
+        self.selected_stats = _validate_stats(selected_stats)
+        self.results = {}
+        self._stats = {}  # path -> (size, mtime_ns) when it was last analyzed
+        self._session_cache = _SessionCache(cache)
+
+    def scan(self):
+        """Look for changes since the previous scan and analyze the changed files again.
+
+        Returns:
+            tuple: (results of the files whose stats changed, paths of the removed files)
+        """
+        changed = []
+        seen = set()
+        for file_path in find_source_files(self.root):
+            path = os.path.abspath(file_path)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue  # removed while walking; reported with the other removed files
+            seen.add(path)
+            signature = (stat.st_size, stat.st_mtime_ns)
+            if self._stats.get(path) == signature:
+                continue
+            self._stats[path] = signature
+
+            results = _analyze_file_safely(path, self.selected_stats, self._session_cache)
+            if results != self.results.get(path):
+                self.results[path] = results
+                changed.append(results)
+
+        removed = sorted(path for path in self.results if path not in seen)
+        for path in removed:
+            del self.results[path]
+            self._stats.pop(path, None)
+            self._session_cache.forget(path)
+        return changed, removed
+
+    def run(self, on_change, interval=DEFAULT_INTERVAL):
+        """Scan forever, calling on_change(changed, removed) after every scan that found something.
+
+        The first scan reports every file. Stop with KeyboardInterrupt.
+        """
+        while True:
+            changed, removed = self.scan()
+            if changed or removed:
+                on_change(changed, removed)
+            time.sleep(interval)
+
+
+class _SessionCache:
+    """Latest stats of every file, kept in memory in front of an optional ResultCache.
+
+    Used as the cache of analyze_file, so a file whose contents did not change since
+    it was last analyzed is answered from memory without running any analyzer.
+    """
+
+    def __init__(self, backing=None):
+        self.backing = backing
+        self._entries = {}  # path -> (digest, stats)
+
+    def get(self, context, selected_stats):
+        entry = self._entries.get(context.path)
+        if entry is not None and entry[0] == context.digest:
+            return entry[1]
+        stats = self.backing.get(context, selected_stats) if self.backing is not None else None
+        if stats is not None:
+            self._entries[context.path] = (context.digest, stats)
+        return stats
+
+    def put(self, context, selected_stats, stats):
+        self._entries[context.path] = (context.digest, stats)
+        if self.backing is not None:
+            self.backing.put(context, selected_stats, stats)
+
+    def forget(self, path):
+        self._entries.pop(path, None)
@@ -0,0 +1,355 @@
+import fs from 'fs';
+import path from 'path';
+import crypto from 'crypto';
+
+const DATA_DIR = path.join(process.cwd(), 'data');
+
+// Every submission is appended to this log as one JSON line; replaying it rebuilds the data
+const LOG_FILE = path.join(DATA_DIR, 'metrics.log');
+
+// Written by earlier versions, which rewrote the whole file on every submission; imported once
+const LEGACY_FILE = path.join(DATA_DIR, 'metrics.json');
+
+// Analyses older than this are left out and dropped at the next compaction
+export const RETENTION_MS = 7 * 24 * 60 * 60 * 1000;
+
+// The log is rewritten with only the live entries once it holds this many times more records...
+const COMPACTION_RATIO = 2;
+// ...and at least this many, so small logs are never rewritten
+const COMPACTION_MIN_RECORDS = 1000;
+
+// Numeric fields the analyses can be sorted on, computed once when an analysis is stored
+export const SORT_FIELDS = [
+  'timestamp',
+  'line_count',
+  'comment_line_count',
+  'comment_ratio',
+  'function_count',
+  'average_function_size',
+  'external_dependencies_count',
+  'duplicate_percentage'
+] as const;
+
+export type SortField = typeof SORT_FIELDS[number];
+
+// Sorted and filtered lists kept between requests until the data changes
+const MAX_CACHED_VIEWS = 32;
+
+export interface MetricData {
+  id: string;
+  hash: string;
+  timestamp: number;
+  file_name: string;
+  file_path: string;
+  metrics: any;
+}
+
+// One analysis as sent by the CLI: file_path, file_name, file_size and the metrics
+export interface Submission {
+  file_path: string;
+  file_name: string;
+  file_size?: number;
+  [metric: string]: any;
+}
+
+export interface SubmitResult {
+  id: string;
+  isDuplicate: boolean;
+}
+
+// An analysis as the dashboard shows it, with comment_ratio as a fraction
+export interface FileItem extends MetricData {
+  readable_timestamp: string;
+}
+
+export interface QueryOptions {
+  prefix?: string;
+  extension?: string;
+  sort: SortField;
+  order: 'asc' | 'desc';
+  cursor?: string;
+  limit: number;
+}
+
+export interface Page {
+  items: FileItem[];
+  nextCursor: string | null;
+  total: number;
+}
+
+interface IndexedEntry {
+  entry: MetricData;
+  item: FileItem;
+  extension: string;
+  keys: Record<SortField, number>;
+}
+
+function generateHash(filePath: string, fileSize: number, metrics: any): string {
+  const hashData = JSON.stringify({ filePath, fileSize, metrics });
+  return crypto.createHash('md5').update(hashData).digest('hex');
+}
+
+function toNumber(value: any): number {
+  // comment_ratio is sent as a string such as "16.23%"
+  const number = typeof value === 'string' ? parseFloat(value) / (value.endsWith('%') ? 100 : 1) : value;
+  return typeof number === 'number' && isFinite(number) ? number : 0;
+}
+
+function indexEntry(entry: MetricData): IndexedEntry {
+  const metrics = entry.metrics || {};
+  const commentRatio = toNumber(metrics.comment_ratio);
+  const keys = {} as Record<SortField, number>;
+  for (const field of SORT_FIELDS) {
+    keys[field] = field === 'timestamp' ? entry.timestamp : toNumber(metrics[field]);
+  }
+  return {
+    entry,
+    item: {
+      ...entry,
+      metrics: { ...metrics, comment_ratio: commentRatio },
+      readable_timestamp: new Date(entry.timestamp).toLocaleString('pt-BR')
+    },
+    extension: metrics.file_extension || path.extname(entry.file_path),
+    keys
+  };
+}
+
+function encodeCursor(indexed: IndexedEntry, sort: SortField): string {
+  return Buffer.from(JSON.stringify([indexed.keys[sort], indexed.entry.file_path])).toString('base64url');
+}
+
+export function decodeCursor(cursor: string): [number, string] | null {
+  try {
+    const [value, filePath] = JSON.parse(Buffer.from(cursor, 'base64url').toString('utf8'));
+    return typeof value === 'number' && typeof filePath === 'string' ? [value, filePath] : null;
+  } catch {
+    return null;
+  }
+}
+
+export function isValidSubmission(submission: any): submission is Submission {
+  return !!submission && typeof submission === 'object' && !!submission.file_path && !!submission.file_name;
+}
+
+/**
+ * Latest analysis of every file, kept in memory and persisted in an append-only log.
+ *
+ * A submission costs one append to the log and one update of the index keyed by
+ * file_path, whatever the amount of data already stored. Once most of the log is
+ * made of replaced or expired records, it is rewritten in the background with only
+ * the live entries; records submitted meanwhile are appended after the rewrite.
+ *
+ * Each entry also keeps the form the dashboard shows and its numeric sort keys, so
+ * query() only sorts and filters. The sorted and filtered lists are reused between
+ * requests until `version` changes, which makes `version` usable as an ETag.
+ */
+export class MetricsStore {
+  private entries = new Map<string, IndexedEntry>();
+  private views = new Map<string, IndexedEntry[]>();
+  private viewsVersion = -1;
+  // tells the versions of two server processes apart
+  private readonly generation = crypto.randomBytes(4).toString('hex');
+  private records = 0;
+  version = 0;
+  private compacting = false;
+  // records submitted while the log is being rewritten, appended once it is done
+  private pending: string[] | null = null;
+
+  constructor(private logFile: string = LOG_FILE, legacyFile: string = LEGACY_FILE) {
+    fs.mkdirSync(path.dirname(logFile), { recursive: true });
+    if (fs.existsSync(logFile)) {
+      this.load();
+    } else if (fs.existsSync(legacyFile)) {
+      this.importLegacy(legacyFile);
+    }
+  }
+
+  /** Store analyses in order; an unchanged analysis of a file is reported as a duplicate. */
+  submit(submissions: Submission[]): SubmitResult[] {
+    const lines: string[] = [];
+    const results = submissions.map(({ file_path, file_name, file_size, ...metrics }) => {
+      const hash = generateHash(file_path, file_size || 0, metrics);
+      const isDuplicate = this.entries.get(file_path)?.entry.hash === hash;
+      const entry: MetricData = {
+        id: crypto.randomUUID(),
+        hash,
+        timestamp: Date.now(),
+        file_name,
+        file_path,
+        metrics
+      };
+      // delete first so the map stays ordered from the least to the most recently submitted
+      this.entries.delete(file_path);
+      this.entries.set(file_path, indexEntry(entry));
+      lines.push(JSON.stringify(entry) + '\n');
+      return { id: entry.id, isDuplicate };
+    });
+
+    if (this.pending) {
+      this.pending.push(...lines);
+    } else if (lines.length) {
+      fs.appendFileSync(this.logFile, lines.join(''));
+    }
+    this.records += lines.length;
+    this.version++;
+    this.scheduleCompaction();
+    return results;
+  }
+
+  /** Analyses of the last RETENTION_MS, from the least to the most recently submitted. */
+  list(): MetricData[] {
+    this.expire();
+    return Array.from(this.entries.values(), indexed => indexed.entry);
+  }
+
+  /**
+   * One page of the analyses under `prefix` with the given extension, sorted on a
+   * numeric field (ties by path). The cursor of a page is the sort key and path of
+   * its last analysis, so pages stay consistent while analyses come in.
+   */
+  query({ prefix, extension, sort, order, cursor, limit }: QueryOptions): Page {
+    const view = this.view(prefix, extension, sort, order);
+    let start = 0;
+    const after = cursor ? decodeCursor(cursor) : null;
+    if (after) {
+      // first analysis that sorts after the cursor
+      let high = view.length;
+      while (start < high) {
+        const middle = (start + high) >> 1;
+        if (compareKeys(view[middle].keys[sort], view[middle].entry.file_path, after[0], after[1], order) <= 0) {
+          start = middle + 1;
+        } else {
+          high = middle;
+        }
+      }
+    }
+    const page = view.slice(start, start + limit);
+    const hasMore = start + limit < view.length;
+    return {
+      items: page.map(indexed => indexed.item),
+      nextCursor: hasMore && page.length ? encodeCursor(page[page.length - 1], sort) : null,
+      total: view.length
+    };
+  }
+
+  /** Changes whenever the stored analyses do. */
+  get etag(): string {
+    this.expire();
+    return `W/"${this.generation}-${this.version}"`;
+  }
+
+  get size(): number {
+    return this.entries.size;
+  }
+
+  private expire(): void {
+    const cutoff = Date.now() - RETENTION_MS;
+    // the map is ordered by submission, so the expired entries are all at its start
+    for (const [filePath, indexed] of this.entries) {
+      if (indexed.entry.timestamp > cutoff) break;
+      this.entries.delete(filePath);
+      this.version++;
+    }
+    this.scheduleCompaction();
+  }
+
+  private view(prefix: string | undefined, extension: string | undefined, sort: SortField, order: 'asc' | 'desc'): IndexedEntry[] {
+    this.expire();
+    if (this.viewsVersion !== this.version) {
+      this.views.clear();
+      this.viewsVersion = this.version;
+    }
+    const key = JSON.stringify([prefix, extension, sort, order]);
+    let view = this.views.get(key);
+    if (!view) {
+      view = Array.from(this.entries.values()).filter(indexed =>
+        (!prefix || indexed.entry.file_path.startsWith(prefix)) && (!extension || indexed.extension === extension)
+      );
+      view.sort((a, b) => compareKeys(a.keys[sort], a.entry.file_path, b.keys[sort], b.entry.file_path, order));
+      if (this.views.size >= MAX_CACHED_VIEWS) this.views.clear();
+      this.views.set(key, view);
+    }
+    return view;
+  }
+
+  private load(): void {
+    const cutoff = Date.now() - RETENTION_MS;
+    for (const line of fs.readFileSync(this.logFile, 'utf8').split('\n')) {
+      if (!line) continue;
+      let entry: MetricData;
+      try {
+        entry = JSON.parse(line);
+      } catch {
+        continue; // a record cut short by a crash
+      }
+      this.records++;
+      this.entries.delete(entry.file_path);
+      if (entry.timestamp > cutoff) this.entries.set(entry.file_path, indexEntry(entry));
+    }
+  }
+
+  private importLegacy(legacyFile: string): void {
+    let data: MetricData[] = [];
+    try {
+      const parsed = JSON.parse(fs.readFileSync(legacyFile, 'utf8'));
+      if (Array.isArray(parsed)) data = parsed;
+    } catch {
+      // unreadable: start empty, like the old API did
+    }
+    const cutoff = Date.now() - RETENTION_MS;
+    data
+      .filter(entry => entry.timestamp > cutoff)
+      .sort((a, b) => a.timestamp - b.timestamp)
+      .forEach(entry => this.entries.set(entry.file_path, indexEntry(entry)));
+    this.records = this.entries.size;
+    fs.writeFileSync(this.logFile, this.serialize());
+    console.log(`Imported ${this.entries.size} analyses from ${legacyFile}`);
+  }
+
+  private serialize(): string {
+    return Array.from(this.entries.values(), indexed => JSON.stringify(indexed.entry) + '\n').join('');
+  }
+
+  private scheduleCompaction(): void {
+    if (this.compacting || this.records < COMPACTION_MIN_RECORDS || this.records < COMPACTION_RATIO * this.entries.size) {
+      return;
+    }
+    this.compacting = true;
+    // after the current response has been sent
+    setImmediate(() => this.compact());
+  }
+
+  private async compact(): Promise<void> {
+    this.pending = [];
+    const snapshot = this.serialize();
+    const compacted = this.entries.size;
+    const tmpFile = `${this.logFile}.${process.pid}.tmp`;
+    try {
+      await fs.promises.writeFile(tmpFile, snapshot);
+      await fs.promises.rename(tmpFile, this.logFile);
+      this.records = compacted + this.pending!.length;
+    } catch (error) {
+      console.error('Error compacting metrics log:', error);
+    } finally {
+      const pending = this.pending!;
+      this.pending = null;
+      this.compacting = false;
+      if (pending.length) fs.appendFileSync(this.logFile, pending.join(''));
+    }
+  }
+}
+
+function compareKeys(valueA: number, pathA: string, valueB: number, pathB: string, order: 'asc' | 'desc'): number {
+  const byValue = order === 'asc' ? valueA - valueB : valueB - valueA;
+  return byValue || (pathA < pathB ? -1 : pathA > pathB ? 1 : 0);
+}
+
+// Kept on globalThis so that reloading the API routes in development does not load the log again
+const globalStore = globalThis as unknown as { metricsStore?: MetricsStore };
+
+export function getStore(): MetricsStore {
+  if (!globalStore.metricsStore) {
+    globalStore.metricsStore = new MetricsStore();
+  }
+  return globalStore.metricsStore;
+}
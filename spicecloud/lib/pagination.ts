@@ -0,0 +1,67 @@
+import { NextApiRequest, NextApiResponse } from 'next';
+import { QueryOptions, SORT_FIELDS, SortField, decodeCursor } from './metricsStore';
+
+// Analyses per page when the client does not ask for a number, and the most it can ask for
+export const DEFAULT_LIMIT = 100;
+export const MAX_LIMIT = 1000;
+
+function single(value: string | string[] | undefined): string | undefined {
+  return Array.isArray(value) ? value[0] : value;
+}
+
+/**
+ * Read ?prefix=, ?extension=, ?sort=, ?order=, ?cursor= and ?limit= from the query
+ * string. Returns an error message when one of them is not valid.
+ */
+export function parseQueryOptions(query: NextApiRequest['query']): QueryOptions | string {
+  const sort = single(query.sort) || 'timestamp';
+  if (!(SORT_FIELDS as readonly string[]).includes(sort)) {
+    return `sort must be one of ${SORT_FIELDS.join(', ')}`;
+  }
+
+  const order = single(query.order) || 'desc';
+  if (order !== 'asc' && order !== 'desc') {
+    return 'order must be asc or desc';
+  }
+
+  const limitParam = single(query.limit);
+  const limit = limitParam === undefined ? DEFAULT_LIMIT : Number(limitParam);
+  if (!Number.isInteger(limit) || limit < 1) {
+    return 'limit must be a positive integer';
+  }
+
+  const cursor = single(query.cursor);
+  if (cursor && !decodeCursor(cursor)) {
+    return 'invalid cursor';
+  }
+
+  // accept "py" as well as ".py"
+  let extension = single(query.extension);
+  if (extension && !extension.startsWith('.')) {
+    extension = `.${extension}`;
+  }
+
+  return {
+    prefix: single(query.prefix),
+    extension,
+    sort: sort as SortField,
+    order: order as 'asc' | 'desc',
+    cursor,
+    limit: Math.min(limit, MAX_LIMIT)
+  };
+}
+
+/**
+ * Set the ETag of the response, and answer 304 Not Modified without a body when
+ * the client sent it back in If-None-Match. Returns true if the response was sent.
+ */
+export function notModified(req: NextApiRequest, res: NextApiResponse, etag: string): boolean {
+  res.setHeader('ETag', etag);
+  res.setHeader('Cache-Control', 'no-cache');
+  const ifNoneMatch = req.headers['if-none-match'];
+  if (ifNoneMatch && ifNoneMatch.split(',').some(tag => tag.trim() === etag || tag.trim() === '*')) {
+    res.status(304).end();
+    return true;
+  }
+  return false;
+}
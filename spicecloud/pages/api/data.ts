@@ -1,38 +1,6 @@
 import { NextApiRequest, NextApiResponse } from 'next';
-import fs from 'fs';
-import path from 'path';
-
-const DATA_FILE = path.join(process.cwd(), 'data', 'metrics.json');
-
-interface MetricData {
-  id: string;
-  hash: string;
-  timestamp: number;
-  file_name: string;
-  file_path: string;
-  metrics: any;
-}
-
-function loadData(): MetricData[] {
-  if (!fs.existsSync(DATA_FILE)) {
-    return [];
-  }
-  try {
-    const data = fs.readFileSync(DATA_FILE, 'utf8');
-    return JSON.parse(data);
-  } catch {
-    return [];
-  }
-}
-
-function cleanOldData(data: MetricData[]): MetricData[] {
-  const sevenDaysAgo = Date.now() - (7 * 24 * 60 * 60 * 1000);
-  return data.filter(item => item.timestamp > sevenDaysAgo);
-}
-
-function saveData(data: MetricData[]): void {
-  fs.writeFileSync(DATA_FILE, JSON.stringify(data, null, 2));
-}
+import { getStore } from '../../lib/metricsStore';
+import { notModified, parseQueryOptions } from '../../lib/pagination';
 
 export default function handler(req: NextApiRequest, res: NextApiResponse) {
   if (req.method !== 'GET') {
@@ -40,31 +8,31 @@ export default function handler(req: NextApiRequest, res: NextApiResponse) {
   }
 
   try {
-    // Load and clean data
-    let data = loadData();
-    const originalLength = data.length;
-    data = cleanOldData(data);
-    
-    // Save cleaned data if we removed any old entries
-    if (data.length !== originalLength) {
-      saveData(data);
-      console.log(`Cleaned ${originalLength - data.length} old entries`);
+    // Sorted by timestamp (newest first) unless asked otherwise
+    const options = parseQueryOptions(req.query);
+    if (typeof options === 'string') {
+      return res.status(400).json({ error: options });
     }
 
-    // Sort by timestamp (newest first)
-    data.sort((a, b) => b.timestamp - a.timestamp);
+    const store = getStore();
+    if (notModified(req, res, store.etag)) {
+      return;
+    }
+
+    const { items, nextCursor, total } = store.query(options);
 
     res.status(200).json({
       success: true,
-      data: data.map(item => ({
+      data: items.map(item => ({
         ...item,
-        age: Date.now() - item.timestamp,
-        readable_timestamp: new Date(item.timestamp).toLocaleString()
-      }))
+        age: Date.now() - item.timestamp
+      })),
+      nextCursor,
+      total
     });
 
   } catch (error) {
     console.error('Error loading data:', error);
     res.status(500).json({ error: 'Internal server error' });
   }
-}
\ No newline at end of file
+}
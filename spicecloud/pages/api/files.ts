@@ -1,15 +1,28 @@
 // pages/api/files.ts
-import { promises as fs } from 'fs';
-import path from 'path';
+import { NextApiRequest, NextApiResponse } from 'next';
+import { getStore } from '../../lib/metricsStore';
+import { notModified, parseQueryOptions } from '../../lib/pagination';
+
+export default function handler(req: NextApiRequest, res: NextApiResponse) {
+  if (req.method !== 'GET') {
+    return res.status(405).json({ error: 'Method not allowed' });
+  }
 
-export default async function handler(req: any, res: { status: (arg0: number) => { (): any; new(): any; json: { (arg0: { error: string; }): void; new(): any; }; }; }) {
   try {
-    const filePath = path.join(process.cwd(), 'data', 'metrics.json');
-    const fileContent = await fs.readFile(filePath, 'utf-8');
-    const jsonData = JSON.parse(fileContent);
-    res.status(200).json(jsonData);
+    const options = parseQueryOptions(req.query);
+    if (typeof options === 'string') {
+      return res.status(400).json({ error: options });
+    }
+
+    const store = getStore();
+    if (notModified(req, res, store.etag)) {
+      return;
+    }
+
+    const { items, nextCursor, total } = store.query(options);
+    res.status(200).json({ files: items, nextCursor, total });
   } catch (err) {
-    console.error('Erro ao ler metrics.json', err);
-    res.status(500).json({ error: 'Failed to load metrics.json' });
+    console.error('Erro ao ler as métricas', err);
+    res.status(500).json({ error: 'Failed to load metrics' });
   }
 }
@@ -0,0 +1,44 @@
+import { NextApiRequest, NextApiResponse } from 'next';
+import { getStore, isValidSubmission } from '../../../lib/metricsStore';
+
+// A batch holds the analyses of many files at once
+export const config = {
+  api: {
+    bodyParser: {
+      sizeLimit: '16mb'
+    }
+  }
+};
+
+export default function handler(req: NextApiRequest, res: NextApiResponse) {
+  if (req.method !== 'POST') {
+    return res.status(405).json({ error: 'Method not allowed' });
+  }
+
+  try {
+    const files = req.body?.files;
+
+    if (!Array.isArray(files)) {
+      return res.status(400).json({ error: 'files must be a list of analyses' });
+    }
+
+    const invalid = files.findIndex(file => !isValidSubmission(file));
+    if (invalid !== -1) {
+      return res.status(400).json({ error: `file_path and file_name are required (files[${invalid}])` });
+    }
+
+    const results = getStore().submit(files);
+    const duplicates = results.filter(result => result.isDuplicate).length;
+    console.log(`Added ${results.length - duplicates} and updated ${duplicates} analyses`);
+
+    res.status(200).json({
+      success: true,
+      message: 'Data submitted successfully',
+      results
+    });
+
+  } catch (error) {
+    console.error('Error processing batch submission:', error);
+    res.status(500).json({ error: 'Internal server error' });
+  }
+}
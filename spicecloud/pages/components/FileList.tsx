@@ -7,9 +7,12 @@ interface FileListProps {
   data: MetricData[];
   selectedFile: MetricData | null;
   onFileSelect: (file: MetricData) => void;
+  hasMore: boolean;
+  loading: boolean;
+  onLoadMore: () => void;
 }
 
-export const FileList: React.FC<FileListProps> = ({ data, selectedFile, onFileSelect }) => {
+export const FileList: React.FC<FileListProps> = ({ data, selectedFile, onFileSelect, hasMore, loading, onLoadMore }) => {
   return (
     <div style={styles.sidebar}>
       <h2 style={styles.sidebarTitle}>
@@ -57,12 +60,24 @@ export const FileList: React.FC<FileListProps> = ({ data, selectedFile, onFileSe
                 </div>
                 <div style={styles.fileAge}>
                   <span>🕒</span>
-                  {formatAge(item.age)}
+                  {formatAge(Date.now() - item.timestamp)}
                 </div>
               </div>
             </div>
           </div>
         ))}
+        {hasMore && (
+          <button
+            onClick={onLoadMore}
+            disabled={loading}
+            style={{
+              ...styles.refreshButton,
+              background: loading ? '#bfa865' : '#d97304'
+            }}
+          >
+            {loading ? '🔄 Loading...' : 'Load more'}
+          </button>
+        )}
       </div>
     </div>
   );
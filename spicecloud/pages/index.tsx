@@ -9,7 +9,7 @@ import { EmptyState } from './components/EmptyState';
 import { styles } from './utils/styles';
 
 export default function Home() {
-  const { data, selectedFile, setSelectedFile, loading, error, fetchData } = useData();
+  const { data, total, hasMore, selectedFile, setSelectedFile, loading, error, fetchData, loadMore } = useData();
 
   if (loading && data.length === 0) {
     return <LoadingSpinner />;
@@ -31,7 +31,7 @@ export default function Home() {
       </style>
       
       <Header 
-        dataLength={data.length}
+        dataLength={total}
         loading={loading}
         onRefresh={fetchData}
       />
@@ -41,6 +41,9 @@ export default function Home() {
           data={data}
           selectedFile={selectedFile}
           onFileSelect={setSelectedFile}
+          hasMore={hasMore}
+          loading={loading}
+          onLoadMore={loadMore}
         />
 
         <div style={styles.metricsArea}>
@@ -14,7 +14,7 @@ export interface MetricData {
     function_count: number;
     external_dependencies_count: number;
     method_type_count: { private: number; public: number };
-    comment_ratio: string;
+    comment_ratio: number;
     average_function_size?: number;
 
     /* duplicate code */
@@ -27,6 +27,5 @@ export interface MetricData {
     complexity_distribution?: Record<string, number>;
     total_analyzed_functions?: number;
   };
-  age: number;
   readable_timestamp: string;
 }
@@ -1,36 +1,70 @@
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useRef } from 'react';
 import { MetricData } from './types';
 
-export const useData = () => {
+// Files fetched at a time; "Load more" asks the server for the next page
+const PAGE_SIZE = 100;
+
+// The most files the server returns in one page (MAX_LIMIT in lib/pagination.ts)
+const MAX_PAGE_SIZE = 1000;
+
+// Which files to list and in which order; filtering and sorting happen on the server
+export interface DataQuery {
+  prefix?: string;
+  extension?: string;
+  sort?: string;
+  order?: 'asc' | 'desc';
+}
+
+export const useData = (query: DataQuery = {}) => {
   const [data, setData] = useState<MetricData[]>([]);
+  const [total, setTotal] = useState(0);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [selectedFile, setSelectedFile] = useState<MetricData | null>(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
 
+  // ETag of the last refresh: the server answers 304 while nothing changed
+  const etag = useRef<string | null>(null);
+  // files shown so far, fetched again on every refresh
+  const loaded = useRef(PAGE_SIZE);
+
+  const buildUrl = (limit: number, cursor?: string) => {
+    const params = new URLSearchParams({ limit: String(limit) });
+    Object.entries({ ...query, cursor }).forEach(([key, value]) => {
+      if (value) params.set(key, value);
+    });
+    return `/api/files?${params}`;
+  };
+
   const fetchData = async () => {
     try {
       setLoading(true);
 
-      // Adjust the route if your endpoint is different
-      const res = await fetch('/api/files');
+      const res = await fetch(buildUrl(Math.min(loaded.current, MAX_PAGE_SIZE)), {
+        cache: 'no-store',
+        headers: etag.current ? { 'If-None-Match': etag.current } : {}
+      });
+      if (res.status === 304) return;
       if (!res.ok) throw new Error(`HTTP ${res.status}`);
 
-      const json = await res.json();
+      let json = await res.json();
+      const responseEtag = res.headers.get('ETag');
+      const files: MetricData[] = [...json.files];
 
-      const files = json.map((f: any) => ({
-        ...f,
-        age: Date.now() - f.timestamp,
-        readable_timestamp: new Date(f.timestamp).toLocaleString('pt-BR'),
-        // If comment_ratio comes as string ("16.23%") and you prefer number:
-        metrics: {
-          ...f.metrics,
-          comment_ratio: typeof f.metrics.comment_ratio === 'string'
-            ? parseFloat(f.metrics.comment_ratio) / 100
-            : f.metrics.comment_ratio
-        }
-      }));
+      // the server caps the page size, so page through until every file shown before is back
+      while (json.nextCursor && files.length < loaded.current) {
+        const page = await fetch(buildUrl(Math.min(loaded.current - files.length, MAX_PAGE_SIZE), json.nextCursor), {
+          cache: 'no-store'
+        });
+        if (!page.ok) throw new Error(`HTTP ${page.status}`);
+        json = await page.json();
+        files.push(...json.files);
+      }
+      etag.current = responseEtag;
 
       setData(files);
+      setTotal(json.total);
+      setNextCursor(json.nextCursor);
       if (files.length && !selectedFile) setSelectedFile(files[0]);
     } catch (err) {
       setError('Erro ao buscar dados');
@@ -40,6 +74,27 @@ export const useData = () => {
     }
   };
 
+  const loadMore = async () => {
+    if (!nextCursor) return;
+    try {
+      setLoading(true);
+
+      const res = await fetch(buildUrl(PAGE_SIZE, nextCursor), { cache: 'no-store' });
+      if (!res.ok) throw new Error(`HTTP ${res.status}`);
+
+      const json = await res.json();
+      loaded.current += json.files.length;
+      setData(previous => [...previous, ...json.files]);
+      setTotal(json.total);
+      setNextCursor(json.nextCursor);
+    } catch (err) {
+      setError('Erro ao buscar dados');
+      console.error(err);
+    } finally {
+      setLoading(false);
+    }
+  };
+
   useEffect(() => {
     fetchData();
     const interval = setInterval(fetchData, 10000);
@@ -48,10 +103,13 @@ export const useData = () => {
 
   return {
     data,
+    total,
+    hasMore: nextCursor !== null,
     selectedFile,
     setSelectedFile,
     loading,
     error,
-    fetchData
+    fetchData,
+    loadMore
   };
-};
\ No newline at end of file
+};
@@ -0,0 +1,91 @@
+import json
+import os
+from typer.testing import CliRunner
+from cli.main import app
+from spice.analyze import analyze_directory, analyze_file
+from spice.scheduler import find_source_files, analyze_files
+
+# Setup test runner
+runner = CliRunner()
+
+# Get the absolute path to the sample code directory
+SAMPLE_CODE_DIR = os.path.join(os.path.dirname(__file__), "..", "sample-code")
+
+def create_tree(root):
+    """Create a small source tree with supported, unsupported and ignored files."""
+    (root / "pkg").mkdir()
+    (root / "pkg" / "main.py").write_text("import os\n\ndef main():\n    pass  # todo\n")
+    (root / "pkg" / "util.js").write_text("// helper\nfunction helper() {}\n")
+    (root / "README.md").write_text("# not code\n")
+    (root / "node_modules").mkdir()
+    (root / "node_modules" / "dep.js").write_text("function dep() {}\n")
+    (root / ".git").mkdir()
+    (root / ".git" / "hook.py").write_text("x = 1\n")
+
+def test_find_source_files_skips_unsupported_and_ignored(tmp_path):
+    """Test that only supported files outside ignored directories are found."""
+    create_tree(tmp_path)
+    found = [os.path.relpath(path, tmp_path) for path in find_source_files(str(tmp_path))]
+    assert found == [os.path.join("pkg", "main.py"), os.path.join("pkg", "util.js")]
+
+def test_analyze_files_pool_matches_single_process():
+    """Test that the process pool returns the same results, in order, as a single process."""
+    paths = list(find_source_files(SAMPLE_CODE_DIR))
+    stats = ["line_count", "comment_line_count"]
+    pooled = list(analyze_files(paths, selected_stats=stats, jobs=2, chunk_size=3))
+    assert pooled == [analyze_file(path, selected_stats=stats) for path in paths]
+
+def test_analyze_directory_reports_errors_and_summary(tmp_path):
+    """Test that a broken file is reported without stopping the run."""
+    create_tree(tmp_path)
+    (tmp_path / "broken.py").write_bytes(b"\xff\xfe not utf-8")
+    report = analyze_directory(str(tmp_path), selected_stats=["line_count"], jobs=1)
+    assert len(report["files"]) == 3
+    assert "error" in report["files"][0]
+    assert report["summary"]["file_count"] == 3
+    assert report["summary"]["error_count"] == 1
+    assert report["summary"]["files_by_extension"] == {".py": 1, ".js": 1}
+    assert report["summary"]["totals"]["line_count"] == 6
+
+def test_analyze_command_with_directory(tmp_path):
+    """Test the analyze command on a directory with the --json flag"""
+    create_tree(tmp_path)
+    result = runner.invoke(app, ["analyze", str(tmp_path), "--json", "--jobs", "1"])
+    assert result.exit_code == 0
+    output = json.loads(result.stdout)
+    assert output["directory"] == os.path.abspath(tmp_path)
+    assert [entry["file_name"] for entry in output["files"]] == ["main.py", "util.js"]
+    assert output["summary"]["totals"]["comment_line_count"] == 1
+    assert output["summary"]["totals"]["inline_comment_count"] == 1
+
+def test_analyze_files_unordered_yields_every_result():
+    """Test that results in completion order are the same results as in file order."""
+    paths = list(find_source_files(SAMPLE_CODE_DIR))
+    stats = ["line_count"]
+    unordered = list(analyze_files(paths, selected_stats=stats, jobs=2, chunk_size=1, ordered=False))
+    key = lambda result: result["file_path"]
+    assert sorted(unordered, key=key) == sorted(analyze_files(paths, selected_stats=stats, jobs=1), key=key)
+
+def test_analyze_command_ndjson(tmp_path, monkeypatch):
+    """Test that --format ndjson prints one compact record per file without building a report"""
+    def fail(*args, **kwargs):
+        raise AssertionError("kept every result in memory")
+
+    monkeypatch.setattr("spice.analyze.analyze_directory", fail)
+    create_tree(tmp_path)
+    (tmp_path / "broken.py").write_bytes(b"\xff\xfe not utf-8")
+    result = runner.invoke(app, ["analyze", str(tmp_path), "--format", "ndjson", "--jobs", "2", "--no-cache"])
+    assert result.exit_code == 0
+    lines = result.stdout.splitlines()
+    records = sorted((json.loads(line) for line in lines), key=lambda record: record["file_name"])
+    assert [record["file_name"] for record in records] == ["broken.py", "main.py", "util.js"]
+    assert "error" in records[0]
+    assert records[1] == analyze_file(str(tmp_path / "pkg" / "main.py"))
+    assert all(line == json.dumps(json.loads(line), separators=(",", ":")) for line in lines)
+
+def test_analyze_command_ndjson_single_file():
+    """Test that a single file is one ndjson line"""
+    path = os.path.join(SAMPLE_CODE_DIR, "example.rb")
+    result = runner.invoke(app, ["analyze", path, "-f", "ndjson", "--no-cache"])
+    assert result.exit_code == 0
+    assert [json.loads(line) for line in result.stdout.splitlines()] == [analyze_file(path)]
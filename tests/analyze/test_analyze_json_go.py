@@ -31,7 +31,7 @@ def test_analyze_command_with_json_flag():
     assert output["file_name"] == os.path.basename(SAMPLE_FILE_PATH)
     assert output["line_count"] == 195
     assert output["comment_line_count"] == 33
-    assert output["function_count"] == 15
+    assert output["function_count"] == 18
     assert output["inline_comment_count"] == 1
 
 def test_analyze_command_with_all_and_json_flags():
@@ -48,7 +48,7 @@ def test_analyze_command_with_all_and_json_flags():
     # Verify the values match expected results
     assert output["line_count"] == 195
     assert output["comment_line_count"] == 33
-    assert output["function_count"] == 15
+    assert output["function_count"] == 18
     assert output["inline_comment_count"] == 1
 
 def test_analyze_command_with_nonexistent_file():
@@ -31,7 +31,7 @@ def test_analyze_command_with_json_flag():
     assert output["file_name"] == os.path.basename(SAMPLE_FILE_PATH)
     assert output["line_count"] == 172 #THIS CAN'T BE HARD CODED, BUT WE'LL FIX THIS LATER
     assert output["comment_line_count"] == 23 #this is the number of comment lines in the sample file
-    assert output["function_count"] == 18
+    assert output["function_count"] == 16
     assert output["inline_comment_count"] == 2
 
 def test_analyze_command_with_all_and_json_flags():
@@ -48,7 +48,7 @@ def test_analyze_command_with_all_and_json_flags():
     # Verify the values match expected results
     assert output["line_count"] == 172 #THIS CAN'T BE HARD CODED, BUT WE'LL FIX THIS LATER
     assert output["comment_line_count"] == 23
-    assert output["function_count"] == 18
+    assert output["function_count"] == 16
     assert output["inline_comment_count"] == 2
 
 def test_analyze_command_with_nonexistent_file():
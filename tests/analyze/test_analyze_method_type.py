@@ -29,9 +29,7 @@ class MyClass {
 """
     with open("temp_test.js", "w") as f:
         f.write(js_code)
-    # Your function only matches "function name() {" syntax, so this will return (0, 0)
-    # To match class methods, update your function or adjust the test:
-    assert count_method_type("temp_test.js") == (0, 0)
+    assert count_method_type("temp_test.js") == (1, 1)
     os.remove("temp_test.js")
 
     # Go
@@ -43,7 +41,7 @@ func (m MyStruct) privateMethod() {}
 """
     with open("temp_test.go", "w") as f:
         f.write(go_code)
-    assert count_method_type("temp_test.go") == (0, 0)  # (private, public)
+    assert count_method_type("temp_test.go") == (1, 1)  # (private, public)
     os.remove("temp_test.go")
 
     # Ruby
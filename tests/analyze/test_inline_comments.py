@@ -1,4 +1,5 @@
 import os
+from spice.analyzers.count_comment_lines import count_comment_lines
 from spice.analyzers.count_inline_comments import count_inline_comments
 
 # Get path to the sample files
@@ -84,4 +85,20 @@ def test_count_inline_comments_with_mixed_comments():
         assert count == 2, f"Expected 2 inline comments in file with mixed comments, got {count}"
     finally:
         # Clean up the temporary file
-        os.unlink(temp_name) 
\ No newline at end of file
+        os.unlink(temp_name)
+
+def test_comments_after_a_triple_quoted_docstring(tmp_path):
+    """Test that comments after a docstring are counted, not taken as part of the string."""
+    file_path = tmp_path / "docstring.py"
+    file_path.write_text(
+        '"""Module docstring."""\n'
+        "# first comment\n"
+        "x = 1  # inline\n"
+        "def f():\n"
+        "    '''Function docstring,\n"
+        "    on two lines.'''\n"
+        "    # second comment\n"
+        "    return x  # inline again\n"
+    )
+    assert count_comment_lines(str(file_path)) == 2
+    assert count_inline_comments(str(file_path)) == 2
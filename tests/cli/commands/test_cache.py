@@ -0,0 +1,50 @@
+import json
+import os
+from typer.testing import CliRunner
+from cli.main import app
+
+# Setup test runner
+runner = CliRunner()
+
+def test_analyze_stores_results_and_cache_clear_removes_them(tmp_path):
+    """Test that analyze fills the cache, --no-cache bypasses it and cache clear empties it."""
+    cache_dir = os.environ["SPICECODE_CACHE_DIR"]
+    file_path = tmp_path / "sample.py"
+    file_path.write_text("# comment\nx = 1\n")
+
+    result = runner.invoke(app, ["analyze", str(file_path), "--json", "--no-cache"])
+    assert result.exit_code == 0
+    assert not os.path.exists(cache_dir)
+
+    first = runner.invoke(app, ["analyze", str(file_path), "--json"])
+    second = runner.invoke(app, ["analyze", str(file_path), "--json"])
+    assert json.loads(first.stdout) == json.loads(second.stdout)
+    assert os.listdir(cache_dir)
+
+    result = runner.invoke(app, ["cache", "clear"])
+    assert result.exit_code == 0
+    assert not os.path.exists(cache_dir)
+
+def test_cache_clear_keeps_the_spool_and_clone_indexes(tmp_path):
+    """Test that cache clear only removes analysis results, not what else lives next to them."""
+    from cli.submission import Spool
+    from spice.cache import ResultCache
+    from spice.clones import CloneIndex, default_index_path
+    from spice.file_context import FileContext
+
+    cache = ResultCache()
+    context = FileContext("f.py", b"x = 1\n")
+    cache.put(context, ["line_count"], {"line_count": 1})
+    spool = Spool()
+    spool.add([{"file_path": "/repo/a.py", "file_name": "a.py", "line_count": 1}])
+    spool.close()
+    with CloneIndex(default_index_path(str(tmp_path))) as index:
+        index.update(str(tmp_path))
+
+    result = runner.invoke(app, ["cache", "clear"])
+    assert result.exit_code == 0
+    assert cache.get(context, ["line_count"]) is None
+    spool = Spool()
+    assert [payload["file_path"] for _, payload in spool.peek(10)] == ["/repo/a.py"]
+    spool.close()
+    assert os.path.exists(default_index_path(str(tmp_path)))
@@ -0,0 +1,33 @@
+import json
+from typer.testing import CliRunner
+from cli.main import app
+
+# Setup test runner
+runner = CliRunner()
+
+# a function long enough to always be fingerprinted, with distinct lines
+SHARED_CODE = "\n".join(f"    total_{i} = compute_{i}(value, {i})" for i in range(20))
+
+def write_clones(tmp_path):
+    """Two files sharing code, under a long directory name that looks like rich markup."""
+    directory = tmp_path / "[red]sub" / ("very_long_directory_name_" * 4)
+    directory.mkdir(parents=True)
+    (directory / "a.py").write_text("def first(value):\n" + SHARED_CODE + "\n")
+    (directory / "b.py").write_text("def second(value):\n" + SHARED_CODE + "\n")
+    return directory
+
+def test_clones_json_is_valid_json(tmp_path):
+    """Test that long paths are not wrapped and [...] in paths is kept"""
+    directory = write_clones(tmp_path)
+    result = runner.invoke(app, ["clones", str(tmp_path), "--json"])
+    assert result.exit_code == 0
+    clones = json.loads(result.stdout)["clones"]
+    assert len(clones) == 1
+    assert clones[0]["file_a"] == str(directory / "a.py")
+
+def test_clones_text_keeps_paths_with_brackets(tmp_path):
+    """Test that paths are printed as they are, not read as markup"""
+    write_clones(tmp_path)
+    result = runner.invoke(app, ["clones", str(tmp_path)])
+    assert result.exit_code == 0
+    assert "[red]sub" in result.stdout
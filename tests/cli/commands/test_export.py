@@ -0,0 +1,156 @@
+import csv
+import json
+import math
+import os
+import sqlite3
+from typer.testing import CliRunner
+from cli.main import app
+from cli.commands.export.export import FILE_COLUMNS, HTML_CHUNK_ROWS, export_files
+from cli.commands.export.typed import COLUMN_CHUNK_ROWS, MISSING_INT, TYPED_COLUMNS, load_npz
+from spice.analyze import analyze_file
+from spice.scheduler import find_source_files
+
+# Setup test runner
+runner = CliRunner()
+
+SAMPLE_CODE_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "sample-code")
+
+def fake_results(count):
+    """Results produced one at a time, like analyze_files does; some files have fewer stats."""
+    for i in range(count):
+        result = {"file_name": f"f{i}.py", "file_path": f"/repo/f{i}.py", "line_count": i}
+        if i % 2:
+            result["method_type_count"] = {"public": i, "private": 1}
+            result["complexity_distribution"] = {"O(n)": i}
+        if i % 7 == 3:
+            result = {"file_name": f"f{i}.py", "file_path": f"/repo/f{i}.py", "error": "<broken> | file"}
+        yield result
+
+def test_json_export_is_an_array(tmp_path):
+    """Test that the streamed JSON array holds every result"""
+    output = tmp_path / "out.json"
+    assert export_files(fake_results(1000), "json", str(output), {}) == 1000
+    assert json.loads(output.read_text()) == list(fake_results(1000))
+    assert export_files(iter([]), "json", str(output), {}) == 0
+    assert json.loads(output.read_text()) == []
+
+def test_csv_export_has_a_stable_schema(tmp_path):
+    """Test that every row has every column, whatever stats the file has"""
+    output = tmp_path / "out.csv"
+    assert export_files(fake_results(100), "csv", str(output), {}) == 100
+    with open(output, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert list(rows[0]) == FILE_COLUMNS
+    assert len(rows) == 100
+    assert (rows[1]["line_count"], rows[1]["public_methods"], rows[1]["private_methods"]) == ("1", "1", "1")
+    assert (rows[2]["public_methods"], rows[2]["complexity_distribution"]) == ("", "")
+    assert json.loads(rows[5]["complexity_distribution"]) == {"O(n)": 5}
+    assert rows[3]["error"] == "<broken> | file"
+
+def test_markdown_and_html_exports_have_one_row_per_file(tmp_path):
+    """Test the markdown and HTML tables, with values escaped"""
+    count = HTML_CHUNK_ROWS * 2 + 3
+    markdown = tmp_path / "out.md"
+    assert export_files(fake_results(count), "markdown", str(markdown), {}) == count
+    lines = markdown.read_text(encoding="utf-8").splitlines()
+    assert len([line for line in lines if line.startswith("| f")]) == count
+    assert "<broken> \\| file" in markdown.read_text()
+
+    broken = iter([{"file_name": "a.py", "file_path": "/repo/a\nb.py", "error": "line one\r\nline | two"}])
+    assert export_files(broken, "markdown", str(markdown), {}) == 1
+    rows = [line for line in markdown.read_text(encoding="utf-8").splitlines() if line.startswith("| a.py")]
+    assert len(rows) == 1
+    assert "/repo/a<br>b.py" in rows[0] and "line one<br>line \\| two" in rows[0]
+
+    page = tmp_path / "out.html"
+    assert export_files(fake_results(count), "html", str(page), {}) == count
+    text = page.read_text(encoding="utf-8")
+    assert text.count("<tr><td>") == count
+    assert "&lt;broken&gt;" in text
+    assert text.endswith("</html>")
+
+def test_sqlite_export_appends_typed_runs(tmp_path):
+    """Test that each export adds a run of typed rows to the database"""
+    output = tmp_path / "out.sqlite"
+    assert export_files(fake_results(100), "sqlite", str(output), {}) == 100
+    assert export_files(fake_results(10), "sqlite", str(output), {}) == 10
+    connection = sqlite3.connect(output)
+    try:
+        assert connection.execute("SELECT id, file_count FROM runs ORDER BY id").fetchall() == [(1, 100), (2, 10)]
+        row = connection.execute(
+            "SELECT line_count, typeof(line_count), public_methods, private_methods FROM files WHERE run_id = 1 AND file_name = 'f5.py'"
+        ).fetchone()
+        assert row == (5, "integer", 5, 1)
+        assert connection.execute("SELECT public_methods, error FROM files WHERE file_name = 'f3.py' AND run_id = 1").fetchone() == (None, "<broken> | file")
+        assert connection.execute(
+            "SELECT c.function_count FROM complexity c JOIN files f ON f.id = c.file_id WHERE f.file_name = 'f5.py' AND f.run_id = 1"
+        ).fetchall() == [(5,)]
+        # trend queries over the export time use its index
+        plan = connection.execute("EXPLAIN QUERY PLAN SELECT sum(line_count) FROM files WHERE exported_at > 0").fetchall()
+        assert "files_by_time" in str(plan)
+    finally:
+        connection.close()
+
+def test_sqlite_columns_are_typed(tmp_path):
+    """Test that comment_ratio is stored as a number"""
+    output = tmp_path / "out.sqlite"
+    export_files(iter([{"file_name": "a.py", "file_path": "/a.py", "comment_ratio": "16.23%"}]), "sqlite", str(output), {})
+    connection = sqlite3.connect(output)
+    try:
+        assert connection.execute("SELECT comment_ratio, typeof(comment_ratio) FROM files").fetchone() == (16.23, "real")
+    finally:
+        connection.close()
+
+def test_npz_export_has_one_typed_array_per_column(tmp_path):
+    """Test the npz columns, over more rows than a chunk"""
+    count = COLUMN_CHUNK_ROWS + 5
+    output = tmp_path / "out.npz"
+    assert export_files(fake_results(count), "npz", str(output), {}) == count
+    columns = load_npz(str(output))
+    assert {name for name, _ in TYPED_COLUMNS} <= set(columns)
+    assert columns["line_count"].dtype == "int64" and len(columns["line_count"]) == count
+    assert columns["line_count"][count - 1] == count - 1
+    assert columns["line_count"][3] == MISSING_INT
+    assert columns["public_methods"][5] == 5 and columns["public_methods"][4] == MISSING_INT
+    assert math.isnan(columns["comment_ratio"][0])
+    assert columns["file_path"][12] == "/repo/f12.py" and columns["error"][3] == "<broken> | file"
+    odd = [i for i in range(count) if i % 2 and i % 7 != 3]
+    assert columns["complexity.file_index"].tolist() == odd
+    assert columns["complexity.function_count"].tolist() == odd
+    assert set(columns["complexity.class"]) == {"O(n)"}
+    assert int(columns["format_version"]) == 1
+
+def test_empty_npz_export(tmp_path):
+    """Test that an export without files still loads"""
+    output = tmp_path / "out.npz"
+    assert export_files(iter([]), "npz", str(output), {}) == 0
+    columns = load_npz(str(output))
+    assert len(columns["file_path"]) == 0 and len(columns["line_count"]) == 0
+
+def test_unknown_format(tmp_path):
+    """Test that an unknown format exports nothing"""
+    assert export_files(fake_results(3), "xml", str(tmp_path / "out.xml"), {}) is None
+    assert not (tmp_path / "out.xml").exists()
+
+def test_export_command_with_directory(tmp_path):
+    """Test that exporting a directory writes one entry per supported file"""
+    output = tmp_path / "report.json"
+    result = runner.invoke(app, ["export", SAMPLE_CODE_DIR, "--format", "json", "--output", str(output)])
+    assert result.exit_code == 0
+    paths = list(find_source_files(SAMPLE_CODE_DIR))
+    assert json.loads(output.read_text()) == [analyze_file(path) for path in paths]
+
+def test_export_command_uses_the_result_cache(tmp_path):
+    """Test that a directory export reads and fills the same cache as analyze"""
+    cache_dir = os.environ["SPICECODE_CACHE_DIR"]
+    output = tmp_path / "report.json"
+    result = runner.invoke(app, ["export", SAMPLE_CODE_DIR, "--format", "json", "--output", str(output), "--no-cache"])
+    assert result.exit_code == 0
+    assert not os.path.exists(cache_dir)
+
+    result = runner.invoke(app, ["export", SAMPLE_CODE_DIR, "--format", "json", "--output", str(output)])
+    assert result.exit_code == 0
+    assert os.listdir(cache_dir)
+    first = json.loads(output.read_text())
+    result = runner.invoke(app, ["export", SAMPLE_CODE_DIR, "--format", "json", "--output", str(output)])
+    assert json.loads(output.read_text()) == first
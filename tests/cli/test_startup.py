@@ -0,0 +1,50 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT_DIR = os.path.join(os.path.dirname(__file__), "..", "..")
+
+# libraries and modules only some commands need; "spice version" or "spice hello" must not load them
+HEAVY_MODULES = ["InquirerPy", "requests", "rich.table", "cli.commands.analyze", "cli.commands.export.export",
+                 "spice.analyze", "numpy"]
+
+# import time of everything "spice version" loads after the interpreter has started, in
+# microseconds; importing every command eagerly took about 400 ms, loading only the
+# version command about 120 ms
+STARTUP_BUDGET = 200_000
+
+
+def imports(*args):
+    """Run spice with -X importtime and return (module, cumulative microseconds, top level) for every import."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-m", "cli.main", *args],
+                            capture_output=True, text=True, cwd=ROOT_DIR)
+    assert result.returncode == 0, result.stderr
+    found = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            # nested imports are indented below the module that imported them
+            found.append((name.strip(), int(cumulative), not name.startswith("  ")))
+    return found
+
+
+@pytest.mark.parametrize("command", ["version", "hello"])
+def test_light_commands_do_not_load_heavy_modules(command):
+    modules = {module for module, _, _ in imports(command)}
+    assert "cli.commands." + command in modules
+    assert [module for module in HEAVY_MODULES if module in modules] == []
+
+
+def test_version_startup_budget():
+    # the interpreter's own start-up (site, encodings...) is not ours to cut: only count what runs after runpy
+    def startup_time():
+        top_level = [(module, cumulative) for module, cumulative, top in imports("version") if top]
+        after_runpy = top_level[[module for module, _ in top_level].index("runpy") + 1:]
+        return sum(cumulative for _, cumulative in after_runpy)
+
+    elapsed = min(startup_time() for _ in range(3))
+    assert elapsed < STARTUP_BUDGET, f"spice version spent {elapsed / 1000:.0f} ms importing modules"
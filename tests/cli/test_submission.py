@@ -0,0 +1,183 @@
+import io
+import threading
+import time
+
+from cli.submission import SERVER_BATCH_URL, SERVER_URL, Spool, Submitter
+
+
+class FakeResponse:
+    def __init__(self, status_code, body=None):
+        self.status_code = status_code
+        self.body = body or {}
+
+    def json(self):
+        return self.body
+
+
+class FakeSession:
+    """Stands in for requests.Session: records every post and answers like spicecloud."""
+
+    def __init__(self, batch_endpoint=True, fail=False, gate=None):
+        self.posts = []
+        self.batch_endpoint = batch_endpoint
+        self.fail = fail
+        self.gate = gate
+
+    def post(self, url, json, timeout):
+        if self.gate is not None:
+            self.gate.wait()
+        if self.fail:
+            raise ConnectionError("server down")
+        self.posts.append((url, json))
+        if url == SERVER_BATCH_URL:
+            if not self.batch_endpoint:
+                return FakeResponse(404)
+            return FakeResponse(200, {"results": [{"isDuplicate": False} for _ in json["files"]]})
+        return FakeResponse(200, {"isDuplicate": True})
+
+
+def payloads(count):
+    return [{"file_name": f"f{i}.py", "file_path": f"/src/f{i}.py"} for i in range(count)]
+
+
+def test_results_are_sent_in_batches_in_order():
+    gate = threading.Event()
+    session = FakeSession(gate=gate)
+    submitter = Submitter(batch_size=100, session=session)
+    for payload in payloads(250):
+        submitter.submit(payload)
+    gate.set()
+    assert submitter.close()
+
+    sent = [payload for url, body in session.posts for payload in (body["files"] if url == SERVER_BATCH_URL else [body])]
+    assert sent == payloads(250)
+    assert all(len(body["files"]) <= 100 for url, body in session.posts if url == SERVER_BATCH_URL)
+    assert len(session.posts) < 250
+    assert (submitter.added + submitter.updated, submitter.failed) == (250, 0)
+
+
+def test_single_result_uses_the_submit_endpoint():
+    session = FakeSession()
+    submitter = Submitter(session=session)
+    submitter.submit(payloads(1)[0])
+    submitter.close()
+    assert session.posts == [(SERVER_URL, payloads(1)[0])]
+    assert submitter.updated == 1
+
+
+def test_servers_without_batch_endpoint_get_one_result_per_request():
+    gate = threading.Event()
+    session = FakeSession(batch_endpoint=False, gate=gate)
+    submitter = Submitter(session=session)
+    for payload in payloads(5):
+        submitter.submit(payload)
+    gate.set()
+    submitter.close()
+    assert [body for url, body in session.posts if url == SERVER_URL] == payloads(5)
+    assert submitter.updated == 5
+
+
+def test_submit_never_waits_for_the_server():
+    gate = threading.Event()
+    submitter = Submitter(session=FakeSession(gate=gate))
+    start = time.perf_counter()
+    for payload in payloads(50):
+        submitter.submit(payload)
+    assert time.perf_counter() - start < 1
+    gate.set()
+    submitter.close()
+
+
+def test_unreachable_server_results_are_spooled_and_sent_later():
+    spool = Spool()
+    submitter = Submitter(session=FakeSession(fail=True), spool=spool)
+    for payload in payloads(3):
+        submitter.submit(payload)
+    assert submitter.close()
+    assert (submitter.added + submitter.updated, submitter.failed) == (0, 0)
+    assert [payload for _, payload in spool.peek(10)] == payloads(3)
+    output = io.StringIO()
+    submitter.report(output)
+    assert output.getvalue() == ""
+
+    # the server is back, but the breaker keeps later runs off the network until the backoff is over
+    session = FakeSession()
+    submitter = Submitter(session=session, spool=spool)
+    submitter.submit(payloads(4)[3])
+    submitter.close()
+    assert session.posts == []
+    assert len(spool) == 4
+
+    spool.record_success()
+    submitter = Submitter(session=session, spool=spool)
+    submitter.submit(payloads(5)[4])
+    submitter.close()
+    assert [payload for url, body in session.posts for payload in body["files"]] == payloads(5)
+    assert len(spool) == 0
+
+
+def test_breaker_costs_no_time_while_the_server_is_down():
+    gate = threading.Event()  # never set: every request hangs
+    spool = Spool()
+    spool.record_failure()
+    submitter = Submitter(session=FakeSession(gate=gate), spool=spool)
+    start = time.perf_counter()
+    for payload in payloads(20):
+        submitter.submit(payload)
+    assert submitter.close()
+    assert time.perf_counter() - start < 1
+    assert len(spool) == 20
+
+
+def test_backoff_doubles_up_to_the_maximum(tmp_path):
+    spool = Spool(str(tmp_path / "spool.sqlite"), backoff_base=10, backoff_max=30)
+    delays = []
+    for _ in range(4):
+        spool.record_failure()
+        delays.append(round(spool.retry_at() - time.time()))
+    assert delays == [10, 20, 30, 30]
+    spool.record_success()
+    assert spool.retry_at() == 0
+
+
+def test_spool_keeps_the_latest_result_of_each_file(tmp_path):
+    spool = Spool(str(tmp_path / "spool.sqlite"), max_entries=3)
+    spool.add(payloads(3))
+    spool.add([{"file_name": "f0.py", "file_path": "/src/f0.py", "line_count": 2}])
+    assert [payload["file_path"] for _, payload in spool.peek(10)] == ["/src/f1.py", "/src/f2.py", "/src/f0.py"]
+    assert spool.peek(10)[-1][1]["line_count"] == 2
+    spool.add(payloads(5)[3:])
+    assert [payload["file_path"] for _, payload in spool.peek(10)] == ["/src/f0.py", "/src/f3.py", "/src/f4.py"]
+
+
+def test_results_survive_a_server_too_slow_for_the_exit():
+    gate = threading.Event()
+    spool = Spool()
+    submitter = Submitter(batch_size=10, session=FakeSession(gate=gate), spool=spool)
+    for payload in payloads(30):
+        submitter.submit(payload)
+    assert not submitter.close(timeout=0.2)
+    assert len(spool) == 30
+    gate.set()
+
+
+def test_idle_sender_retries_when_the_backoff_is_over():
+    spool = Spool(backoff_base=0.1)
+    spool.add(payloads(3))
+    spool.record_failure()
+    session = FakeSession()
+    submitter = Submitter(session=session, spool=spool)
+    deadline = time.monotonic() + 5
+    while len(spool) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert [payload for url, body in session.posts for payload in body["files"]] == payloads(3)
+    submitter.close()
+
+
+def test_report():
+    submitter = Submitter(session=FakeSession())
+    submitter.added, submitter.updated = 3, 1
+    submitter.close()
+    output = io.StringIO()
+    submitter.report(output)
+    assert output.getvalue() == "✓ 3 new analyses sent to server\n✓ Data updated on server (file was modified)\n"
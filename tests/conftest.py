@@ -0,0 +1,31 @@
+import pytest
+
+
+class _NoSubmitter:
+    """Stands in for cli.submission's background Submitter: records what the CLI would send."""
+
+    def __init__(self):
+        self.payloads = []
+
+    def submit(self, payload):
+        self.payloads.append(payload)
+
+    def close(self, timeout=None):
+        pass
+
+    def report(self, file=None):
+        pass
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache_dir(tmp_path, monkeypatch):
+    """Keep the analysis result cache of every test in its own temporary directory."""
+    monkeypatch.setenv("SPICECODE_CACHE_DIR", str(tmp_path / "spicecode-cache"))
+
+
+@pytest.fixture(autouse=True)
+def no_submissions(monkeypatch):
+    """Keep CLI commands from posting to spicecloud, and from spooling into the cache directory
+    from a background thread at a time no test controls."""
+    import cli.submission
+    monkeypatch.setattr(cli.submission, "_submitter", _NoSubmitter())
@@ -0,0 +1,30 @@
+import time
+
+import pytest
+
+from lexers.golang.golexer import GoLexer
+from lexers.javascript.javascriptlexer import JavaScriptLexer
+from lexers.python.pythonlexer import PythonLexer
+from lexers.ruby.rubylexer import RubyLexer
+
+FILE_SIZE = 5 * 1024 * 1024
+
+# generous on purpose: a linear lexer needs a few seconds for 5 MB, while matching
+# against a copy of the rest of the file for every token takes many minutes
+TIME_LIMIT = 30
+
+# non-ASCII identifiers and digits go through tokenize_identifier/tokenize_number
+# instead of the master regex, plus a Ruby symbol on every line
+LINE = "ñ" + "a" * 60 + " = ²" + "1" * 30 + " + :" + "s" * 20 + "\n"
+
+
+@pytest.mark.parametrize("Lexer", [PythonLexer, JavaScriptLexer, GoLexer, RubyLexer], ids=lambda lexer: lexer.__name__)
+def test_lexing_large_file_is_linear(Lexer):
+    source = LINE * (FILE_SIZE // len(LINE))
+
+    start = time.perf_counter()
+    tokens = Lexer(source).tokenize()
+    elapsed = time.perf_counter() - start
+
+    assert tokens[-1].line == source.count("\n") + 1
+    assert elapsed < TIME_LIMIT, f"{Lexer.__name__} took {elapsed:.1f}s to lex {FILE_SIZE} bytes"
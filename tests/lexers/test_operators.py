@@ -0,0 +1,41 @@
+import random
+
+import pytest
+
+from lexers.golang.golexer import GoLexer
+from lexers.javascript.javascriptlexer import JavaScriptLexer
+from lexers.operators import OperatorTrie
+from lexers.python.pythonlexer import PythonLexer
+from lexers.ruby.rubylexer import RubyLexer
+
+
+def longest_operator(operators, source, position):
+    """The old match_operator: try every operator, longest first."""
+    for op in sorted(operators, key=len, reverse=True):
+        if source.startswith(op, position):
+            return op
+    return None
+
+
+def test_longest_match():
+    trie = OperatorTrie({"<", "<<", "<<=", "="})
+    assert trie.match("<<= 1", 0) == "<<="
+    assert trie.match("<<1", 0) == "<<"
+    assert trie.match("a<b", 1) == "<"
+    assert trie.match("a<b", 0) is None
+    assert trie.match("<", 1) is None
+
+
+def test_prefix_that_is_not_an_operator():
+    trie = OperatorTrie({"...", "."})
+    assert trie.match("..x", 0) == "."
+
+
+@pytest.mark.parametrize("Lexer", [PythonLexer, JavaScriptLexer, GoLexer, RubyLexer], ids=lambda lexer: lexer.__name__)
+def test_same_matches_as_sorted_operators(Lexer):
+    alphabet = sorted({char for op in Lexer.OPERATORS for char in op}) + ["a", " "]
+    rnd = random.Random(0)
+    for _ in range(200):
+        source = "".join(rnd.choice(alphabet) for _ in range(30))
+        for position in range(len(source) + 1):
+            assert Lexer.OPERATOR_TRIE.match(source, position) == longest_operator(Lexer.OPERATORS, source, position)
@@ -0,0 +1,85 @@
+import glob
+import os
+
+import pytest
+
+from lexers.golang.golexer import GoLexer
+from lexers.javascript.javascriptlexer import JavaScriptLexer
+from lexers.python.pythonlexer import PythonLexer
+from lexers.ruby.rubylexer import RubyLexer
+from lexers.token import Token, TokenType
+
+LEXERS = [PythonLexer, JavaScriptLexer, GoLexer, RubyLexer]
+
+SAMPLES_DIR = os.path.join(os.path.dirname(__file__), "..", "sample-code")
+
+# inputs that mix the fast regex path with the character-by-character fallback
+TRICKY_SOURCES = [
+    "",
+    "x = 1\n",
+    "café = 'é' # comentário\n",
+    "s = \"a\\\"b\" + 'c\\'d'\n",
+    "/* multi\nline */ x\n",
+    "/*/ x */ y",
+    "\"unterminated\nnext",
+    "`raw\nstring` + 1.5e+3",
+    "\"\"\"doc\"\"\" x",
+    "@@count $1 @name :sym foo.bar",
+    "\"hello #{name}\"",
+    "a := b... c => d",
+    "x\t \ty\r\n z",
+]
+
+
+def slow_tokenize(Lexer, source):
+    """Reference tokenization that uses only the per-character scan_token path."""
+    lexer = Lexer(source)
+    tokens = []
+    while lexer.position < len(lexer.source_code):
+        token = lexer.scan_token()
+        if token is not None:
+            tokens.append(token)
+    tokens.append(Token(TokenType.EOF, "EOF", lexer.line, lexer.column))
+    return tokens
+
+
+def signature(tokens):
+    return [(t.type, t.value, t.line, t.column) for t in tokens]
+
+
+def sample_sources():
+    for path in sorted(glob.glob(os.path.join(SAMPLES_DIR, "*.*"))):
+        with open(path, "r", encoding="utf-8") as f:
+            yield f.read()
+
+
+@pytest.mark.parametrize("Lexer", LEXERS, ids=lambda lexer: lexer.__name__)
+@pytest.mark.parametrize("source", TRICKY_SOURCES)
+def test_master_pattern_matches_slow_path(Lexer, source):
+    assert signature(Lexer(source).tokenize()) == signature(slow_tokenize(Lexer, source))
+
+
+@pytest.mark.parametrize("Lexer", LEXERS, ids=lambda lexer: lexer.__name__)
+def test_master_pattern_matches_slow_path_on_samples(Lexer):
+    for source in sample_sources():
+        assert signature(Lexer(source).tokenize()) == signature(slow_tokenize(Lexer, source))
+
+
+def test_python_triple_quoted_string_ends_at_closing_quotes():
+    tokens = PythonLexer('def f():\n    """doc\n    more"""\n    return 1\n').tokenize()
+    assert [(t.type, t.value, t.line, t.column) for t in tokens[6:9]] == [
+        (TokenType.STRING, '"""doc\n    more"""', 3, 5),
+        (TokenType.NEWLINE, "\\n", 3, 12),
+        (TokenType.KEYWORD, "return", 4, 5),
+    ]
+
+
+def test_python_escaped_newline_in_string_advances_lines():
+    tokens = PythonLexer('s = "a\\\nb"\n# comentario\nx = 1\n').tokenize()
+    assert [(t.type, t.value, t.line) for t in tokens[2:6]] == [
+        (TokenType.STRING, '"a\\\nb"', 2),
+        (TokenType.NEWLINE, "\\n", 2),
+        (TokenType.COMMENT, "# comentario", 3),
+        (TokenType.NEWLINE, "\\n", 3),
+    ]
+    assert (tokens[6].value, tokens[6].line, tokens[6].column) == ("x", 4, 1)
@@ -0,0 +1,54 @@
+import glob
+import os
+
+import pytest
+
+from lexers.golang.golexer import GoLexer
+from lexers.javascript.javascriptlexer import JavaScriptLexer
+from lexers.python.pythonlexer import PythonLexer
+from lexers.ruby.rubylexer import RubyLexer
+from lexers.token import Token, TokenType
+from lexers.token_buffer import TokenBuffer
+
+LEXERS = [PythonLexer, JavaScriptLexer, GoLexer, RubyLexer]
+
+SAMPLES_DIR = os.path.join(os.path.dirname(__file__), "..", "sample-code")
+
+
+def signature(tokens):
+    return [(t.type, t.value, t.line, t.column) for t in tokens]
+
+
+def test_token_has_no_instance_dict():
+    token = Token(TokenType.NUMBER, "1", 1, 1)
+    assert not hasattr(token, "__dict__")
+    with pytest.raises(AttributeError):
+        token.extra = True
+
+
+@pytest.mark.parametrize("Lexer", LEXERS, ids=lambda lexer: lexer.__name__)
+def test_buffer_holds_the_same_tokens(Lexer):
+    for path in sorted(glob.glob(os.path.join(SAMPLES_DIR, "*.*"))):
+        with open(path, "r", encoding="utf-8") as f:
+            source = f.read()
+        buffer = TokenBuffer.from_lexer(Lexer(source))
+        assert signature(buffer) == signature(Lexer(source).tokenize())
+
+
+def test_values_that_are_not_source_text():
+    source = 'x = "open\n'
+    buffer = TokenBuffer.from_lexer(PythonLexer(source))
+    assert buffer[-1].type == TokenType.EOF
+    assert buffer[-1].value == "EOF"
+    assert signature(buffer) == signature(PythonLexer(source).tokenize())
+
+
+def test_numpy_columns():
+    buffer = TokenBuffer.from_lexer(PythonLexer("x = 1\n# comment\n"))
+    columns = buffer.as_numpy()
+    assert list(columns["type"]) == [token_type.value for token_type in (
+        TokenType.IDENTIFIER, TokenType.OPERATOR, TokenType.NUMBER, TokenType.NEWLINE,
+        TokenType.COMMENT, TokenType.NEWLINE, TokenType.EOF,
+    )]
+    assert list(columns["line"]) == [1, 1, 1, 1, 2, 2, 3]
+    assert list(columns["start"]) == [0, 2, 4, 5, 6, 15, 16]
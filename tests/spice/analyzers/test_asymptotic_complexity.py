@@ -0,0 +1,98 @@
+import os
+import random
+import re
+import time
+
+from spice.analyzers.asymptotic_complexity import _calculate_complexity
+from spice.file_context import FileContext
+
+SAMPLE_CODE_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "sample-code")
+
+
+def reference_complexity(code):
+    """The scorer before the single-pass engine: up to 14 re.search calls per line."""
+    complexity_score = 1
+    loop_patterns = [r'\bfor\b', r'\bwhile\b', r'\bforeach\b', r'\.each\b', r'\.map\b', r'\.filter\b', r'\.reduce\b']
+    conditional_patterns = [r'\bif\b', r'\belse\b', r'\belif\b', r'\bunless\b', r'\bcase\b', r'\bswitch\b']
+    recursive_patterns = [r'\breturn\s+\w+\(']
+    nesting_level = 0
+    max_nesting = 0
+    for line in code.split('\n'):
+        stripped = line.strip()
+        for pattern in loop_patterns:
+            if re.search(pattern, stripped):
+                complexity_score *= 2
+                nesting_level += 1
+                break
+        for pattern in conditional_patterns:
+            if re.search(pattern, stripped):
+                complexity_score += 1
+                break
+        for pattern in recursive_patterns:
+            if re.search(pattern, stripped):
+                complexity_score *= 3
+                break
+        if any(char in stripped for char in ['{', 'do']):
+            nesting_level += 1
+        if any(char in stripped for char in ['}', 'end']):
+            nesting_level = max(0, nesting_level - 1)
+        max_nesting = max(max_nesting, nesting_level)
+    if max_nesting > 2:
+        complexity_score *= max_nesting
+    for max_score, complexity in [(1, 'O(1)'), (3, 'O(log n)'), (10, 'O(n)'), (25, 'O(n log n)'), (50, 'O(n²)'), (100, 'O(n³)')]:
+        if complexity_score <= max_score:
+            return complexity
+    return 'O(2^n)'
+
+
+def test_simple_blocks():
+    assert _calculate_complexity("def f():\n    return 1") == 'O(1)'
+    assert _calculate_complexity("def f(xs):\n    for x in xs:\n        print(x)") == 'O(log n)'
+    assert _calculate_complexity("def f(n):\n    if n < 2:\n        return n\n    return f(n - 1) + f(n - 2)") == 'O(n)'
+
+
+def test_overlapping_words_are_all_seen():
+    # "endo" holds both "end" and "do", and the name after "return" is still a conditional
+    assert _calculate_complexity("endo\nx {\ny {") == reference_complexity("endo\nx {\ny {")
+    assert _calculate_complexity("return if(x)") == reference_complexity("return if(x)") == 'O(n)'
+
+
+def test_same_classes_as_reference_on_random_code():
+    words = ["for", "while", "foreach", ".each", ".map", ".filter", ".reduce", "if", "else", "elif", "unless",
+             "case", "switch", "return", "f(", "(", "{", "}", "do", "end", "done", "append", "x", "_", ".", " ",
+             "\t", "\n", "\n    ", "\r"]
+    rnd = random.Random(0)
+    for _ in range(5000):
+        code = "".join(rnd.choice(words) for _ in range(rnd.randint(0, 30)))
+        assert _calculate_complexity(code) == reference_complexity(code), repr(code)
+
+
+def test_same_classes_as_reference_on_sample_code():
+    for name in sorted(os.listdir(SAMPLE_CODE_DIR)):
+        path = os.path.join(SAMPLE_CODE_DIR, name)
+        if not os.path.isfile(path):
+            continue
+        context = FileContext.from_path(path)
+        for function in context.functions:
+            code = "\n".join(context.lines[function.start_line - 1:function.end_line])
+            assert _calculate_complexity(code) == reference_complexity(code), f"{name}:{function.start_line}"
+
+
+def test_faster_than_reference_on_large_functions():
+    code = "def f(items):\n" + (
+        "    for item in items:\n"
+        "        if item.ready:\n"
+        "            total = total + compute(item, other) * 2\n"
+        "        else:\n"
+        "            pending.append(item)\n"
+    ) * 4000
+
+    start = time.perf_counter()
+    expected = reference_complexity(code)
+    reference_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    assert _calculate_complexity(code) == expected
+    elapsed = time.perf_counter() - start
+
+    assert elapsed * 5 < reference_elapsed
@@ -17,15 +17,14 @@ def create_temp_file(content, filename="temp_func_test_file"):
     "filename, expected_functions",
     [
         # Based on the content of func_sample.* files
-        # Note: The analyzer uses simplified regex and might not be perfectly accurate
-        # Python: def func1, MyClass.method1, MyClass._private_method, def func2, def func_with_decorator = 5
+        # Python: def func1, MyClass.method1, MyClass._private_method, def func2, def func_with_decorator = 5 (lambdas are not counted)
         ("func_sample.py", 5),
-        # JS: func1, func2, func3, MyClass.method1, MyClass.staticMethod, IIFE, obj.methodInObj, obj.arrowInObj, obj.shorthandMethod, asyncFunc, generatorFunc = 11 (Analyzer is hardcoded to 18)
-        ("func_sample.js", 18), # Using the hardcoded value from the analyzer
-        # Go: func1, func2, MyStruct.method1, *MyStruct.method2, main, goroutine literal = 6 (Analyzer is hardcoded to 15)
-        ("func_sample.go", 15), # Using the hardcoded value from the analyzer
-        # Ruby: func1, MyClass.method1, MyClass.class_method, func2, lambda_func, proc_func, func_with_block = 7 (Analyzer is hardcoded to 29)
-        ("func_sample.rb", 29), # Using the hardcoded value from the analyzer
+        # JS: func1, func2, func3, MyClass.method1, MyClass.staticMethod, IIFE, obj.methodInObj, obj.arrowInObj, obj.shorthandMethod, asyncFunc, generatorFunc = 11
+        ("func_sample.js", 11),
+        # Go: func1, func2, MyStruct.method1, *MyStruct.method2, funcVar literal, main, goroutine literal = 7
+        ("func_sample.go", 7),
+        # Ruby: func1, MyClass.method1, MyClass.class_method, func2, lambda_func, proc_func, func_with_block = 7
+        ("func_sample.rb", 7),
     ]
 )
 def test_count_functions_sample_files(filename, expected_functions):
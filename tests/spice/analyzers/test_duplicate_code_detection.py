@@ -0,0 +1,32 @@
+import pytest
+from spice.analyzers.duplicate_code_detection import detect_duplicate_code, get_duplicate_code_summary
+from spice.file_context import FileContext
+
+# Test cases for get_duplicate_code_summary
+@pytest.mark.parametrize(
+    "code, expected_blocks, expected_lines, expected_percentage",
+    [
+        ("a = 1\nb = 2\nc = 3\nd = 4\n", 0, 0, 0.0), # No duplicates
+        ("x = 1\ny = 2\nz = 3\nother()\nx = 1\ny = 2\nz = 3", 1, 6, 85.71), # One repeated block
+        ("x = 'a'  # one\ny = \"s\"\nz = 3\n\nx = 'b' # two\ny   =   \"t\"\nz = 3 // three", 1, 6, 85.71), # Comments, strings and spacing are ignored
+        ("\n".join(f"line{i}()" for i in range(25)) + "\nbreak\n" + "\n".join(f"line{i}()" for i in range(25)), 255, 50, 98.04), # Longer than the largest block size
+        ("\n\n\n\nx\n\n\n\n\nx\n\n", 3, 10, 83.33), # Mostly empty blocks are skipped
+    ]
+)
+def test_get_duplicate_code_summary(code, expected_blocks, expected_lines, expected_percentage):
+    """Test duplicate detection on blocks of known size."""
+    summary = get_duplicate_code_summary(FileContext("sample.py", code.encode()))
+    assert summary == {
+        "duplicate_blocks": expected_blocks,
+        "duplicate_lines": expected_lines,
+        "duplicate_percentage": expected_percentage
+    }
+
+def test_duplicate_locations():
+    """Test that every occurrence of a duplicated block is reported."""
+    code = "x = 1\ny = 2\nz = 3\nother()\nx = 1\ny = 2\nz = 3"
+    details = detect_duplicate_code(FileContext("sample.py", code.encode()))["details"]
+    assert [block["locations"] for block in details.values()] == [[
+        {"start_line": 1, "end_line": 3, "size": 3},
+        {"start_line": 5, "end_line": 7, "size": 3},
+    ]]
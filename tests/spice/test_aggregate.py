@@ -0,0 +1,106 @@
+import os
+import random
+
+import pytest
+
+from spice.aggregate import MAX_DIRECTORIES, OTHER_DIRECTORIES, Aggregate, QuantileSketch, summary_stats
+from spice.analyze import analyze_directory, summarize_directory, summarize_results
+
+SAMPLE_CODE_DIR = os.path.join(os.path.dirname(__file__), "..", "sample-code")
+
+
+def fake_results(count, seed=0):
+    rng = random.Random(seed)
+    for i in range(count):
+        if i % 50 == 7:
+            yield {"file_name": f"f{i}.py", "file_path": f"/repo/broken/f{i}.py", "error": "boom"}
+            continue
+        line_count = rng.randint(1, 500)
+        yield {
+            "file_name": f"f{i}.py",
+            "file_path": f"/repo/{rng.choice(['api', 'core', 'web/ui', 'web/server/x'])}/f{i}.py",
+            "file_extension": rng.choice([".py", ".go"]),
+            "line_count": line_count,
+            "function_count": rng.randint(0, 20),
+            "comment_ratio": f"{rng.uniform(0, 40):.2f}%",
+            "average_function_size": rng.choice([0.0, rng.uniform(1, 80)]),
+            "duplicate_lines": rng.randint(0, line_count),
+            "complexity_distribution": {"O(1)": rng.randint(0, 5), "O(n)": rng.randint(0, 3)},
+        }
+
+
+def test_merged_partials_match_a_single_fold():
+    results = list(fake_results(1000))
+    whole = Aggregate("/repo").update(results).report()
+    merged = Aggregate("/repo")
+    for start in range(0, len(results), 37):
+        merged.merge(Aggregate("/repo").update(results[start:start + 37]))
+    assert merged.report() == whole
+
+
+def test_report():
+    results = list(fake_results(500))
+    report = summarize_results(iter(results), root="/repo")
+    ok = [result for result in results if "error" not in result]
+    assert (report["file_count"], report["error_count"]) == (500, 10)
+    assert report["totals"]["line_count"] == sum(result["line_count"] for result in ok)
+
+    weighted = sum(float(result["comment_ratio"][:-1]) * result["line_count"] for result in ok)
+    assert report["comment_ratio"] == f"{weighted / report['totals']['line_count']:.2f}%"
+    assert report["complexity_distribution"] == {
+        complexity: sum(result["complexity_distribution"][complexity] for result in ok) for complexity in ("O(1)", "O(n)")
+    }
+
+    core = [result for result in ok if "/core/" in result["file_path"]]
+    expected = sum(result["duplicate_lines"] for result in core) / sum(result["line_count"] for result in core) * 100
+    assert report["duplicate_percentage_by_directory"]["core"] == round(expected, 2)
+    # directories deeper than DIRECTORY_DEPTH are reported with their ancestors
+    assert sorted(report["duplicate_percentage_by_directory"]) == ["api", "core", "web/server", "web/ui"]
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_percentiles_are_within_the_sketch_accuracy(seed):
+    rng = random.Random(seed)
+    values = [rng.lognormvariate(2, 1) for _ in range(20000)]
+    sketch = QuantileSketch(accuracy=0.01)
+    for value in values:
+        sketch.add(value)
+    values.sort()
+    for q in (0.5, 0.9, 0.99):
+        exact = values[int(q * (len(values) - 1))]
+        assert abs(sketch.quantile(q) - exact) <= 0.01 * exact
+    # memory depends on the range of the values, not on their number
+    assert len(sketch.buckets) < 1000
+
+
+def test_directories_are_capped():
+    aggregate = Aggregate("/repo")
+    for i in range(MAX_DIRECTORIES + 10):
+        aggregate.add({"file_path": f"/repo/d{i}/f.py", "line_count": 10, "duplicate_lines": 1})
+    report = aggregate.report()["duplicate_percentage_by_directory"]
+    assert len(report) == MAX_DIRECTORIES + 1
+    assert report[OTHER_DIRECTORIES] == 10.0
+
+
+def test_summarize_directory_matches_analyze_directory():
+    assert summarize_directory(SAMPLE_CODE_DIR, jobs=2) == analyze_directory(SAMPLE_CODE_DIR, jobs=1)["summary"]
+
+
+def test_line_weighted_aggregates_skip_files_without_line_count():
+    aggregate = Aggregate("/repo")
+    aggregate.add({"file_path": "/repo/a.py", "line_count": 300, "comment_ratio": "10.00%", "duplicate_lines": 30})
+    # never mixed in with a made-up weight
+    aggregate.add({"file_path": "/repo/b.py", "comment_ratio": "90.00%", "duplicate_lines": 5})
+    report = aggregate.report()
+    assert report["comment_ratio"] == "10.00%"
+    assert report["duplicate_percentage_by_directory"] == {".": 10.0}
+
+
+def test_summaries_compute_the_line_counts_they_need():
+    assert summary_stats(["comment_ratio"]) == ["comment_ratio", "line_count"]
+    assert summary_stats(["duplicate_code_detection", "line_count"]) == ["duplicate_code_detection", "line_count"]
+    assert summary_stats(["function_count"]) == ["function_count"]
+    assert summary_stats(None) is None
+
+    report = summarize_directory(SAMPLE_CODE_DIR, selected_stats=["comment_ratio", "duplicate_code_detection"], jobs=1)
+    assert "comment_ratio" in report and "duplicate_percentage_by_directory" in report
@@ -0,0 +1,90 @@
+import os
+import pytest
+import spice.cache as cache_module
+from spice.analyze import analyze_file
+from spice.cache import ResultCache
+from spice.file_context import FileContext
+
+def write_file(tmp_path, name, content):
+    file_path = tmp_path / name
+    file_path.write_text(content)
+    return str(file_path)
+
+def test_cache_hit_returns_same_results_without_analyzing(tmp_path, monkeypatch):
+    """Test that a second run over an unchanged file does not call any analyzer."""
+    cache = ResultCache(str(tmp_path / "cache"))
+    file_path = write_file(tmp_path, "sample.py", "# comment\ndef foo():\n    return 1  # one\n")
+    first = analyze_file(file_path, cache=cache)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("analyzer called on a cache hit")
+    monkeypatch.setattr("spice.analyzers.count_comment_lines.count_comment_lines", fail)
+    monkeypatch.setattr("spice.analyzers.count_functions.count_functions", fail)
+
+    assert analyze_file(file_path, cache=cache) == first
+
+def test_cache_key_depends_on_content_and_stats(tmp_path):
+    """Test that changing the contents or the selected stats misses the cache."""
+    cache = ResultCache(str(tmp_path / "cache"))
+    context = FileContext("a.py", b"x = 1\n")
+    key = cache.key(context, ["line_count"])
+    assert key == cache.key(FileContext("b.py", b"x = 1\n"), ["line_count"])
+    assert key != cache.key(FileContext("a.py", b"x = 2\n"), ["line_count"])
+    assert key != cache.key(context, ["line_count", "function_count"])
+    assert key != cache.key(FileContext("a.rb", b"x = 1\n"), ["line_count"])
+
+def test_cached_results_keep_the_current_file_info(tmp_path):
+    """Test that a copy of a cached file reports its own name and path."""
+    cache = ResultCache(str(tmp_path / "cache"))
+    first = write_file(tmp_path, "first.py", "x = 1\n")
+    second = write_file(tmp_path, "second.py", "x = 1\n")
+    analyze_file(first, selected_stats=["line_count"], cache=cache)
+    results = analyze_file(second, selected_stats=["line_count"], cache=cache)
+    assert results["file_name"] == "second.py"
+    assert results["file_path"] == os.path.abspath(second)
+    assert results["line_count"] == 1
+
+def test_prune_evicts_least_recently_used(tmp_path):
+    """Test that prune keeps the cache under max_size by removing the oldest entries."""
+    cache = ResultCache(str(tmp_path / "cache"), max_size=0)
+    contexts = [FileContext("f.py", str(i).encode()) for i in range(3)]
+    for i, context in enumerate(contexts):
+        cache.put(context, ["line_count"], {"line_count": i})
+        path = cache._entry_path(cache.key(context, ["line_count"]))
+        os.utime(path, (i, i))
+    # 3 entries over a cap of 2.5: evicting one brings the cache under PRUNE_TARGET of the cap
+    cache.max_size = os.path.getsize(path) * 2.5
+    assert cache.prune() == 1
+    assert cache.get(contexts[0], ["line_count"]) is None
+    assert cache.get(contexts[2], ["line_count"]) == {"line_count": 2}
+
+def test_prune_only_scans_when_over_max_size(tmp_path, monkeypatch):
+    """Test that prune tracks the size written by every process instead of listing the entries."""
+    directory = str(tmp_path / "cache")
+    cache = ResultCache(directory)
+    cache.put(FileContext("f.py", b"0"), ["line_count"], {"line_count": 0})
+    assert cache.prune() == 0  # first run: scans once to measure the cache
+
+    scans = []
+    monkeypatch.setattr(cache_module, "_scandir", lambda path: scans.append(path) or [])
+    # entries written by another instance, such as a worker process
+    for i in range(1, 50):
+        ResultCache(directory).put(FileContext("f.py", str(i).encode()), ["line_count"], {"line_count": i})
+    assert cache.prune() == 0
+    assert scans == []
+
+    monkeypatch.undo()
+    path = cache._entry_path(cache.key(FileContext("f.py", b"0"), ["line_count"]))
+    cache.max_size = os.path.getsize(path) * 40
+    assert cache.prune() > 0
+    sizes = [entry.stat().st_size for shard in os.scandir(directory) if shard.is_dir() for entry in os.scandir(shard.path)]
+    assert sum(sizes) <= cache.max_size * cache_module.PRUNE_TARGET
+    assert cache.prune() == 0
+
+def test_clear_removes_everything(tmp_path):
+    """Test that clear empties the cache directory."""
+    cache = ResultCache(str(tmp_path / "cache"))
+    context = FileContext("f.py", b"x = 1\n")
+    cache.put(context, ["line_count"], {"line_count": 1})
+    cache.clear()
+    assert cache.get(context, ["line_count"]) is None
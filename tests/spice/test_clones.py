@@ -0,0 +1,76 @@
+import os
+import pytest
+from spice.clones import CloneIndex, fingerprint_lines
+
+# a function long enough to always be fingerprinted, with distinct lines
+SHARED_CODE = "\n".join(f"    total_{i} = compute_{i}(value, {i})" for i in range(20))
+
+def write_file(tmp_path, name, content):
+    file_path = tmp_path / "repo" / name
+    file_path.parent.mkdir(exist_ok=True)
+    file_path.write_text(content)
+    return str(file_path)
+
+@pytest.fixture
+def index(tmp_path):
+    with CloneIndex(str(tmp_path / "index" / "clones.sqlite")) as index:
+        yield index
+
+def test_fingerprints_ignore_comments_and_spacing():
+    """Test that normalized-equal code gets the same fingerprints."""
+    original = SHARED_CODE.split("\n")
+    reformatted = [line.replace(" = ", "   =   ") + "  # note" for line in original]
+    assert [f[0] for f in fingerprint_lines(original)] == [f[0] for f in fingerprint_lines(reformatted)]
+
+def test_short_files_have_no_fingerprints():
+    """Test that files with fewer lines than a k-gram are not fingerprinted."""
+    assert fingerprint_lines(["x = 1", "", "y = 2"]) == []
+
+def test_clone_between_two_files(tmp_path, index):
+    """Test that code copied into another file is reported once, with both locations."""
+    write_file(tmp_path, "a.py", "import os\n\ndef first(value):\n" + SHARED_CODE + "\n")
+    write_file(tmp_path, "b.py", "def second(value):\n" + SHARED_CODE + "\n    return total_0\n")
+    write_file(tmp_path, "c.py", "x = 1\n")
+    index.update(str(tmp_path / "repo"))
+
+    clones = index.clone_pairs()
+    assert len(clones) == 1
+    clone = clones[0]
+    assert os.path.basename(clone["file_a"]) == "a.py"
+    assert os.path.basename(clone["file_b"]) == "b.py"
+    assert clone["start_a"] - clone["start_b"] == 2
+    assert clone["end_a"] - clone["start_a"] >= 15
+
+def test_duplicates_inside_one_file_are_not_cross_file_clones(tmp_path, index):
+    """Test that only copies between different files are reported."""
+    write_file(tmp_path, "a.py", SHARED_CODE + "\n\n" + SHARED_CODE + "\n")
+    index.update(str(tmp_path / "repo"))
+    assert index.clone_pairs() == []
+
+def test_update_is_incremental(tmp_path, index):
+    """Test that only new, edited or deleted files change the index."""
+    root = str(tmp_path / "repo")
+    write_file(tmp_path, "a.py", SHARED_CODE + "\n")
+    b = write_file(tmp_path, "b.py", "x = 1\n")
+    assert index.update(root) == {"added": 2, "updated": 0, "removed": 0, "unchanged": 0, "skipped": 0}
+    assert index.update(root) == {"added": 0, "updated": 0, "removed": 0, "unchanged": 2, "skipped": 0}
+
+    write_file(tmp_path, "b.py", SHARED_CODE + "\n")
+    assert index.update(root)["updated"] == 1
+    assert len(index.clone_pairs()) == 1
+
+    os.remove(b)
+    assert index.update(root)["removed"] == 1
+    assert index.clone_pairs() == []
+
+def test_index_persists_between_runs(tmp_path):
+    """Test that a reopened index does not need to read unchanged files again."""
+    root = str(tmp_path / "repo")
+    write_file(tmp_path, "a.py", SHARED_CODE + "\n")
+    write_file(tmp_path, "b.py", SHARED_CODE + "\n")
+    path = str(tmp_path / "index.sqlite")
+    with CloneIndex(path) as index:
+        index.update(root)
+    with CloneIndex(path) as index:
+        assert index.update(root)["unchanged"] == 2
+        assert len(index.clone_pairs()) == 1
@@ -0,0 +1,50 @@
+import os
+import pytest
+from spice.file_context import FileContext, get_file_context
+from spice.analyzers.count_comment_lines import count_comment_lines
+from spice.analyzers.count_inline_comments import count_inline_comments
+from spice.analyzers.count_method_type import count_method_type
+from spice.analyzers.indentation import detect_indentation
+
+# Define the path to the sample code directory relative to the test file
+SAMPLE_CODE_DIR = os.path.join(os.path.dirname(__file__), "..", "sample-code")
+
+def test_file_context_decodes_like_text_mode(tmp_path):
+    """Test that the context translates newlines the same way open(path, "r") does."""
+    file_path = tmp_path / "sample.py"
+    file_path.write_bytes(b"x = 1\r\ny = 2\rz = 3\n")
+    context = FileContext.from_path(str(file_path))
+    assert context.ext == ".py"
+    assert context.text == "x = 1\ny = 2\nz = 3\n"
+    assert context.lines == ["x = 1", "y = 2", "z = 3", ""]
+
+def test_get_file_context_reuses_existing_context():
+    """Test that passing a context around does not read the file again."""
+    context = FileContext("virtual.py", b"# only a comment\n")
+    assert get_file_context(context) is context
+
+def test_tokens_are_computed_once():
+    """Test that the token stream is lazily computed and then cached."""
+    context = FileContext("virtual.py", b"x = 1  # inline\n# full line\n")
+    assert context.tokens is context.tokens
+    assert count_comment_lines(context) == 1
+    assert count_inline_comments(context) == 1
+
+def test_comment_analyzers_share_the_token_buffer():
+    """Test that the comment analyzers lex once into the compact buffer, not into Token objects."""
+    context = FileContext("virtual.py", b"x = 1  # inline\n# full line\n")
+    assert count_comment_lines(context) == 1
+    assert count_inline_comments(context) == 1
+    assert "token_buffer" in context.__dict__
+    assert "tokens" not in context.__dict__
+    assert [t.value for t in context.iter_tokens()] == [t.value for t in context.tokens]
+
+@pytest.mark.parametrize("filename", ["example.py", "example.js", "example.go", "example.rb"])
+def test_analyzers_accept_path_or_context(filename):
+    """Test that analyzers give the same results for a path and for its context."""
+    file_path = os.path.join(SAMPLE_CODE_DIR, filename)
+    context = FileContext.from_path(file_path)
+    assert count_comment_lines(context) == count_comment_lines(file_path)
+    assert count_inline_comments(context) == count_inline_comments(file_path)
+    assert count_method_type(context) == count_method_type(file_path)
+    assert detect_indentation(context) == detect_indentation(file_path)
@@ -0,0 +1,174 @@
+import os
+
+import pytest
+
+from lexers.golang.golexer import GoLexer
+from lexers.javascript.javascriptlexer import JavaScriptLexer
+from lexers.python.pythonlexer import PythonLexer
+from lexers.ruby.rubylexer import RubyLexer
+from lexers.token_buffer import TokenBuffer
+from spice.analyzers.asymptotic_complexity import analyze_asymptotic_complexity
+from spice.analyzers.average_function_size import calculate_average_function_size
+from spice.analyzers.count_functions import count_functions
+from spice.analyzers.count_method_type import count_method_type
+from spice.file_context import FileContext
+from spice.function_index import FunctionIndex
+
+SAMPLE_CODE_DIR = os.path.join(os.path.dirname(__file__), "..", "sample-code")
+
+LEXERS = {".py": PythonLexer, ".js": JavaScriptLexer, ".go": GoLexer, ".rb": RubyLexer}
+
+
+def index(ext, source):
+    return FunctionIndex.from_buffer(TokenBuffer.from_lexer(LEXERS[ext](source)), ext)
+
+
+def summary(functions):
+    return [(f.name, f.start_line, f.end_line, f.visibility) for f in functions]
+
+
+def test_python_blocks_end_at_dedent():
+    functions = index(".py", (
+        "class A:\n"
+        "    def __init__(self):\n"
+        "        self.x = (1,\n"
+        "2)\n"
+        "\n"
+        "    def _helper(self):\n"
+        "        \"\"\"doc\n"
+        "        string\"\"\"\n"
+        "        def inner():\n"
+        "            return 1\n"
+        "        return inner\n"
+        "# trailing comment\n"
+        "x = 1\n"
+    ))
+    assert summary(functions) == [
+        ("__init__", 2, 4, "public"),
+        ("_helper", 6, 11, "private"),
+        ("inner", 9, 10, "public"),
+    ]
+    assert functions[2].parent == 1
+    assert [f.name for f in functions.top_level()] == ["__init__", "_helper"]
+
+
+def test_python_body_token_range():
+    source = "def f(a: int) -> int:\n    return a\n"
+    buffer = TokenBuffer.from_lexer(PythonLexer(source))
+    function = FunctionIndex.from_buffer(buffer, ".py")[0]
+    assert [buffer.value(i) for i in range(function.body_start, function.body_end)] == ["\\n", "return", "a"]
+
+
+def test_python_function_extent_with_docstring_and_escaped_newline():
+    source = (
+        'def f():\n'
+        '    """Docstring."""\n'
+        '    # comment\n'
+        '    s = "a \\\nb"\n'
+        '    return s\n'
+        '\n'
+        'def g():\n'
+        '    return 1\n'
+    )
+    assert summary(index(".py", source)) == [("f", 1, 6, "public"), ("g", 8, 9, "public")]
+    assert calculate_average_function_size(FileContext("f.py", source.encode())) == 4.0
+
+
+def test_javascript_functions():
+    functions = index(".js", (
+        "function outer(a) {\n"
+        "  const double = x => x * 2;\n"
+        "  return [1].map(function (y) {\n"
+        "    return y;\n"
+        "  });\n"
+        "}\n"
+        "class Box {\n"
+        "  constructor(v) { this.v = v; }\n"
+        "  _peek() {\n"
+        "    if (this.v) { return 1; }\n"
+        "  }\n"
+        "}\n"
+        "const total = (xs) =>\n"
+        "  xs.reduce((a, b) => a + b, 0)\n"
+        "    .toString();\n"
+    ))
+    assert summary(functions) == [
+        ("outer", 1, 6, "public"),
+        ("double", 2, 2, None),
+        (None, 3, 5, None),
+        ("constructor", 8, 8, "public"),
+        ("_peek", 9, 11, "private"),
+        ("total", 13, 15, None),
+        (None, 14, 14, None),
+    ]
+    assert [f.parent for f in functions] == [None, 0, 0, None, None, None, 5]
+
+
+def test_go_functions():
+    functions = index(".go", (
+        "type Handler func(int) error\n"
+        "func (s *Server) Serve(h Handler) func() {\n"
+        "\tdone := func() {\n"
+        "\t\tfmt.Println(\"done\")\n"
+        "\t}\n"
+        "\treturn done\n"
+        "}\n"
+        "func wait() chan struct{} {\n"
+        "\treturn nil\n"
+        "}\n"
+    ))
+    assert summary(functions) == [
+        ("Serve", 2, 7, "public"),
+        ("done", 3, 5, None),
+        ("wait", 8, 10, "private"),
+    ]
+
+
+def test_ruby_functions():
+    functions = index(".rb", (
+        "class Account\n"
+        "  def self.open(owner)\n"
+        "    new(owner) if owner\n"
+        "  end\n"
+        "\n"
+        "  def deposit(amount)\n"
+        "    while amount > 0 do\n"
+        "      amount -= 1\n"
+        "    end\n"
+        "    @items.each do |item|\n"
+        "      return item unless item\n"
+        "    end\n"
+        "  end\n"
+        "\n"
+        "  private\n"
+        "\n"
+        "  def audit\n"
+        "    check = lambda { |x| x > 0 }\n"
+        "  end\n"
+        "end\n"
+    ))
+    assert summary(functions) == [
+        ("open", 2, 4, "public"),
+        ("deposit", 6, 13, "public"),
+        ("audit", 17, 19, "private"),
+        ("check", 18, 18, None),
+    ]
+
+
+def test_unsupported_language_has_no_functions():
+    context = FileContext("notes.txt", b"def func(): pass\n")
+    assert len(context.functions) == 0
+    assert "token_buffer" not in context.__dict__
+
+
+@pytest.mark.parametrize("filename", ["func_sample.py", "func_sample.js", "func_sample.go", "func_sample.rb"])
+def test_function_analyzers_share_one_index(filename):
+    """Test that the function analyzers agree because they read the same index, built once."""
+    context = FileContext.from_path(os.path.join(SAMPLE_CODE_DIR, filename))
+    functions = context.functions
+    assert context.functions is functions
+    assert count_functions(context) == len(functions)
+    private_methods, public_methods = count_method_type(context)
+    assert private_methods + public_methods == sum(1 for f in functions if f.visibility)
+    assert calculate_average_function_size(context) == sum(f.size for f in functions) / len(functions)
+    assert analyze_asymptotic_complexity(context)["total_functions"] == len(functions.top_level())
@@ -0,0 +1,45 @@
+import time
+
+from spice.analyzers.asymptotic_complexity import analyze_asymptotic_complexity
+from spice.analyzers.average_function_size import calculate_average_function_size
+from spice.file_context import FileContext
+
+MODULE_LINES = 50_000
+
+# functions nested this deep inside each other; scanning forward from every def to find
+# its end reads each line once per enclosing function, 500 times here
+DEPTH = 500
+
+# generous on purpose: the single indentation-stack pass needs a few seconds for the
+# whole module (most of it lexing), while the forward scan takes well over half a minute
+TIME_LIMIT = 20
+
+
+def nested_functions(depth):
+    """`depth` functions, each one defined inside the previous one, 5 * depth lines."""
+    lines = []
+    for level in range(depth):
+        lines.append("    " * level + f"def level_{level}(items):")
+        lines.append("    " * (level + 1) + "total = 0")
+    for level in reversed(range(depth)):
+        lines.append("    " * (level + 1) + "for item in items:")
+        lines.append("    " * (level + 2) + "total += item")
+        lines.append("    " * (level + 1) + "return total")
+    return lines
+
+
+def test_function_extents_of_large_nested_module_are_linear():
+    chains = MODULE_LINES // (5 * DEPTH)
+    source = "\n".join(nested_functions(DEPTH) * chains) + "\n"
+    context = FileContext("module.py", source.encode())
+
+    start = time.perf_counter()
+    average_size = calculate_average_function_size(context)
+    complexity = analyze_asymptotic_complexity(context)
+    elapsed = time.perf_counter() - start
+
+    # the function at level l spans 5 * (DEPTH - l) lines
+    assert len(context.functions) == chains * DEPTH
+    assert average_size == 5 * (DEPTH + 1) / 2
+    assert complexity["total_functions"] == chains
+    assert elapsed < TIME_LIMIT, f"function extents of a {MODULE_LINES}-line module took {elapsed:.1f}s"
@@ -0,0 +1,76 @@
+import pytest
+from spice import registry
+from spice.analyze import analyze_file
+from spice.registry import Analyzer, plan, register, run_analyzers
+from spice.file_context import FileContext
+
+
+@pytest.fixture
+def clean_registry(monkeypatch):
+    """Let a test register analyzers without leaking them into other tests."""
+    monkeypatch.setattr(registry, "_analyzers", dict(registry._analyzers))
+
+
+def test_line_count_does_not_lex():
+    """Test that only the artifacts the selected stats need are built."""
+    artifacts, analyzers = plan(["line_count"])
+    assert artifacts == ["text"]
+    assert [analyzer.name for analyzer in analyzers] == ["line_count"]
+
+    context = FileContext("virtual.py", b"x = 1\ny = 2\n")
+    assert run_analyzers(context, ["line_count"]) == {"line_count": 2}
+    assert "token_buffer" not in context.__dict__
+
+
+def test_artifacts_come_after_their_dependencies():
+    """Test that artifacts are built once each, in dependency order."""
+    artifacts, _ = plan(["comment_line_count", "inline_comment_count", "indentation_level"])
+    assert artifacts == ["text", "tokens", "lines"]
+
+
+def test_registered_analyzer_runs_from_analyze_file(tmp_path, clean_registry):
+    """Test that a registered analyzer can be selected like a built-in stat."""
+    register(Analyzer("todo_count", inputs=["lines"], outputs=["todo_count"],
+                      run=lambda context: {"todo_count": sum("TODO" in line for line in context.lines)}))
+    file_path = tmp_path / "sample.py"
+    file_path.write_text("# TODO one\nx = 1  # TODO two\n")
+    results = analyze_file(str(file_path), selected_stats=["line_count", "todo_count"])
+    assert results["line_count"] == 2
+    assert results["todo_count"] == 2
+
+
+def test_unknown_artifact_is_rejected():
+    """Test that analyzers can only ask for artifacts the engine knows how to build."""
+    with pytest.raises(ValueError, match="unknown artifacts"):
+        Analyzer("broken", inputs=["ast"], outputs=["broken"], run=lambda context: {})
+
+
+def test_entry_point_plugins_are_registered(monkeypatch, clean_registry):
+    """Test that analyzers exposed through entry points end up in the registry."""
+    plugin = Analyzer("plugin_stat", inputs=["text"], outputs=["plugin_stat"], run=lambda context: {"plugin_stat": 1})
+
+    class FakeEntryPoint:
+        name = "plugin_stat"
+
+        def load(self):
+            return plugin
+
+    monkeypatch.setattr(registry, "_plugins_loaded", False)
+    monkeypatch.setattr(registry, "entry_points", lambda group: [FakeEntryPoint()])
+    assert registry.get_analyzer("plugin_stat") is plugin
+    assert "plugin_stat" in registry.available_stats()
+
+
+def test_entry_point_plugins_before_python_3_10(monkeypatch, clean_registry):
+    """Test that plugins are found when entry_points() returns a dict of groups, as on Python 3.8 and 3.9."""
+    plugin = Analyzer("plugin_stat", inputs=["text"], outputs=["plugin_stat"], run=lambda context: {"plugin_stat": 1})
+
+    class FakeEntryPoint:
+        name = "plugin_stat"
+
+        def load(self):
+            return plugin
+
+    monkeypatch.setattr(registry, "_plugins_loaded", False)
+    monkeypatch.setattr(registry, "entry_points", lambda: {registry.ENTRY_POINT_GROUP: [FakeEntryPoint()]})
+    assert registry.get_analyzer("plugin_stat") is plugin
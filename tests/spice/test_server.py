@@ -0,0 +1,190 @@
+import json
+import os
+import subprocess
+import sys
+import threading
+
+import pytest
+from typer.testing import CliRunner
+
+import cli.commands.analyze
+from cli.main import app
+from spice.analyze import analyze_directory, analyze_file
+from spice.client import ServerClient, server_state_path
+from spice.scheduler import find_source_files
+from spice.server import AnalysisServer
+
+runner = CliRunner()
+
+ROOT_DIR = os.path.join(os.path.dirname(__file__), "..", "..")
+SAMPLE_CODE_DIR = os.path.join(os.path.dirname(__file__), "..", "sample-code")
+
+# runs the CLI with the arguments it is given, without sending anything to spicecloud,
+# and prints the modules it loaded to stderr
+FORWARDING_RUN = """
+import sys
+import cli.submission
+from cli.main import app
+
+class NoSubmitter:
+    def submit(self, payload):
+        pass
+
+cli.submission._submitter = NoSubmitter()
+try:
+    app(sys.argv[1:])
+finally:
+    print(" ".join(sorted(sys.modules)), file=sys.stderr)
+"""
+
+
+@pytest.fixture
+def server():
+    """A server on a free port, analyzing in-process, announced in the state file."""
+    server = AnalysisServer(jobs=1)
+    server.write_state()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.remove_state()
+    server.server_close()
+
+
+def test_client_gets_the_same_results_as_analyze_file(server):
+    client = ServerClient.from_state_file()
+    assert client.health()["pid"] == os.getpid()
+    path = os.path.join(SAMPLE_CODE_DIR, "example.py")
+    assert client.analyze_file(path) == analyze_file(path)
+    assert client.analyze_file(path, ["line_count"], use_cache=False) == analyze_file(path, ["line_count"])
+
+
+def test_directory_report_matches_local_run(server):
+    client = ServerClient.from_state_file()
+    stats = ["line_count", "function_count"]
+    assert client.analyze_directory(SAMPLE_CODE_DIR, stats) == analyze_directory(SAMPLE_CODE_DIR, stats, jobs=1)
+
+
+def test_streamed_results_match_analyze_files(server):
+    client = ServerClient.from_state_file()
+    paths = list(find_source_files(SAMPLE_CODE_DIR)) * 40
+    streamed = client.iter_files(paths, ["line_count"])
+    first = next(streamed)
+    assert first["line_count"] > 0
+    expected = client.analyze_files(paths, ["line_count"])
+    key = lambda results: results["file_path"]
+    assert sorted([first, *streamed], key=key) == sorted(expected, key=key)
+    # bad requests fail before anything is streamed
+    with pytest.raises(ValueError, match="Invalid stats"):
+        client.iter_files(paths, ["no_such_stat"])
+
+
+def test_errors(server, tmp_path):
+    client = ServerClient.from_state_file()
+    with pytest.raises(Exception, match="File not found"):
+        client.analyze_file(str(tmp_path / "missing.py"))
+    with pytest.raises(ValueError, match="Invalid stats"):
+        client.analyze_files([os.path.join(SAMPLE_CODE_DIR, "example.py")], ["no_such_stat"])
+    with pytest.raises(ValueError, match="token"):
+        ServerClient(*server.server_address[:2], token="wrong").health()
+
+
+def test_worker_processes():
+    server = AnalysisServer(jobs=2)
+    try:
+        server.warm_up()
+        path = os.path.join(SAMPLE_CODE_DIR, "example.rb")
+        assert server.analyze([path, path]) == [analyze_file(path)] * 2
+    finally:
+        server.server_close()
+
+
+def test_no_client_without_a_running_server(tmp_path):
+    assert ServerClient.from_state_file() is None
+    # a server that stopped without removing its state file
+    server = AnalysisServer(jobs=1)
+    server.write_state()
+    server.server_close()
+    with pytest.raises(OSError):
+        ServerClient.from_state_file().health()
+
+
+def test_state_file_is_private_and_removed(tmp_path):
+    server = AnalysisServer(jobs=1)
+    server.write_state()
+    assert os.stat(server_state_path()).st_mode & 0o077 == 0
+    server.remove_state()
+    server.server_close()
+    assert not os.path.exists(server_state_path())
+
+
+@pytest.mark.parametrize("name, output_format", [("example.go", "json"), ("", "json"), ("", "ndjson")])
+def test_analyze_command_forwards_to_a_running_server(server, name, output_format):
+    path = os.path.join(SAMPLE_CODE_DIR, name)
+    result = subprocess.run([sys.executable, "-c", FORWARDING_RUN, "analyze", path, "--all", "--format", output_format,
+                             "--no-cache"], capture_output=True, text=True, cwd=ROOT_DIR)
+    assert result.returncode == 0, result.stderr
+    if output_format == "ndjson":
+        records = [json.loads(line) for line in result.stdout.splitlines()]
+    else:
+        records = [json.loads(result.stdout)]
+    assert records and all("error" not in record for record in records)
+    # the server did the work: the CLI process never loaded the analysis engine
+    modules = result.stderr.split()
+    assert "spice.analyze" not in modules
+    assert [module for module in modules if module.startswith("lexers")] == []
+
+
+def test_analyze_command_passes_no_cache_to_the_server(server, monkeypatch):
+    calls = []
+    analyze_files = ServerClient.analyze_files
+
+    def spy(self, file_paths, selected_stats=None, use_cache=True):
+        calls.append(use_cache)
+        return analyze_files(self, file_paths, selected_stats, use_cache)
+
+    monkeypatch.setattr(ServerClient, "analyze_files", spy)
+    monkeypatch.setattr(cli.commands.analyze, "send_to_server", lambda data: True)
+    for path in [os.path.join(SAMPLE_CODE_DIR, "example.go"), SAMPLE_CODE_DIR]:
+        for options in [[], ["--no-cache"]]:
+            assert runner.invoke(app, ["analyze", path, "--all", "--json", *options]).exit_code == 0
+    assert calls == [True, False, True, False]
+
+
+@pytest.mark.parametrize("options", [["--format", "ndjson"], []])
+def test_analyze_command_streams_directories_from_the_server(server, monkeypatch, tmp_path, options):
+    def fail(*args, **kwargs):
+        raise AssertionError("the whole directory was sent back at once")
+
+    monkeypatch.setattr(ServerClient, "analyze_files", fail)
+    monkeypatch.setattr(cli.commands.analyze, "send_to_server", lambda data: True)
+    (tmp_path / "a.py").write_text("# comment\nx = 1\n")
+    (tmp_path / "b.js").write_text("// comment\n")
+    result = runner.invoke(app, ["analyze", str(tmp_path), "--all", *options])
+    assert result.exit_code == 0
+    if options:
+        records = sorted((json.loads(line) for line in result.stdout.splitlines()), key=lambda r: r["file_name"])
+        assert records == [analyze_file(str(tmp_path / "a.py")), analyze_file(str(tmp_path / "b.js"))]
+    else:
+        assert "Line Count: 3" in result.stdout
+
+
+def test_analyze_command_with_jobs_does_not_use_the_server(server, monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("analyzed by the server")
+
+    monkeypatch.setattr(ServerClient, "analyze_directory", fail)
+    monkeypatch.setattr(cli.commands.analyze, "send_to_server", lambda data: True)
+    result = runner.invoke(app, ["analyze", SAMPLE_CODE_DIR, "--all", "--json", "--jobs", "1"])
+    assert result.exit_code == 0
+    assert json.loads(result.stdout) == analyze_directory(SAMPLE_CODE_DIR, jobs=1)
+
+
+def test_analyze_command_falls_back_when_the_server_is_gone(monkeypatch):
+    server = AnalysisServer(jobs=1)
+    server.write_state()
+    server.server_close()
+    monkeypatch.setattr(cli.commands.analyze, "send_to_server", lambda data: True)
+    path = os.path.join(SAMPLE_CODE_DIR, "example.go")
+    result = runner.invoke(app, ["analyze", path, "--all", "--json"])
+    assert json.loads(result.stdout) == analyze_file(path)
@@ -0,0 +1,82 @@
+import json
+import os
+
+import pytest
+from typer.testing import CliRunner
+
+import cli.commands.watch
+import spice.analyze
+from cli.main import app
+from spice.watch import Watcher
+
+runner = CliRunner()
+
+
+def write(path, text, mtime):
+    """Write a file and give it a fixed modification time, so changes never depend on timestamp resolution."""
+    path.write_text(text)
+    os.utime(path, ns=(mtime, mtime))
+
+
+def test_only_changed_files_are_reported(tmp_path):
+    write(tmp_path / "a.py", "x = 1\n", 1_000)
+    write(tmp_path / "b.js", "// b\n", 1_000)
+    watcher = Watcher(str(tmp_path), selected_stats=["line_count"])
+
+    changed, removed = watcher.scan()
+    assert sorted(results["file_name"] for results in changed) == ["a.py", "b.js"]
+    assert removed == []
+    assert watcher.scan() == ([], [])
+
+    write(tmp_path / "a.py", "x = 1\ny = 2\n", 2_000)
+    changed, removed = watcher.scan()
+    assert [(results["file_name"], results["line_count"]) for results in changed] == [("a.py", 2)]
+
+    os.remove(tmp_path / "b.js")
+    assert watcher.scan() == ([], [str(tmp_path / "b.js")])
+    assert list(watcher.results) == [str(tmp_path / "a.py")]
+
+
+def test_touched_file_is_not_analyzed_again(tmp_path, monkeypatch):
+    write(tmp_path / "a.py", "x = 1\n", 1_000)
+    watcher = Watcher(str(tmp_path))
+    watcher.scan()
+
+    def fail(*args):
+        raise AssertionError("analyzers ran for an unchanged file")
+
+    monkeypatch.setattr(spice.analyze, "run_analyzers", fail)
+    write(tmp_path / "a.py", "x = 1\n", 2_000)
+    assert watcher.scan() == ([], [])
+
+
+def test_errors_are_reported_without_stopping(tmp_path):
+    (tmp_path / "broken.py").write_bytes(b"\xff\xfe not utf-8")
+    write(tmp_path / "ok.py", "x = 1\n", 1_000)
+    changed, _ = Watcher(str(tmp_path), selected_stats=["line_count"]).scan()
+    assert "error" in changed[0]
+    assert changed[1]["line_count"] == 1
+
+
+def test_watch_command_streams_json_and_sends_results(tmp_path, monkeypatch):
+    write(tmp_path / "a.py", "x = 1\n", 1_000)
+    sent = []
+    monkeypatch.setattr(cli.commands.watch, "send_to_server", sent.append)
+
+    def scan_once(self, on_change, interval):
+        on_change(*self.scan())
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(Watcher, "run", scan_once)
+    result = runner.invoke(app, ["watch", str(tmp_path), "--json"])
+    assert result.exit_code == 0
+    event = json.loads(result.stdout)
+    assert event["event"] == "changed"
+    assert event["results"]["file_name"] == "a.py"
+    assert [payload["file_name"] for payload in sent] == ["a.py"]
+
+
+def test_watching_a_file_is_an_error(tmp_path):
+    write(tmp_path / "a.py", "x = 1\n", 1_000)
+    with pytest.raises(ValueError):
+        Watcher(str(tmp_path / "a.py"))
@@ -1,6 +1,10 @@
 import os
 
 
+# every file extension that has a lexer
+SUPPORTED_EXTENSIONS = (".rb", ".py", ".js", ".go")
+
+
 # this will read the file extension and return the correct lexer
 def get_lexer_for_file(file_path):
     _, ext = os.path.splitext(file_path)